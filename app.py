@@ -1,3 +1,4 @@
+import os
 import gradio as gr
 from gradio import themes
 from gradio.themes.utils import fonts, sizes
@@ -6,7 +7,13 @@ import pytz # Para conversão de fuso horário
 
 # --- imports da arquitetura modular ---
 from infra.logging_conf import get_logger
-from infra.repositories import CoreRepo, LearnedRepo, HistoryRepo
+from infra.repositories import CoreRepo, LearnedRepo, JsonlHistoryRepo, StatsRepo, PerguntasFrequentesRepo
+from infra.history_archive import ArquivoHistorico
+from infra.sqlite_repositories import (
+    SqliteDatabase, SqliteHistoryRepo, SqliteLearnedRepo, SqliteStatsRepo, SqlitePerguntasFrequentesRepo, migrar_json,
+)
+from core import kb_snapshot
+from core.hot_reload import CoreReloader
 from core.intent_matcher import IntentMatcher
 from core.chatbot import Chatbot
 from core.personalities import canonicalize, display_name, is_valid
@@ -31,22 +38,54 @@ theme = tema_aline
 
 CORE_FILE = 'data/core_data.json'
 NEW_DATA_FILE = 'data/new_data.json'
-HIST_FILE = 'data/historico.json'
+HIST_FILE = 'data/historico.jsonl'
+HIST_LEGADO_FILE = 'data/historico.json'
+SNAPSHOT_FILE = 'data/kb_snapshot.bin'
+STATS_FILE = 'data/stats.json'
+SQLITE_FILE = 'data/educalin.db'
+HIST_ARQUIVO_DIR = 'data/historico_arquivo'
+FREQUENTES_FILE = 'data/perguntas_frequentes.json'
+
+# "json" (padrão) ou "sqlite" (vários workers do Gradio gravando no mesmo banco)
+ARMAZENAMENTO = "json"
 
 logger = get_logger("chatbot")
 
 # Repositórios de dados
 core_repo = CoreRepo(CORE_FILE, logger=logger)
-learned_repo = LearnedRepo(NEW_DATA_FILE, logger=logger)
-history_repo = HistoryRepo(HIST_FILE, logger=logger)
-
-# Carrega dados
-intencoes = core_repo.load_intents()
-aprendidos = learned_repo.load()
-
-# Matcher + Chatbot
-matcher = IntentMatcher(intencoes=intencoes, aprendidos=aprendidos, logger=logger)
-aline_bot = Chatbot(matcher=matcher, learned_repo=learned_repo, history_repo=history_repo, logger=logger)
+if ARMAZENAMENTO == "sqlite":
+    db = SqliteDatabase(SQLITE_FILE, logger=logger)
+    migrar_json(db, HIST_FILE if os.path.exists(HIST_FILE) else HIST_LEGADO_FILE, NEW_DATA_FILE, STATS_FILE, logger=logger,
+                frequentes_path=FREQUENTES_FILE)  # só na primeira execução
+    learned_repo = SqliteLearnedRepo(db)
+    history_repo = SqliteHistoryRepo(db)
+    stats_repo = SqliteStatsRepo(db)  # também alimenta o reports/relatório.txt
+    # Cada worker soma as próprias perguntas no banco, sem sobrescrever o resumo dos outros
+    frequentes_repo = SqlitePerguntasFrequentesRepo(db)
+    # O snapshot é derivado dos JSON; com aprendizados no banco o índice é montado direto
+    matcher = IntentMatcher(core_repo.load_intents(), learned_repo.load(), logger=logger)
+else:
+    learned_repo = LearnedRepo(NEW_DATA_FILE, logger=logger)
+    # Segmentos fechados na rotação vão para o arquivo diário compactado (histórico completo)
+    history_repo = JsonlHistoryRepo(HIST_FILE, logger=logger, legado=HIST_LEGADO_FILE,
+                                    arquivo=ArquivoHistorico(HIST_ARQUIVO_DIR, logger=logger))
+    stats_repo = StatsRepo(STATS_FILE, logger=logger)
+    frequentes_repo = PerguntasFrequentesRepo(FREQUENTES_FILE, logger=logger)
+    # Matcher (snapshot compilado; recompila se os JSON mudaram)
+    matcher = kb_snapshot.carregar(CORE_FILE, NEW_DATA_FILE, SNAPSHOT_FILE, logger=logger)
+
+# Perguntas mais feitas (resumo com decaimento em memória, salvo periodicamente) para as sugestões
+aline_bot = Chatbot(matcher=matcher, learned_repo=learned_repo, history_repo=history_repo, logger=logger,
+                    stats_repo=stats_repo, frequentes_repo=frequentes_repo)
+if ARMAZENAMENTO == "json":
+    # Estatísticas em memória com snapshot periódico do stats.json (um único processo escreve o arquivo)
+    aline_bot.ativar_agregador_stats(intervalo_seg=5.0)
+# Histórico (e estatísticas, sem agregador) gravados em lote fora do caminho da resposta (flush no desligamento)
+aline_bot.ativar_write_behind(intervalo_seg=1.0, max_pendentes=100)
+
+# Recarrega o core_data.json em segundo plano quando o arquivo muda
+core_reloader = CoreReloader(core_repo, matcher, logger=logger)
+core_reloader.start()
 
 # -------------------------
 # Funções conectadas ao Gradio
@@ -135,8 +174,8 @@ def enviar_mensagem(user_message: str, personalidade: str, chat_history, interna
         internal_state["last_question"] = None
 
     # ❌ NÃO chamamos métodos privados nem salvamos histórico aqui:
-    # o próprio Chatbot já persistiu via HistoryRepo e atualizou as estatísticas
-    # na chamada a `processar_mensagem` acima.
+    # o próprio Chatbot persiste o histórico e as estatísticas (em lote, via
+    # write-behind) a partir da chamada a `processar_mensagem` acima.
 
     return chat, internal_state, ""  # limpa o input
 
@@ -232,7 +271,8 @@ with gr.Blocks(title="Aline Chatbot (Gradio)", theme=theme, css=load_css()) as d
     user_input = gr.Textbox(label="Sua mensagem", placeholder="Digite aqui e pressione Enter")
     enviar_btn = gr.Button(elem_classes="primary", value="Enviar")
 
-    sugestoes_box = gr.Markdown(value=mostrar_sugestoes())
+    # Calculado a cada carregamento da página, não na montagem do layout
+    sugestoes_box = gr.Markdown(value=mostrar_sugestoes)
 
     gr.Markdown("### Ensinar resposta (quando o bot não souber)")
     teach_input = gr.Textbox(label="Resposta que você quer ensinar", placeholder="Escreva a resposta que o bot deve aprender")
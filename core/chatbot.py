@@ -1,31 +1,77 @@
 from typing import Optional, Tuple, Dict, Any
 import random
 from datetime import datetime, timezone
-from infra.repositories import StatsRepo
+from infra.repositories import StatsRepo, entrada_historico
+from infra.write_behind import WriteBehind
+from infra.stats_aggregator import AgregadorStats, resumir_stats
 from core.faq_suggestions import FAQSuggestions
-from core.validation import validate_input
+from core.validation import preprocessar, validate_input
 
 class Chatbot:
-    def __init__(self, matcher, learned_repo, history_repo, logger):
+    def __init__(self, matcher, learned_repo, history_repo, logger, stats_repo=None, frequentes_repo=None):
         self.matcher = matcher
         self.learned_repo = learned_repo
         self.history_repo = history_repo
-        self.stats_repo = StatsRepo('data/stats.json', logger=logger)
+        self.stats_repo = stats_repo or StatsRepo('data/stats.json', logger=logger)
         self.logger = logger
-        self.faq_suggestions = FAQSuggestions(history_repo=history_repo, intent_matcher=matcher, logger=logger)
+        self.faq_suggestions = FAQSuggestions(history_repo=history_repo, intent_matcher=matcher, logger=logger,
+                                              frequentes_repo=frequentes_repo)
         self.personalidade: Optional[str] = None
         self.nome_personalidade: Optional[str] = None
+        self.write_behind: Optional[WriteBehind] = None
+        self.agregador_stats: Optional[AgregadorStats] = None
+
+    def ativar_write_behind(self, intervalo_seg: float = 1.0, max_pendentes: int = 100) -> WriteBehind:
+        """
+        Tira a gravação de histórico e estatísticas do caminho da resposta:
+        interações são gravadas em lote por uma thread de fundo (ver WriteBehind).
+        """
+        if self.write_behind is None:
+            # Com o agregador ativo as estatísticas já são atualizadas em memória, fora da fila
+            stats_repo = None if self.agregador_stats is not None else self.stats_repo
+            self.write_behind = WriteBehind(self.history_repo, stats_repo, intervalo_seg=intervalo_seg,
+                                            max_pendentes=max_pendentes, logger=self.logger)
+            self.write_behind.start()
+        return self.write_behind
+
+    def ativar_agregador_stats(self, intervalo_seg: float = 5.0) -> AgregadorStats:
+        """
+        Mantém as estatísticas em memória (atualização O(1), `get_stats` sem
+        acesso a disco) e grava snapshots periódicos do stats.json.
+        """
+        if self.agregador_stats is None:
+            if self.write_behind is not None:
+                # Grava o que já está na fila e tira as estatísticas dela antes de carregar o agregador
+                self.write_behind.flush()
+                self.write_behind.stats_repo = None
+            self.agregador_stats = AgregadorStats(self.stats_repo, intervalo_seg=intervalo_seg, logger=self.logger)
+            self.agregador_stats.start()
+        return self.agregador_stats
+
+    def encerrar(self):
+        """Grava o que estiver pendente no write-behind, no agregador e nas perguntas frequentes (chamar ao desligar)."""
+        if self.write_behind is not None:
+            self.write_behind.close()
+        if self.agregador_stats is not None:
+            self.agregador_stats.close()
+        self.faq_suggestions.salvar_frequentes()
+
+    def _sincronizar(self):
+        # Leituras de histórico/estatísticas precisam ver as interações ainda na fila
+        if self.write_behind is not None:
+            self.write_behind.flush()
 
     def set_personalidade(self, personalidade: str, nome_exibicao: str):
         self.personalidade = personalidade
         self.nome_personalidade = nome_exibicao
 
     def processar_mensagem(self, pergunta: str, personalidade: str) -> Tuple[str, bool, Optional[str]]:
-        if not validate_input(pergunta, self.logger):
+        consulta = preprocessar(pergunta, self.logger)
+        if consulta is None:
             return "Entrada inválida. Tente novamente.", True, None
 
         now_in = datetime.now(timezone.utc).isoformat()
-        match = self.matcher.match(pergunta)
+        match = self.matcher.match(consulta)
 
         is_fallback = False
         tag = None
@@ -56,14 +102,22 @@ class Chatbot:
             resposta = random.choice(respostas_fallback) if isinstance(respostas_fallback, list) else respostas_fallback
 
         now_out = datetime.now(timezone.utc).isoformat()
+        self.faq_suggestions.registrar_pergunta(pergunta, is_fallback, chave=consulta.norm)
         
-        self.history_repo.append(
-            pergunta, resposta, personalidade,
-            tag_intencao=tag, is_fallback=is_fallback,
-            timestamp_in=now_in, timestamp_out=now_out
-        )
-        
-        self.update_stats(is_fallback, personalidade, tag, now_in, now_out)
+        if self.write_behind is not None:
+            self.write_behind.registrar(
+                entrada_historico(pergunta, resposta, personalidade, tag, is_fallback, now_in, now_out),
+                (is_fallback, personalidade, tag, now_in, now_out),
+            )
+            if self.agregador_stats is not None:
+                self.update_stats(is_fallback, personalidade, tag, now_in, now_out)
+        else:
+            self.history_repo.append(
+                pergunta, resposta, personalidade,
+                tag_intencao=tag, is_fallback=is_fallback,
+                timestamp_in=now_in, timestamp_out=now_out
+            )
+            self.update_stats(is_fallback, personalidade, tag, now_in, now_out)
         
         return resposta, is_fallback, tag
 
@@ -76,47 +130,22 @@ class Chatbot:
             return False
         ok = self.learned_repo.append(pergunta, resposta)
         if ok:
-            aprendidos = self.learned_repo.load()
-            self.matcher.refresh_learned(aprendidos)
+            self.matcher.add_learned(pergunta, resposta)
         return ok
 
     def carregar_historico_inicial(self, n: int = 5):
+        self._sincronizar()
         return self.history_repo.load_last(n)
 
     def update_stats(self, is_fallback: bool, personalidade: str, tag: Optional[str], timestamp_in: str, timestamp_out: str):
-        self.stats_repo.update_interaction(is_fallback, personalidade, tag, timestamp_in, timestamp_out)
+        destino = self.agregador_stats if self.agregador_stats is not None else self.stats_repo
+        destino.update_interaction(is_fallback, personalidade, tag, timestamp_in, timestamp_out)
 
     def get_stats(self) -> Dict[str, Any]:
-        data = self.stats_repo.load()
-        total = data.get("total_interactions", 0)
-        fallback_count = data.get("fallback_count", 0)
-        fallback_rate = fallback_count / total if total > 0 else 0.0
-
-        por_personalidade = data.get("por_personalidade", {})
-        por_personalidade_perc = {pers: (count / total * 100) if total > 0 else 0.0 for pers, count in por_personalidade.items()}
-
-        por_tag = data.get("por_tag", {})
-        por_tag_perc = {t: (count / total * 100) if total > 0 else 0.0 for t, count in por_tag.items()}
-
-        # Calcula a duração média da sessão
-        sessoes = data.get("sessoes", {})
-        total_duracao_seg = data.get("total_duracao_sessoes_seg", 0)
-        num_sessoes = len(sessoes)
-        
-        media_duracao_seg = total_duracao_seg / num_sessoes if num_sessoes > 0 else 0.0
-        media_duracao_min = media_duracao_seg / 60.0
-
-        return {
-            "total_interactions": total,
-            "fallback_rate": fallback_rate,
-            "fallback_count": fallback_count,
-            "por_personalidade": por_personalidade,
-            "por_personalidade_perc": por_personalidade_perc,
-            "por_tag": por_tag,
-            "por_tag_perc": por_tag_perc,
-            "media_duracao_sessao_min": media_duracao_min,
-            "num_sessoes": num_sessoes,
-        }
+        if self.agregador_stats is not None:
+            return self.agregador_stats.resumo()
+        self._sincronizar()
+        return resumir_stats(self.stats_repo.load())
 
     def get_faq_suggestions(self, n_total: int = 3) -> list[str]:
         """
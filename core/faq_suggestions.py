@@ -1,62 +1,148 @@
 from typing import List, Optional
-from collections import Counter
+from datetime import datetime
+import atexit
 import random
+import threading
+import time
 
-from infra.repositories import HistoryRepo
+from infra.repositories import HistoryRepo, PerguntasFrequentesRepo
+from infra.sketches import FrequentesComDecaimento
 from core.intent_matcher import IntentMatcher
+from core.normalization import normalizar
+
+# Entradas do histórico usadas para iniciar o resumo quando ainda não há nada salvo
+SEMENTE_HISTORICO = 1000
+# Perguntas guardadas para a próxima gravação se o repositório falhar seguidamente
+MAX_NOVAS_RETIDAS = 10000
 
 class FAQSuggestions:
     """
     Gera sugestões de perguntas com base no histórico e nas intenções principais.
+    As perguntas respondidas alimentam um resumo das mais frequentes com
+    decaimento (`meia_vida_dias`) em memória: `registrar_pergunta` é O(log k)
+    e as sugestões do histórico não leem disco. Com `frequentes_repo`, o
+    resumo é gravado no máximo a cada `intervalo_gravacao_seg` e no desligamento;
+    junto vão as perguntas registradas desde a última gravação, que o
+    SqlitePerguntasFrequentesRepo soma às dos outros workers.
+    As sugestões do core vêm só das intenções curadas; perguntas ensinadas
+    pelos usuários (sem moderação) só entram com `incluir_aprendidos=True`.
     """
-    def __init__(self, history_repo: HistoryRepo, intent_matcher: IntentMatcher, logger: Optional[object] = None):
+    def __init__(self, history_repo: HistoryRepo, intent_matcher: IntentMatcher, logger: Optional[object] = None,
+                 frequentes_repo: Optional[PerguntasFrequentesRepo] = None, capacidade: int = 500,
+                 meia_vida_dias: float = 7.0, intervalo_gravacao_seg: float = 30.0, incluir_aprendidos: bool = False):
         self.history_repo = history_repo
         self.intent_matcher = intent_matcher
         self.logger = logger
+        self.frequentes_repo = frequentes_repo
+        self.intervalo_gravacao_seg = intervalo_gravacao_seg
+        self.incluir_aprendidos = incluir_aprendidos
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._atexit = False
+        self._alterado = False
+        self._top_cache: Optional[tuple] = None  # (n, sugestões) até a próxima pergunta registrada
+        self._novas: List[tuple] = []  # (chave, pergunta, instante) desde a última gravação
+        self.frequentes = self._carregar_frequentes(capacidade, meia_vida_dias * 86400)
 
     def _log(self, msg: str):
         if self.logger:
             self.logger.info(msg)
 
+    def _carregar_frequentes(self, capacidade: int, meia_vida_seg: float) -> FrequentesComDecaimento:
+        dados = self.frequentes_repo.load() if self.frequentes_repo is not None else None
+        if dados:
+            try:
+                return FrequentesComDecaimento.from_dict(dados)
+            except (KeyError, TypeError, ValueError) as e:
+                if self.logger:
+                    self.logger.error(f"Resumo de perguntas frequentes inválido, recomeçando: {e}")
+
+        frequentes = FrequentesComDecaimento(capacidade, meia_vida_seg)
+        historico = self.history_repo.load_last(n=SEMENTE_HISTORICO)
+        for entrada in historico if isinstance(historico, list) else []:
+            if entrada.get("is_fallback") or not entrada.get("pergunta"):
+                continue
+            try:
+                instante = datetime.fromisoformat(str(entrada.get("timestamp_in"))).timestamp()
+            except ValueError:
+                instante = None
+            pergunta = entrada["pergunta"].strip()
+            frequentes.add(normalizar(pergunta), pergunta, instante)
+        return frequentes
+
+    def registrar_pergunta(self, pergunta: str, is_fallback: bool = False, chave: Optional[str] = None):
+        """Conta uma pergunta feita ao chatbot; as que caíram no fallback não viram sugestão."""
+        if is_fallback or not pergunta:
+            return
+        pergunta = pergunta.strip()
+        chave = chave or normalizar(pergunta)
+        instante = time.time()
+        with self._lock:
+            self.frequentes.add(chave, pergunta, instante)
+            self._top_cache = None
+            self._alterado = True
+            if self.frequentes_repo is not None:
+                self._novas.append((chave, pergunta, instante))
+            if self.frequentes_repo is not None and self._timer is None:
+                self._timer = threading.Timer(self.intervalo_gravacao_seg, self.salvar_frequentes)
+                self._timer.daemon = True
+                self._timer.start()
+                if not self._atexit:
+                    atexit.register(self.salvar_frequentes)
+                    self._atexit = True
+
+    def salvar_frequentes(self) -> bool:
+        """Grava o resumo das perguntas frequentes se mudou (sem efeito sem `frequentes_repo`)."""
+        if self.frequentes_repo is None:
+            return False
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._alterado:
+                return True
+            self._alterado = False
+            dados = self.frequentes.to_dict()
+            novas, self._novas = self._novas, []
+        if self.frequentes_repo.salvar(dados, novas):
+            return True
+        with self._lock:
+            self._alterado = True  # tenta de novo na próxima gravação
+            self._novas[:0] = novas
+            del self._novas[:-MAX_NOVAS_RETIDAS]
+        return False
+
     def _get_from_history(self, n: int = 3) -> List[str]:
         """
-        Obtém sugestões de perguntas baseadas na frequência do histórico recente.
+        Obtém as perguntas mais feitas (com decaimento) do resumo em memória.
         """
-        self._log("Obtendo sugestões do histórico...")
-        historico = self.history_repo.load_last(n=10)  # Carrega um histórico maior para análise
-        if not historico:
-            return []
-
-        perguntas = [entrada.get('pergunta', '') for entrada in historico]
-        contador = Counter(perguntas)
-        mais_frequentes = contador.most_common(n)
-        sugestoes = [pergunta for pergunta, _ in mais_frequentes]
+        with self._lock:
+            # O decaimento não muda a ordem: o ranking só muda quando chega uma pergunta
+            if self._top_cache is None or self._top_cache[0] != n:
+                self._top_cache = (n, [pergunta for pergunta, _ in self.frequentes.top(n)])
+            sugestoes = list(self._top_cache[1])
         self._log(f"Sugestões do histórico encontradas: {sugestoes}")
         return sugestoes
 
     def _get_from_core(self, n: int = 3) -> List[str]:
         """
-        Obtém sugestões aleatórias das intenções principais.
+        Obtém sugestões aleatórias das intenções principais (e dos aprendizados,
+        com `incluir_aprendidos`). O conjunto elegível vem pronto do índice do
+        matcher (recalculado quando ele muda); aqui só se sorteiam `n` posições.
         """
-        self._log("Obtendo sugestões do core...")
-        todas_perguntas = []
-        for intencao in self.intent_matcher.intencoes:
-            if intencao.get("tag") not in ["fallback", "saudacao"]:
-                perguntas = intencao.get("perguntas", [])
-                todas_perguntas.extend(perguntas)
-        
-        num_sugestoes = min(n, len(todas_perguntas))
-        if num_sugestoes > 0:
-            sugestoes = random.sample(todas_perguntas, num_sugestoes)
-            self._log(f"Sugestões do core encontradas: {sugestoes}")
-            return sugestoes
-        
-        self._log("Nenhuma sugestão do core encontrada.")
-        return []
+        base, aprendidas = self.intent_matcher.perguntas_sugeridas()
+        if not self.incluir_aprendidos:
+            aprendidas = ()
+        total = len(base) + len(aprendidas)
+        posicoes = random.sample(range(total), min(n, total))
+        sugestoes = [base[i] if i < len(base) else aprendidas[i - len(base)] for i in posicoes]
+        self._log(f"Sugestões do core encontradas: {sugestoes}")
+        return sugestoes
 
     def get_combined_suggestions(self, n_total: int = 3, n_history: int = 2, n_core: int = 3) -> List[str]:
         """
         Combina sugestões do histórico e do core, evitando duplicatas.
+        Nenhuma das partes lê disco nem percorre as intenções: custo O(n_history + n_core).
         """
         sugestoes_hist = self._get_from_history(n=n_history)
         sugestoes_core = self._get_from_core(n=n_core)
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+class CoreReloader:
+    """
+    Observa o core_data.json (polling de mtime/tamanho) e, quando ele muda,
+    reindexa as intenções numa thread de fundo com `IntentMatcher.refresh_intents`,
+    que publica o novo índice numa única troca de referência. Buscas em
+    andamento terminam com o índice antigo; as seguintes já usam o novo.
+    """
+
+    def __init__(self, core_repo, matcher, intervalo_seg: float = 2.0, logger=None):
+        self.core_repo = core_repo
+        self.matcher = matcher
+        self.intervalo_seg = intervalo_seg
+        self.logger = logger
+        self._assinatura = self._assinatura_atual()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.recargas = 0
+        self.falhas = 0
+        self.ultima_recarga_ms: Optional[float] = None
+        self.ultima_recarga_em: Optional[str] = None
+
+    def _log(self, level: str, msg: str):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def _assinatura_atual(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.core_repo.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def verificar(self) -> bool:
+        """Recarrega se o arquivo mudou desde a última verificação. Retorna True se trocou o índice."""
+        assinatura = self._assinatura_atual()
+        if assinatura is None or assinatura == self._assinatura:
+            return False
+        self._assinatura = assinatura
+
+        inicio = time.perf_counter()
+        intencoes = self.core_repo.load_intents()
+        if not intencoes:
+            # JSON inválido, vazio ou ainda sendo escrito: mantém o índice atual
+            self.falhas += 1
+            self._log('warning', f"Recarga ignorada: nenhuma intenção válida em {self.core_repo.path}")
+            return False
+
+        self.matcher.refresh_intents(intencoes)
+        self.recargas += 1
+        self.ultima_recarga_ms = (time.perf_counter() - inicio) * 1000
+        self.ultima_recarga_em = datetime.now(timezone.utc).isoformat()
+        self._log('info', f"core_data recarregado em {self.ultima_recarga_ms:.1f} ms: {self.matcher.index_stats()}")
+        return True
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo_seg):
+            try:
+                self.verificar()
+            except Exception as e:
+                self.falhas += 1
+                self._log('error', f"Erro ao recarregar {self.core_repo.path}: {e}")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="core-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def metricas(self) -> Dict[str, Any]:
+        """Recargas, falhas, duração e horário da última recarga e tamanho atual do índice."""
+        return {
+            "recargas": self.recargas,
+            "falhas": self.falhas,
+            "ultima_recarga_ms": self.ultima_recarga_ms,
+            "ultima_recarga_em": self.ultima_recarga_em,
+            "indice": self.matcher.index_stats(),
+        }
@@ -1,5 +1,133 @@
-from difflib import get_close_matches, SequenceMatcher
-from typing import List, Dict, Any, Optional
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+
+from core.normalization import Consulta, normalizar, numeros
+from core.ngram_index import ContadoresFiltro, NgramIndex
+from core.tfidf_index import TfidfIndex
+from core.match_cache import AUSENTE, LRUCache, NegativeCache
+
+# Backends da busca FUZZY: ambos expõem add() e close_matches(consulta, n, cutoff)
+BACKENDS = {
+    "difflib": NgramIndex,
+    "tfidf": TfidfIndex,
+}
+
+
+# Intenções cujas perguntas não são oferecidas como sugestão
+TAGS_SEM_SUGESTAO = frozenset({"fallback", "saudacao"})
+
+
+def _sem_log(msg: str):
+    pass
+
+
+class Candidato:
+    """
+    Pergunta indexada com as formas pré-computadas no reindex, para que o
+    caminho quente não precise normalizar, tokenizar nem procurar o dono.
+    `dono` é a intenção (base) ou o dict do aprendizado.
+    """
+    __slots__ = ("texto", "norm", "tokens", "numeros", "dono")
+
+    def __init__(self, texto: str, dono: Dict[str, Any]):
+        self.texto = texto
+        self.norm = normalizar(texto)
+        self.tokens = frozenset(self.norm.split())
+        self.numeros = numeros(self.norm)
+        self.dono = dono
+
+
+class IndiceBase:
+    """
+    Estado das intenções base, construído inteiro antes de ser publicado.
+    `IntentMatcher.refresh_intents` troca a referência de uma vez, então uma
+    busca em andamento nunca vê um mapa pela metade.
+    `sugestoes`: perguntas elegíveis para as sugestões de FAQ (sem repetição).
+    """
+    __slots__ = ("intencoes", "mapa", "candidatos", "indice", "fallback", "sugestoes")
+
+    def __init__(self, intencoes: List[Dict[str, Any]], indice_vazio):
+        self.intencoes = intencoes
+        self.mapa: Dict[str, Dict[str, Any]] = {}
+        self.candidatos: Dict[str, Candidato] = {}
+        self.fallback: Optional[Dict[str, Any]] = None
+        sugestoes: Dict[str, str] = {}
+
+        for intencao in intencoes:
+            if intencao.get("tag") == "fallback":
+                self.fallback = intencao
+            sugerir = intencao.get("tag") not in TAGS_SEM_SUGESTAO
+            for pergunta in intencao.get("perguntas", []):
+                norm = normalizar(pergunta)
+                self.mapa[norm] = intencao
+                # No FUZZY, a pergunta pertence à primeira intenção que a contém
+                if norm not in self.candidatos:
+                    self.candidatos[norm] = Candidato(pergunta, intencao)
+                if sugerir:
+                    sugestoes.setdefault(norm, pergunta)
+        self.sugestoes: Tuple[str, ...] = tuple(sugestoes.values())
+
+        # Índice do backend: restringe o FUZZY aos candidatos que podem passar no cutoff
+        self.indice = indice_vazio(self.candidatos.keys())
+
+
+class IndiceAprendidos:
+    """
+    Estado dos aprendizados. Nunca é alterado depois de publicado: `com`
+    devolve uma nova versão com um aprendizado a mais (copy-on-write).
+    `sugestoes`: perguntas ensinadas elegíveis para as sugestões de FAQ.
+    """
+    __slots__ = ("itens", "mapa_cs", "mapa_ci", "candidatos", "indice", "sugestoes")
+
+    def __init__(self, itens: List[Dict[str, str]], indice_vazio):
+        self.itens = itens
+        # Em perguntas repetidas vale a última resposta ensinada
+        self.mapa_cs: Dict[str, Dict[str, str]] = {d.get("pergunta", ""): d for d in itens}
+        self.mapa_ci: Dict[str, Dict[str, str]] = {normalizar(k): v for k, v in self.mapa_cs.items()}
+        self.candidatos: Dict[str, Candidato] = {
+            norm: Candidato(d.get("pergunta", ""), d) for norm, d in self.mapa_ci.items()
+        }
+        self.indice = indice_vazio(self.candidatos.keys())
+        self.sugestoes = self._sugestoes(self.mapa_ci)
+
+    @staticmethod
+    def _sugestoes(mapa_ci: Dict[str, Dict[str, str]]) -> Tuple[str, ...]:
+        return tuple(d["pergunta"] for norm, d in mapa_ci.items() if norm and d.get("pergunta"))
+
+    def com(self, novo: Dict[str, str], indice_vazio) -> "IndiceAprendidos":
+        """Próxima versão com `novo` no fim; equivale a reconstruir com `itens + [novo]`."""
+        pergunta = novo.get("pergunta", "")
+        itens = self.itens + [novo]
+        if pergunta in self.mapa_cs:
+            # Pergunta repetida: a precedência no mapa CI depende da ordem das chaves
+            return IndiceAprendidos(itens, indice_vazio)
+
+        norm = normalizar(pergunta)
+        proximo = IndiceAprendidos.__new__(IndiceAprendidos)
+        proximo.itens = itens
+        proximo.mapa_cs = {**self.mapa_cs, pergunta: novo}
+        proximo.mapa_ci = {**self.mapa_ci, norm: novo}
+        proximo.candidatos = {**self.candidatos, norm: Candidato(pergunta, novo)}
+        proximo.sugestoes = self._sugestoes(proximo.mapa_ci)
+        if norm in self.candidatos:
+            proximo.indice = self.indice
+        else:
+            proximo.indice = self.indice.copia()
+            proximo.indice.add(norm)
+        return proximo
+
+
+class EstadoMatcher:
+    """Versão publicada do matcher: intenções base + aprendizados, lidos sempre em par."""
+    __slots__ = ("base", "aprendidos")
+
+    def __init__(self, base: IndiceBase, aprendidos: IndiceAprendidos):
+        self.base = base
+        self.aprendidos = aprendidos
+
 
 class IntentMatcher:
     """
@@ -8,128 +136,372 @@ class IntentMatcher:
     - Busca EXATA e FUZZY nos aprendizados
     - Fornece respostas de fallback por personalidade
     Não acessa disco nem faz I/O de terminal.
+
+    Perguntas são comparadas pela forma de `normalizar` (sem acentos, pontuação
+    nem diferença de caixa); só a busca EXATA CS usa o texto original.
+
+    `backend` escolhe o motor da busca FUZZY: "difflib" (padrão, índice de
+    n-gramas + SequenceMatcher) ou "tfidf" (matriz TF-IDF em NumPy).
+    Resultados ficam num cache LRU (`cache_max` itens, `cache_ttl_seg` opcional)
+    e perguntas sem correspondência num cache negativo (`cache_negativo_max`),
+    ambos invalidados quando intenções ou aprendizados mudam.
+
+    Todo o estado de busca fica num `EstadoMatcher` imutável. Escritas
+    (`refresh_intents`, `refresh_learned`, `add_learned`) montam a próxima
+    versão e a publicam trocando uma única referência; buscas leem essa
+    referência uma vez e não usam locks.
     """
 
-    def __init__(self, intencoes: List[Dict[str, Any]], aprendidos: List[Dict[str, str]], logger=None):
+    def __init__(self, intencoes: List[Dict[str, Any]], aprendidos: List[Dict[str, str]], logger=None, backend: str = "difflib",
+                 cache_max: int = 1024, cache_ttl_seg: Optional[float] = None, cache_negativo_max: int = 4096):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+        self.backend = backend
         self.logger = logger
-        self.intencoes = intencoes or []
-        self.aprendidos = aprendidos or []
+        self._cache = LRUCache(max_itens=cache_max, ttl_seg=cache_ttl_seg)
+        self._negativos = NegativeCache(max_itens=cache_negativo_max)
+        self._filtro_base = ContadoresFiltro()
+        self._filtro_aprendidos = ContadoresFiltro()
+        self._filtro_decisao = ContadoresFiltro()
+        self._escrita = threading.Lock()  # serializa escritores; leitores não o usam
+        self._estado = EstadoMatcher(
+            self._construir_base(intencoes or []),
+            self._construir_aprendidos(list(aprendidos or [])),
+        )
+
+    # Caches, lock, contadores e logger são do processo: ficam fora do snapshot (ver core.kb_snapshot)
+    _FORA_DO_SNAPSHOT = ("logger", "_cache", "_negativos", "_escrita")
 
-        self._mapa_pergunta_intencao: Dict[str, Dict[str, Any]] = {}
-        self._todas_perguntas: List[str] = []
-        self._fallback_intencao: Optional[Dict[str, Any]] = None
+    def __getstate__(self) -> Dict[str, Any]:
+        estado = {k: v for k, v in self.__dict__.items() if k not in self._FORA_DO_SNAPSHOT}
+        estado["_config_cache"] = (self._cache.max_itens, self._cache.ttl_seg, self._negativos.max_itens)
+        return estado
 
-        self._reindex()
+    def __setstate__(self, estado: Dict[str, Any]):
+        cache_max, cache_ttl_seg, cache_negativo_max = estado.pop("_config_cache")
+        self.__dict__.update(estado)
+        self.logger = None
+        self._escrita = threading.Lock()
+        self._cache = LRUCache(max_itens=cache_max, ttl_seg=cache_ttl_seg)
+        self._negativos = NegativeCache(max_itens=cache_negativo_max)
+        for contadores in (self._filtro_base, self._filtro_aprendidos, self._filtro_decisao):
+            contadores.reset()
 
     def _log(self, msg: str):
         if self.logger:
             self.logger.info(msg)
 
-    def _reindex(self):
-        self._mapa_pergunta_intencao.clear()
-        self._todas_perguntas.clear()
-        self._fallback_intencao = None
+    def _novo_indice(self, textos, contadores: ContadoresFiltro):
+        return BACKENDS[self.backend](textos, contadores=contadores)
 
-        for intencao in self.intencoes:
-            if intencao.get("tag") == "fallback":
-                self._fallback_intencao = intencao
-            for pergunta in intencao.get("perguntas", []):
-                self._todas_perguntas.append(pergunta)
-                self._mapa_pergunta_intencao[pergunta.lower()] = intencao
+    def _construir_base(self, intencoes: List[Dict[str, Any]]) -> IndiceBase:
+        return IndiceBase(intencoes, lambda textos: self._novo_indice(textos, self._filtro_base))
+
+    def _indice_aprendidos_vazio(self, textos):
+        return self._novo_indice(textos, self._filtro_aprendidos)
+
+    def _construir_aprendidos(self, aprendidos: List[Dict[str, str]]) -> IndiceAprendidos:
+        return IndiceAprendidos(aprendidos, self._indice_aprendidos_vazio)
+
+    @property
+    def intencoes(self) -> List[Dict[str, Any]]:
+        return self._estado.base.intencoes
+
+    @property
+    def aprendidos(self) -> List[Dict[str, str]]:
+        return self._estado.aprendidos.itens
+
+    def perguntas_sugeridas(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Perguntas elegíveis para sugestão (base, aprendidas), pré-computadas
+        junto com o índice e lidas da mesma versão publicada.
+        """
+        estado = self._estado
+        return estado.base.sugestoes, estado.aprendidos.sugestoes
 
     def refresh_intents(self, intencoes: List[Dict[str, Any]]):
-        self.intencoes = intencoes or []
-        self._reindex()
+        """Reindexa as intenções base fora do caminho das buscas e publica o novo índice numa única troca."""
+        base = self._construir_base(intencoes or [])
+        with self._escrita:
+            self._estado = EstadoMatcher(base, self._estado.aprendidos)
+        self._cache.clear()
+        self._negativos.clear()
 
     def refresh_learned(self, aprendidos: List[Dict[str, str]]):
-        self.aprendidos = aprendidos or []
+        novo = self._construir_aprendidos(list(aprendidos or []))
+        with self._escrita:
+            antigo = self._estado.aprendidos
+            self._estado = EstadoMatcher(self._estado.base, novo)
 
-    @staticmethod
-    def _sim(a: str, b: str) -> float:
-        return SequenceMatcher(None, a, b).ratio()
+        antigas, novas = set(antigo.candidatos), set(novo.candidatos)
+        if antigas - novas:
+            # Sem o melhor candidato antigo, um segundo colocado pode passar a casar
+            self._negativos.clear()
+        else:
+            self._invalidar_negativos(novas - antigas)
+        self._invalidar_aprendidos_em_cache()
+
+    def add_learned(self, pergunta: str, resposta: str):
+        """
+        Registra um novo aprendizado sem recarregar nem reindexar os demais.
+        Equivale a `refresh_learned(aprendidos + [novo])`.
+        """
+        novo = {"pergunta": pergunta, "resposta_ensinada": resposta}
+        with self._escrita:
+            estado = self._estado
+            self._estado = EstadoMatcher(estado.base, estado.aprendidos.com(novo, self._indice_aprendidos_vazio))
+        self._invalidar_negativos([normalizar(pergunta)])
+        self._invalidar_aprendidos_em_cache()
+
+    def _invalidar_aprendidos_em_cache(self):
+        # As intenções base não mudaram e têm precedência: só resultados "aprendido" podem mudar
+        self._cache.descartar(lambda chave, valor: valor["tipo"] != "intent")
+
+    def _invalidar_negativos(self, novas_normas: Iterable[str]):
+        """Remove do cache negativo as perguntas que podem casar com algum aprendizado novo (já normalizado)."""
+        novas_normas = list(novas_normas)
+        if not novas_normas:
+            return
+        exatas = set(novas_normas)
+        indice = NgramIndex(novas_normas)
+        self._negativos.descartar(
+            lambda chave, _: chave in exatas or bool(indice.close_matches(chave, n=1, cutoff=0.9))
+        )
 
     @staticmethod
-    def _jaccard(a: str, b: str) -> float:
-        sa, sb = set(a.split()), set(b.split())
-        uniao = len(sa.union(sb))
-        return (len(sa.intersection(sb)) / uniao) if uniao > 0 else 0.0
+    def _sim(consulta: str, candidato: str) -> float:
+        """
+        ratio(consulta, candidato), na ordem do matcher original. O índice só
+        escolhe o candidato: o ratio dele é ratio(candidato, consulta), e o
+        SequenceMatcher não é simétrico, então as decisões nos limites mudariam.
+        """
+        return SequenceMatcher(None, consulta, candidato).ratio()
+
+    def _jaccard_limitado(self, sa: frozenset, sb: frozenset, minimo: float) -> float:
+        """Jaccard dos tokens, ou o limite min/max de tamanhos quando ele já fica abaixo de `minimo`."""
+        c = self._filtro_decisao
+        c.avaliados += 1
+        menor, maior = sorted((len(sa), len(sb)))
+        if maior > 0 and menor / maior < minimo:
+            c.podar("jaccard_tamanho")
+            return menor / maior
+        c.aprovados += 1
+        comuns = len(sa & sb)
+        uniao = len(sa) + len(sb) - comuns
+        return (comuns / uniao) if uniao > 0 else 0.0
 
-    def match(self, pergunta_usuario: str) -> Optional[Dict[str, Any]]:
+    def match(self, pergunta_usuario: Union[str, Consulta]) -> Optional[Dict[str, Any]]:
         """
+        Aceita o texto digitado ou uma `Consulta` já pré-processada (ver core.validation.preprocessar).
         Retorna:
           - {"tipo": "intent", "intencao": <dict da intenção>}  OU
           - {"tipo": "aprendido", "resposta": <str>}            OU
           - None (sem correspondência -> usar fallback)
         """
-        pergunta_norm = (pergunta_usuario or "").lower().strip()
-        self._log(f"Iniciando busca por correspondência: '{pergunta_usuario}'")
+        return self._buscar(pergunta_usuario, self._log)
+
+    def _buscar(self, pergunta_usuario: Union[str, Consulta], log, usar_cache: bool = True) -> Optional[Dict[str, Any]]:
+        consulta = pergunta_usuario if isinstance(pergunta_usuario, Consulta) else Consulta(pergunta_usuario)
+        estado = self._estado
+        log(f"Iniciando busca por correspondência: '{consulta.original}'")
+
+        # 0) Caches pela pergunta normalizada. A etapa EXATA CS depende do texto
+        #    original, então fica fora deles e é refeita quando a base não casou.
+        if usar_cache and self._negativos.contains(consulta.norm):
+            log("⚡ Sem correspondência (cache negativo)")
+            return self._buscar_aprendido_cs(estado.aprendidos, consulta, log)
+
+        em_cache = self._cache.get(consulta.norm) if usar_cache else AUSENTE
+        if em_cache is not AUSENTE:
+            log("⚡ Resultado em cache")
+            if em_cache["tipo"] == "intent":
+                return em_cache
+            return self._buscar_aprendido_cs(estado.aprendidos, consulta, log) or em_cache
 
+        resultado = self._buscar_base(estado.base, consulta, log)
+        if resultado is None:
+            resultado_cs = self._buscar_aprendido_cs(estado.aprendidos, consulta, log)
+            if resultado_cs is not None:
+                return resultado_cs
+            resultado = self._buscar_aprendidos(estado.aprendidos, consulta, log)
+
+        if resultado is None:
+            log(f"❌ Nenhuma correspondência para: '{consulta.original}'")
+        if usar_cache:
+            self._guardar(estado, consulta.norm, resultado)
+        return resultado
+
+    def _guardar(self, estado: EstadoMatcher, chave: str, resultado: Optional[Dict[str, Any]]):
+        cache = self._negativos if resultado is None else self._cache
+        cache.put(chave, True if resultado is None else resultado)
+        # Um escritor pode ter publicado outra versão e invalidado os caches
+        # antes deste put: nesse caso o resultado (da versão antiga) é retirado.
+        if estado is not self._estado:
+            cache.remover(chave)
+
+    def _buscar_base(self, base: IndiceBase, consulta: Consulta, log) -> Optional[Dict[str, Any]]:
         # 1) EXATA nas intenções base
-        if pergunta_norm in self._mapa_pergunta_intencao:
-            intencao = self._mapa_pergunta_intencao[pergunta_norm]
-            self._log(f"✅ EXATA base -> tag '{intencao.get('tag')}'")
+        intencao = base.mapa.get(consulta.norm)
+        if intencao is not None:
+            log(f"✅ EXATA base -> tag '{intencao.get('tag')}'")
             return {"tipo": "intent", "intencao": intencao}
 
         # 2) FUZZY nas intenções base (thresholds originais: cutoff 0.8, sim>=0.92, jac>=0.9)
-        matches = get_close_matches(pergunta_norm, self._todas_perguntas, n=1, cutoff=0.8)
+        matches = base.indice.close_matches(consulta.norm, n=1, cutoff=0.8)
         if matches:
-            cand = matches[0]
-            sim = self._sim(pergunta_norm, cand.lower())
-            self._log(f"✅ FUZZY base: '{cand}' (sim: {sim:.2f})")
+            cand = base.candidatos[matches[0]]
+            sim = self._sim(consulta.norm, cand.norm)
+            log(f"✅ FUZZY base: '{cand.texto}' (sim: {sim:.2f})")
 
             if sim >= 0.92:
-                for i in self.intencoes:
-                    if cand in i.get("perguntas", []):
-                        return {"tipo": "intent", "intencao": i}
+                return {"tipo": "intent", "intencao": cand.dono}
             elif sim >= 0.8:
-                jac = self._jaccard(pergunta_norm, cand.lower())
-                self._log(f"Jaccard: {jac:.2f}")
+                jac = self._jaccard_limitado(consulta.tokens, cand.tokens, 0.9)
+                log(f"Jaccard: {jac:.2f}")
                 if jac >= 0.9:
-                    for i in self.intencoes:
-                        if cand in i.get("perguntas", []):
-                            return {"tipo": "intent", "intencao": i}
-
-        # 3) EXATA nos aprendidos (CS e CI)
-        mapa_aprendidos_cs = {d.get("pergunta", ""): d for d in self.aprendidos}
-        mapa_aprendidos_ci = {k.lower(): v for k, v in mapa_aprendidos_cs.items()}
+                    return {"tipo": "intent", "intencao": cand.dono}
+        return None
 
-        if pergunta_usuario in mapa_aprendidos_cs:
-            d = mapa_aprendidos_cs[pergunta_usuario]
-            self._log("✅ EXATA aprendido (CS)")
+    def _buscar_aprendido_cs(self, aprendidos: IndiceAprendidos, consulta: Consulta, log) -> Optional[Dict[str, Any]]:
+        # 3a) EXATA nos aprendidos (CS)
+        d = aprendidos.mapa_cs.get(consulta.original)
+        if d is not None:
+            log("✅ EXATA aprendido (CS)")
             return {"tipo": "aprendido", "resposta": d.get("resposta_ensinada", "")}
+        return None
 
-        if pergunta_norm in mapa_aprendidos_ci:
-            d = mapa_aprendidos_ci[pergunta_norm]
-            self._log("✅ EXATA aprendido (CI)")
+    def _buscar_aprendidos(self, aprendidos: IndiceAprendidos, consulta: Consulta, log) -> Optional[Dict[str, Any]]:
+        # 3b) EXATA nos aprendidos (CI)
+        d = aprendidos.mapa_ci.get(consulta.norm)
+        if d is not None:
+            log("✅ EXATA aprendido (CI)")
             return {"tipo": "aprendido", "resposta": d.get("resposta_ensinada", "")}
 
         # 4) FUZZY nos aprendidos (thresholds originais: cutoff 0.9, sim>=0.92, jac>=0.95)
-        perguntas_aprendidas = list(mapa_aprendidos_cs.keys())
-        matches_apr = get_close_matches(pergunta_norm, perguntas_aprendidas, n=1, cutoff=0.9)
+        matches_apr = aprendidos.indice.close_matches(consulta.norm, n=1, cutoff=0.9)
         if matches_apr:
-            cand_apr = matches_apr[0]
-            sim_apr = self._sim(pergunta_norm, cand_apr.lower())
-            self._log(f"✅ FUZZY aprendido: '{cand_apr}' (sim: {sim_apr:.2f})")
+            cand_apr = aprendidos.candidatos[matches_apr[0]]
+            if cand_apr.numeros != consulta.numeros:
+                # Respostas ensinadas costumam ser específicas ("quanto é 2+2" -> "4"):
+                # perguntas que só diferem nos números não são a mesma pergunta
+                log(f"FUZZY aprendido descartado: '{cand_apr.texto}' (números diferentes)")
+                return None
+            sim_apr = self._sim(consulta.norm, cand_apr.norm)
+            log(f"✅ FUZZY aprendido: '{cand_apr.texto}' (sim: {sim_apr:.2f})")
 
             if sim_apr >= 0.92:
-                d = mapa_aprendidos_cs[cand_apr]
-                return {"tipo": "aprendido", "resposta": d.get("resposta_ensinada", "")}
+                return {"tipo": "aprendido", "resposta": cand_apr.dono.get("resposta_ensinada", "")}
             elif sim_apr >= 0.9:
-                jac_apr = self._jaccard(pergunta_norm, cand_apr.lower())
-                self._log(f"Jaccard apr: {jac_apr:.2f}")
+                jac_apr = self._jaccard_limitado(consulta.tokens, cand_apr.tokens, 0.95)
+                log(f"Jaccard apr: {jac_apr:.2f}")
                 if jac_apr >= 0.95:
-                    d = mapa_aprendidos_cs[cand_apr]
-                    return {"tipo": "aprendido", "resposta": d.get("resposta_ensinada", "")}
-
-        self._log(f"❌ Nenhuma correspondência para: '{pergunta_usuario}'")
+                    return {"tipo": "aprendido", "resposta": cand_apr.dono.get("resposta_ensinada", "")}
         return None
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """Contadores do cache de resultados (hits, misses, evictions...)."""
+        return self._cache.stats()
+
+    def negative_cache_stats(self) -> Dict[str, Any]:
+        """Contadores do cache negativo (perguntas sem correspondência)."""
+        return self._negativos.stats()
+
+    def prefilter_stats(self) -> Dict[str, Any]:
+        """Candidatos descartados por estágio do pré-filtro, por etapa da busca."""
+        return {
+            "base": self._filtro_base.snapshot(),
+            "aprendidos": self._filtro_aprendidos.snapshot(),
+            "decisao": self._filtro_decisao.snapshot(),
+        }
+
+    def index_stats(self) -> Dict[str, int]:
+        """Tamanho dos índices: intenções, perguntas base distintas e aprendizados."""
+        estado = self._estado
+        return {
+            "intencoes": len(estado.base.intencoes),
+            "perguntas_base": len(estado.base.candidatos),
+            "aprendidos": len(estado.aprendidos.candidatos),
+        }
+
+    def match_many(self, perguntas: Iterable[str], processos: int = 1, min_paralelo: int = 5000) -> List[Optional[Dict[str, Any]]]:
+        """
+        Classifica um lote de perguntas (ex.: replay do histórico) e devolve os
+        resultados na mesma ordem, com o mesmo formato de `match`.
+        Perguntas repetidas são buscadas uma única vez e o log é um resumo do lote.
+        Com `processos` > 1 e pelo menos `min_paralelo` perguntas distintas,
+        o lote é dividido entre processos.
+        """
+        perguntas = list(perguntas)
+        unicas = list(dict.fromkeys(perguntas))
+
+        if processos > 1 and len(unicas) >= min_paralelo:
+            resultados = self._match_paralelo(unicas, processos)
+        else:
+            resultados = [self._buscar(p, _sem_log, usar_cache=False) for p in unicas]
+
+        por_pergunta = dict(zip(unicas, resultados))
+        sem_match = sum(1 for r in resultados if r is None)
+        self._log(f"Lote processado: {len(perguntas)} perguntas ({len(unicas)} distintas, {sem_match} sem correspondência)")
+        return [por_pergunta[p] for p in perguntas]
+
+    def _match_paralelo(self, perguntas: List[str], processos: int) -> List[Optional[Dict[str, Any]]]:
+        tamanho = max(1, math.ceil(len(perguntas) / (processos * 4)))
+        blocos = [perguntas[i:i + tamanho] for i in range(0, len(perguntas), tamanho)]
+
+        estado = self._estado
+        intencoes = estado.base.intencoes
+        resultados: List[Optional[Dict[str, Any]]] = []
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_iniciar_worker,
+            initargs=(intencoes, estado.aprendidos.itens, self.backend),
+        ) as pool:
+            for bloco in pool.map(_match_bloco_worker, blocos):
+                for codificado in bloco:
+                    resultados.append(self._decodificar(intencoes, codificado))
+        return resultados
+
+    def _decodificar(self, intencoes: List[Dict[str, Any]], codificado: Optional[Tuple[str, Any]]) -> Optional[Dict[str, Any]]:
+        # Intenções voltam como índice para apontarem para os dicts deste processo
+        if codificado is None:
+            return None
+        tipo, valor = codificado
+        if tipo == "intent":
+            return {"tipo": "intent", "intencao": intencoes[valor]}
+        return {"tipo": "aprendido", "resposta": valor}
+
     def get_fallback_respostas(self, personalidade: str):
-        if not self._fallback_intencao:
+        fallback = self._estado.base.fallback
+        if not fallback:
             return [
                 "Eu não sei a resposta para essa pergunta.",
                 "Desculpe, não consegui processar isso."
             ]
-        return self._fallback_intencao.get("respostas", {}).get(personalidade, [
+        return fallback.get("respostas", {}).get(personalidade, [
             "Desculpe, não entendi."
-        ])
\ No newline at end of file
+        ])
+
+
+# --- Workers do match_many paralelo (precisam ser funções de módulo para o pickle) ---
+
+_worker_matcher: Optional[IntentMatcher] = None
+_worker_posicoes: Dict[int, int] = {}
+
+
+def _iniciar_worker(intencoes, aprendidos, backend):
+    global _worker_matcher, _worker_posicoes
+    _worker_matcher = IntentMatcher(intencoes, aprendidos, backend=backend)
+    _worker_posicoes = {id(i): n for n, i in enumerate(_worker_matcher.intencoes)}
+
+
+def _match_bloco_worker(perguntas: List[str]) -> List[Optional[Tuple[str, Any]]]:
+    saida = []
+    for pergunta in perguntas:
+        r = _worker_matcher._buscar(pergunta, _sem_log, usar_cache=False)
+        if r is None:
+            saida.append(None)
+        elif r["tipo"] == "intent":
+            saida.append(("intent", _worker_posicoes[id(r["intencao"])]))
+        else:
+            saida.append(("aprendido", r["resposta"]))
+    return saida
@@ -0,0 +1,100 @@
+import hashlib
+import mmap
+import pickle
+import struct
+import time
+from typing import Iterable, Optional
+
+from infra.file_atomic import AtomicWriter
+from infra.repositories import CoreRepo, LearnedRepo
+from core.intent_matcher import IntentMatcher
+
+# Cabeçalho: assinatura, versão do formato, backend e hash das fontes JSON.
+# Mude FORMATO sempre que o estado do IntentMatcher mudar de estrutura.
+ASSINATURA = b"EDKB"
+FORMATO = 6
+_CABECALHO = struct.Struct("<4sH16s32s")
+
+
+def hash_fontes(caminhos: Iterable[str]) -> bytes:
+    """SHA-256 do conteúdo dos arquivos fonte (arquivo ausente conta como vazio)."""
+    h = hashlib.sha256()
+    for caminho in caminhos:
+        try:
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+        except FileNotFoundError:
+            conteudo = b""
+        h.update(len(conteudo).to_bytes(8, "little"))
+        h.update(conteudo)
+    return h.digest()
+
+
+def compilar(core_path: str, learned_path: str, destino: str, backend: str = "difflib", logger=None) -> IntentMatcher:
+    """Constrói o IntentMatcher a partir dos JSON e grava o snapshot binário em `destino`."""
+    digest = hash_fontes((core_path, learned_path))
+    matcher = IntentMatcher(
+        intencoes=CoreRepo(core_path, logger=logger).load_intents(),
+        aprendidos=LearnedRepo(learned_path, logger=logger).load(),
+        logger=logger,
+        backend=backend,
+    )
+    cabecalho = _CABECALHO.pack(ASSINATURA, FORMATO, backend.encode("ascii"), digest)
+    corpo = pickle.dumps(matcher, protocol=pickle.HIGHEST_PROTOCOL)
+    AtomicWriter(logger=logger).write_bytes_atomic(destino, cabecalho + corpo)
+    return matcher
+
+
+def _ler_snapshot(caminho: str, backend: str, digest: bytes, logger=None) -> Optional[IntentMatcher]:
+    try:
+        with open(caminho, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < _CABECALHO.size:
+                return None
+            assinatura, formato, backend_gravado, digest_gravado = _CABECALHO.unpack_from(mm)
+            if (assinatura, formato, backend_gravado.rstrip(b"\0"), digest_gravado) != (
+                ASSINATURA, FORMATO, backend.encode("ascii"), digest
+            ):
+                if logger:
+                    logger.info(f"Snapshot desatualizado, recompilando: {caminho}")
+                return None
+            with memoryview(mm) as corpo:
+                return pickle.loads(corpo[_CABECALHO.size:])
+    except (FileNotFoundError, ValueError):
+        # ValueError: arquivo vazio (mmap de tamanho 0)
+        return None
+    except Exception as e:
+        if logger:
+            logger.error(f"Snapshot inválido em {caminho}: {e}")
+        return None
+
+
+def carregar(core_path: str, learned_path: str, snapshot_path: str, backend: str = "difflib", logger=None) -> IntentMatcher:
+    """
+    Carrega o IntentMatcher do snapshot compilado quando ele corresponde aos JSON
+    atuais (mesmo formato, backend e hash); senão recompila a partir dos JSON.
+    """
+    inicio = time.perf_counter()
+    matcher = _ler_snapshot(snapshot_path, backend, hash_fontes((core_path, learned_path)), logger)
+    origem = "snapshot"
+    if matcher is None:
+        matcher = compilar(core_path, learned_path, snapshot_path, backend=backend, logger=logger)
+        origem = "JSON"
+    matcher.logger = logger
+    if logger:
+        logger.info(f"Base de conhecimento carregada do {origem} em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    return matcher
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compila a base de conhecimento num snapshot binário.")
+    parser.add_argument("--core", default="data/core_data.json")
+    parser.add_argument("--learned", default="data/new_data.json")
+    parser.add_argument("--saida", default="data/kb_snapshot.bin")
+    parser.add_argument("--backend", default="difflib")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    compilar(args.core, args.learned, args.saida, backend=args.backend)
+    print(f"Snapshot gravado em {args.saida} ({(time.perf_counter() - inicio) * 1000:.1f} ms)")
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Marca "chave ausente" em get()
+AUSENTE = object()
+
+
+class LRUCache:
+    """
+    Cache LRU limitado por quantidade de itens, com TTL opcional.
+    Mantém contadores de acertos, faltas, remoções por capacidade/expiração e
+    invalidações para dimensionar o cache em produção.
+    """
+
+    def __init__(self, max_itens: int = 1024, ttl_seg: Optional[float] = None, relogio: Callable[[], float] = time.monotonic):
+        self.max_itens = max_itens
+        self.ttl_seg = ttl_seg
+        self._relogio = relogio
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirados = 0
+        self.invalidacoes = 0
+        self.descartados = 0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def get(self, chave: Hashable) -> Any:
+        """Devolve o valor ou `AUSENTE`."""
+        with self._lock:
+            item = self._itens.get(chave, AUSENTE)
+            if item is AUSENTE:
+                self.misses += 1
+                return AUSENTE
+
+            valor, expira_em = item
+            if expira_em is not None and self._relogio() >= expira_em:
+                del self._itens[chave]
+                self.expirados += 1
+                self.misses += 1
+                return AUSENTE
+
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def put(self, chave: Hashable, valor: Any):
+        if self.max_itens <= 0:
+            return
+        expira_em = self._relogio() + self.ttl_seg if self.ttl_seg else None
+        with self._lock:
+            self._itens[chave] = (valor, expira_em)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.evictions += 1
+
+    def remover(self, chave: Hashable):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            if self._itens:
+                self.invalidacoes += 1
+            self._itens.clear()
+
+    def descartar(self, predicado: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Remove os itens em que `predicado(chave, valor)` é verdadeiro (invalidação seletiva).
+        O predicado roda fora do lock, sobre uma cópia dos itens, para que um
+        predicado caro não bloqueie `get`/`put`; só itens que não mudaram
+        nesse meio tempo são removidos.
+        """
+        with self._lock:
+            itens = list(self._itens.items())
+        remover = [(k, item) for k, item in itens if predicado(k, item[0])]
+        removidos = 0
+        with self._lock:
+            for k, item in remover:
+                if self._itens.get(k) is item:
+                    del self._itens[k]
+                    removidos += 1
+            self.descartados += removidos
+        return removidos
+
+    def stats(self) -> Dict[str, Any]:
+        consultas = self.hits + self.misses
+        return {
+            "tamanho": len(self._itens),
+            "max_itens": self.max_itens,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / consultas if consultas > 0 else 0.0,
+            "evictions": self.evictions,
+            "expirados": self.expirados,
+            "invalidacoes": self.invalidacoes,
+            "descartados": self.descartados,
+        }
+
+
+class NegativeCache(LRUCache):
+    """
+    Conjunto LRU limitado de perguntas normalizadas que recentemente não
+    tiveram correspondência. Diferente de um filtro de Bloom, aceita remoção
+    seletiva quando um novo aprendizado pode passar a casar com elas.
+    """
+
+    def contains(self, chave: Hashable) -> bool:
+        return self.get(chave) is not AUSENTE
+
+    def add(self, chave: Hashable):
+        self.put(chave, True)
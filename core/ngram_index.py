@@ -0,0 +1,151 @@
+import heapq
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class ContadoresFiltro:
+    """
+    Contadores do pré-filtro em cascata: quantos candidatos entraram, quantos
+    cada estágio descartou e quantos chegaram aprovados ao final.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.avaliados = 0
+        self.aprovados = 0
+        self.podados: Dict[str, int] = {}
+
+    def podar(self, estagio: str, quantidade: int = 1):
+        if quantidade:
+            self.podados[estagio] = self.podados.get(estagio, 0) + quantidade
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"avaliados": self.avaliados, "aprovados": self.aprovados, "podados": dict(self.podados)}
+
+
+class NgramIndex:
+    """
+    Índice invertido de n-gramas de caracteres para a busca FUZZY.
+
+    Devolve exatamente o mesmo resultado de `difflib.get_close_matches`, mas só
+    calcula o `SequenceMatcher.ratio()` dos candidatos que ainda podem atingir o
+    cutoff. Os demais passam por uma cascata de limites que nunca erram, do mais
+    barato ao mais caro, cada um com seu contador em `contadores`:
+      - tamanho: ratio <= 2*min(la, lb)/(la + lb)
+      - ngramas: se ratio >= cutoff, os blocos casados preservam um número
+        mínimo de n-gramas (ver `_minimo_comum`)
+      - real_quick_ratio / quick_ratio / ratio do SequenceMatcher
+    """
+
+    def __init__(self, textos: Iterable[str] = (), q: int = 2, contadores: Optional[ContadoresFiltro] = None):
+        self.q = q
+        self.contadores = contadores or ContadoresFiltro()
+        self._textos: List[str] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._por_tamanho: Dict[int, List[int]] = {}
+        for texto in textos:
+            self.add(texto)
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    def copia(self) -> "NgramIndex":
+        """Cópia independente (copy-on-write): `add` na cópia não altera este índice."""
+        novo = NgramIndex(q=self.q, contadores=self.contadores)
+        novo._textos = list(self._textos)
+        novo._postings = {g: list(p) for g, p in self._postings.items()}
+        novo._por_tamanho = {n: list(idx) for n, idx in self._por_tamanho.items()}
+        return novo
+
+    def _ngramas(self, texto: str) -> Counter:
+        q = self.q
+        return Counter(texto[i:i + q] for i in range(len(texto) - q + 1))
+
+    def add(self, texto: str) -> int:
+        """Indexa `texto` e devolve sua posição."""
+        idx = len(self._textos)
+        self._textos.append(texto)
+        self._por_tamanho.setdefault(len(texto), []).append(idx)
+        for grama, qtd in self._ngramas(texto).items():
+            self._postings.setdefault(grama, []).append((idx, qtd))
+        return idx
+
+    def _minimo_comum(self, la: int, lb: int, cutoff: float) -> int:
+        """
+        Menor quantidade de n-gramas em comum compatível com ratio >= cutoff.
+        Com M caracteres casados, cada caractere não casado destrói no máximo q
+        n-gramas e cada quebra entre blocos no máximo q-1.
+        """
+        q = self.q
+        m = int(cutoff * (la + lb) / 2)  # arredonda para baixo: limite conservador
+        lado_a = (la - q + 1) - q * (la - m) - (q - 1) * (lb - m)
+        lado_b = (lb - q + 1) - q * (lb - m) - (q - 1) * (la - m)
+        return max(lado_a, lado_b)
+
+    def _janela(self, la: int, cutoff: float) -> Tuple[int, int]:
+        if cutoff <= 0:
+            return 0, max(self._por_tamanho, default=0)
+        # 2*min(la, lb)/(la + lb) >= cutoff
+        lo = int(la * cutoff / (2 - cutoff))
+        hi = int(la * (2 - cutoff) / cutoff) + 1
+        return lo, hi
+
+    def candidatos(self, consulta: str, cutoff: float) -> List[int]:
+        """Posições que podem atingir `cutoff`, em ordem de inserção."""
+        la = len(consulta)
+        lo, hi = self._janela(la, cutoff)
+
+        comuns: Dict[int, int] = {}
+        for grama, qtd in self._ngramas(consulta).items():
+            for idx, qtd_cand in self._postings.get(grama, ()):
+                comuns[idx] = comuns.get(idx, 0) + min(qtd, qtd_cand)
+
+        escolhidos = set()
+        minimos: Dict[int, int] = {}
+        na_janela = 0
+        for lb in range(lo, hi + 1):
+            if lb not in self._por_tamanho:
+                continue
+            na_janela += len(self._por_tamanho[lb])
+            minimo = self._minimo_comum(la, lb, cutoff)
+            if minimo <= 0:
+                escolhidos.update(self._por_tamanho[lb])
+            else:
+                minimos[lb] = minimo
+
+        for idx, qtd in comuns.items():
+            minimo = minimos.get(len(self._textos[idx]))
+            if minimo is not None and qtd >= minimo:
+                escolhidos.add(idx)
+
+        c = self.contadores
+        c.avaliados += len(self._textos)
+        c.podar("tamanho", len(self._textos) - na_janela)
+        c.podar("ngramas", na_janela - len(escolhidos))
+        return sorted(escolhidos)
+
+    def close_matches(self, consulta: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """Equivalente a `get_close_matches(consulta, textos, n, cutoff)`."""
+        resultado = []
+        c = self.contadores
+        s = SequenceMatcher()
+        s.set_seq2(consulta)
+        for idx in self.candidatos(consulta, cutoff):
+            x = self._textos[idx]
+            s.set_seq1(x)
+            if s.real_quick_ratio() < cutoff:
+                c.podar("real_quick_ratio")
+            elif s.quick_ratio() < cutoff:
+                c.podar("quick_ratio")
+            else:
+                score = s.ratio()
+                if score < cutoff:
+                    c.podar("ratio")
+                else:
+                    c.aprovados += 1
+                    resultado.append((score, x))
+        resultado = heapq.nlargest(n, resultado)
+        return [x for score, x in resultado]
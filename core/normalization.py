@@ -0,0 +1,49 @@
+import re
+import unicodedata
+from typing import FrozenSet, Tuple
+
+# Pontuação de frase vira espaço. Símbolos matemáticos (+ - * / = ^ % < >)
+# são mantidos: "2+2" e "2-2" não podem virar a mesma pergunta.
+PONTUACAO = ".,;:!?¿¡\"'`´()[]{}«»“”‘’…"
+
+# Tabela única para str.translate: remove marcas combinantes (acentos após NFKD)
+# e troca pontuação por espaço, tudo numa só passada em C.
+_TABELA = {cp: None for cp in range(0x0300, 0x0370)}
+_TABELA.update({ord(c): " " for c in PONTUACAO})
+
+_NUMEROS = re.compile(r"\d+")
+
+
+def normalizar(texto: str) -> str:
+    """
+    Forma canônica usada em índices e caches:
+    minúsculas, sem acentos (NFKD), sem pontuação e com espaços colapsados.
+    Ex.: "  Olá, tudo bem?? " -> "ola tudo bem"
+    """
+    return " ".join(unicodedata.normalize("NFKD", texto or "").translate(_TABELA).casefold().split())
+
+
+def numeros(norm: str) -> Tuple[str, ...]:
+    """Números presentes no texto, em ordem. Ex.: "quanto e 2+2" -> ("2", "2")"""
+    return tuple(_NUMEROS.findall(norm))
+
+
+class Consulta:
+    """
+    Pergunta do usuário pré-processada uma única vez e reaproveitada por todas
+    as etapas do matcher e pelos caches:
+      - original: texto como digitado (busca EXATA case-sensitive)
+      - norm: forma de `normalizar` (chave de índices e caches)
+      - tokens: conjunto de palavras de `norm` (Jaccard)
+      - numeros: números de `norm`, em ordem (ver `numeros`)
+    """
+    __slots__ = ("original", "norm", "tokens", "numeros")
+
+    def __init__(self, original: str):
+        self.original = original or ""
+        self.norm = normalizar(self.original)
+        self.tokens: FrozenSet[str] = frozenset(self.norm.split())
+        self.numeros = numeros(self.norm)
+
+    def __repr__(self) -> str:
+        return f"Consulta({self.original!r})"
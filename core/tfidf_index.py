@@ -0,0 +1,211 @@
+import heapq
+import math
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.ngram_index import ContadoresFiltro
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: só o backend "tfidf" depende dele
+    np = None
+
+
+class TfidfIndex:
+    """
+    Backend vetorizado para a busca FUZZY (alternativa ao NgramIndex).
+
+    Cada pergunta vira uma linha de uma matriz esparsa TF-IDF de n-gramas de
+    caracteres (formato COO em arrays NumPy). Uma consulta é pontuada contra
+    todas as linhas com um único produto matriz-vetor (similaridade de
+    cosseno); só os `top_k` mais próximos passam pelo SequenceMatcher, que
+    aplica o mesmo cutoff do `difflib.get_close_matches`.
+    A matriz é compilada no construtor e a cada `add`, antes de o índice ser
+    publicado: consultas só leem, então um índice compartilhado entre threads
+    nunca é alterado por uma busca.
+    """
+
+    def __init__(self, textos: Iterable[str] = (), ngramas: Tuple[int, int] = (2, 3), top_k: int = 10,
+                 contadores: Optional[ContadoresFiltro] = None):
+        if np is None:
+            raise ImportError("O backend 'tfidf' requer numpy (pip install numpy)")
+        self.ngramas = ngramas
+        self.top_k = top_k
+        self.contadores = contadores or ContadoresFiltro()
+        self._textos: List[str] = []
+        self._contagens: List[Counter] = []
+        self._vocab: Dict[str, int] = {}
+        self._df: List[int] = []
+        self._matriz: Tuple[Any, Any, Any, Any]  # (linhas, colunas, pesos, idf)
+        for texto in textos:
+            self._indexar(texto)
+        self._compilar()
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    def copia(self) -> "TfidfIndex":
+        """Cópia independente (copy-on-write): `add` na cópia não altera este índice."""
+        novo = TfidfIndex(ngramas=self.ngramas, top_k=self.top_k, contadores=self.contadores)
+        novo._textos = list(self._textos)
+        novo._contagens = list(self._contagens)
+        novo._vocab = dict(self._vocab)
+        novo._df = list(self._df)
+        novo._matriz = self._matriz
+        return novo
+
+    def _ngramas(self, texto: str) -> Counter:
+        texto = f" {texto} "
+        minimo, maximo = self.ngramas
+        return Counter(
+            texto[i:i + q]
+            for q in range(minimo, maximo + 1)
+            for i in range(len(texto) - q + 1)
+        )
+
+    def add(self, texto: str) -> int:
+        """Indexa `texto`, recompila a matriz e devolve a posição."""
+        idx = self._indexar(texto)
+        self._compilar()
+        return idx
+
+    def _indexar(self, texto: str) -> int:
+        idx = len(self._textos)
+        contagem = self._ngramas(texto)
+        self._textos.append(texto)
+        self._contagens.append(contagem)
+        for grama in contagem:
+            col = self._vocab.get(grama)
+            if col is None:
+                self._vocab[grama] = len(self._df)
+                self._df.append(1)
+            else:
+                self._df[col] += 1
+        return idx
+
+    def _compilar(self):
+        linhas, colunas, tf = [], [], []
+        for i, contagem in enumerate(self._contagens):
+            for grama, qtd in contagem.items():
+                linhas.append(i)
+                colunas.append(self._vocab[grama])
+                tf.append(qtd)
+
+        n_docs = len(self._textos)
+        linhas = np.asarray(linhas, dtype=np.int64)
+        colunas = np.asarray(colunas, dtype=np.int64)
+        idf = np.log((1 + n_docs) / (1 + np.asarray(self._df, dtype=np.float64))) + 1.0
+        pesos = np.asarray(tf, dtype=np.float64) * idf[colunas]
+
+        normas = np.sqrt(np.bincount(linhas, weights=pesos * pesos, minlength=n_docs))
+        normas[normas == 0] = 1.0
+        pesos /= normas[linhas]
+        self._matriz = (linhas, colunas, pesos, idf)
+
+    def pontuar(self, consulta: str):
+        """Similaridade de cosseno da consulta contra todas as perguntas indexadas."""
+        linhas, colunas, pesos, idf = self._matriz
+
+        vetor = np.zeros(len(self._df), dtype=np.float64)
+        for grama, qtd in self._ngramas(consulta).items():
+            col = self._vocab.get(grama)
+            if col is not None:
+                vetor[col] = qtd * idf[col]
+        norma = math.sqrt(float(vetor @ vetor))
+        if norma > 0:
+            vetor /= norma
+
+        return np.bincount(linhas, weights=pesos * vetor[colunas], minlength=len(self._textos))
+
+    def close_matches(self, consulta: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """Mesmo contrato de `get_close_matches`, restrito aos `top_k` por cosseno."""
+        if not self._textos:
+            return []
+        scores = self.pontuar(consulta)
+        k = min(self.top_k, len(scores))
+        topo = [idx for idx in np.argpartition(-scores, k - 1)[:k] if scores[idx] > 0]
+
+        c = self.contadores
+        c.avaliados += len(scores)
+        c.podar("cosseno", len(scores) - len(topo))
+
+        resultado = []
+        s = SequenceMatcher()
+        s.set_seq2(consulta)
+        for idx in topo:
+            x = self._textos[idx]
+            s.set_seq1(x)
+            if s.real_quick_ratio() < cutoff:
+                c.podar("real_quick_ratio")
+            elif s.quick_ratio() < cutoff:
+                c.podar("quick_ratio")
+            else:
+                score = s.ratio()
+                if score < cutoff:
+                    c.podar("ratio")
+                else:
+                    c.aprovados += 1
+                    resultado.append((score, x))
+        resultado = heapq.nlargest(n, resultado)
+        return [x for score, x in resultado]
+
+
+def _descrever(resultado: Optional[Dict[str, Any]]) -> str:
+    if resultado is None:
+        return "fallback"
+    if resultado["tipo"] == "intent":
+        return f"intent:{resultado['intencao'].get('tag')}"
+    return f"aprendido:{resultado['resposta']}"
+
+
+def relatorio_concordancia(referencia, candidato, perguntas: Iterable[str]) -> Dict[str, Any]:
+    """
+    Compara dois IntentMatcher (ex.: backend "difflib" x "tfidf") pergunta a pergunta.
+    Retorna totais, taxa de concordância e a lista de divergências.
+    """
+    total = 0
+    divergencias = []
+    for pergunta in perguntas:
+        total += 1
+        esperado = _descrever(referencia.match(pergunta))
+        obtido = _descrever(candidato.match(pergunta))
+        if esperado != obtido:
+            divergencias.append({"pergunta": pergunta, "referencia": esperado, "candidato": obtido})
+
+    concordancias = total - len(divergencias)
+    return {
+        "total": total,
+        "concordancias": concordancias,
+        "taxa_concordancia": concordancias / total if total > 0 else 1.0,
+        "divergencias": divergencias,
+    }
+
+
+if __name__ == "__main__":
+    import os
+
+    from infra.repositories import CoreRepo, LearnedRepo, HistoryRepo, JsonlHistoryRepo
+    from core.intent_matcher import IntentMatcher
+
+    intencoes = CoreRepo('data/core_data.json').load_intents()
+    aprendidos = LearnedRepo('data/new_data.json').load()
+
+    perguntas = [p for i in intencoes for p in i.get("perguntas", [])]
+    perguntas += [d.get("pergunta", "") for d in aprendidos]
+    # Só leitura: sem `legado`, o JsonlHistoryRepo não importa nem grava nada
+    if os.path.exists('data/historico.jsonl'):
+        historico = JsonlHistoryRepo('data/historico.jsonl').load_last(n=10_000)
+    else:
+        historico = HistoryRepo('data/historico.json').load_last(n=10_000)
+    perguntas += [h.get("pergunta", "") for h in historico]
+
+    relatorio = relatorio_concordancia(
+        IntentMatcher(intencoes, aprendidos, backend="difflib"),
+        IntentMatcher(intencoes, aprendidos, backend="tfidf"),
+        perguntas,
+    )
+    print(f"Concordância difflib x tfidf: {relatorio['concordancias']}/{relatorio['total']} "
+          f"({relatorio['taxa_concordancia']:.1%})")
+    for d in relatorio["divergencias"]:
+        print(f"  - '{d['pergunta']}': difflib={d['referencia']} tfidf={d['candidato']}")
@@ -2,13 +2,16 @@ import re
 import codecs
 from typing import Optional
 
+from core.normalization import Consulta
+
 CONTROL_CHAR_REGEX = re.compile(r'[\x00-\x1f\x7f-\x9f]')
 
 MAX_INPUT_LEN = 1000
 
-def validate_input(texto: Optional[str], logger=None) -> bool:
+def preprocessar(texto: Optional[str], logger=None) -> Optional[Consulta]:
     """
-    Validação robusta de entrada para prevenir abusos/ataques.
+    Valida e normaliza a entrada numa única etapa.
+    Retorna a `Consulta` pronta para o matcher, ou None se a entrada for rejeitada.
     Regras (iguais às do código original):
       1) Não aceitar vazio/whitespace
       2) Rejeitar textos com mais de MAX_INPUT_LEN caracteres
@@ -16,24 +19,30 @@ def validate_input(texto: Optional[str], logger=None) -> bool:
       4) Rejeitar se houver caracteres de controle após a decodificação
     """
     if not texto or len(texto.strip()) == 0:
-        return False
+        return None
 
     if len(texto) > MAX_INPUT_LEN:
         if logger:
             logger.warning(f"Entrada muito longa rejeitada: {len(texto)} caracteres")
-        return False
+        return None
 
     try:
-        texto_decodificado = codecs.decode(texto, 'unicode_escape')
+        # Caracteres fora do latin-1 viram \uXXXX antes do decode, para que acentos
+        # ("ç", "ã") não sejam reinterpretados byte a byte como caracteres de controle
+        texto_decodificado = codecs.decode(texto.encode('latin-1', 'backslashreplace'), 'unicode_escape')
     except UnicodeDecodeError:
         if logger:
             logger.warning("Entrada com sequência de escape inválida rejeitada.")
-        return False
+        return None
 
     # Verifica caracteres de controle
     if CONTROL_CHAR_REGEX.search(texto_decodificado):
         if logger:
             logger.warning("Entrada com caracteres de controle rejeitada")
-        return False
+        return None
 
-    return True
\ No newline at end of file
+    return Consulta(texto)
+
+def validate_input(texto: Optional[str], logger=None) -> bool:
+    """Validação robusta de entrada para prevenir abusos/ataques (ver `preprocessar`)."""
+    return preprocessar(texto, logger) is not None
@@ -0,0 +1,286 @@
+"""
+Relatórios sobre o histórico persistido, em uma passada e com memória constante.
+
+    python -m infra.analytics                      # data/historico.jsonl + data/historico_arquivo
+    python -m infra.analytics data/historico_arquivo --workers 4 --top 20 --json
+    python -m infra.analytics data/historico.json  # só sem .jsonl (legado ainda não importado)
+
+Aceita historico.json (lista JSON, lida de forma incremental), .jsonl,
+.jsonl.gz (segmentos do ArquivoHistorico) e diretórios. Num diretório só
+entram `historico*.jsonl[.N]` e segmentos `*.jsonl.gz`: os demais JSON de
+data/ não são histórico, e o historico.json legado já foi importado para o
+.jsonl pelo app (contá-lo de novo duplicaria as entradas).
+Com `--workers`, os arquivos são divididos entre processos e os parciais
+combinados no fim.
+"""
+import gzip
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.normalization import normalizar
+from .sketches import SpaceSaving
+
+BLOCO_LEITURA = 64 * 1024
+
+# Histórico atual + arquivo completo (os segmentos rotacionados .jsonl.N também estão no arquivo)
+CAMINHOS_PADRAO = ["data/historico.jsonl", "data/historico_arquivo"]
+
+# Limites superiores (ms) do histograma de latência: 1, 2, 4, ... ~ 9 min; memória fixa por personalidade
+LIMITES_LATENCIA_MS = [2 ** i for i in range(20)]
+
+
+def _itens_array_json(f) -> Iterator[Dict[str, Any]]:
+    """Objetos de uma lista JSON (`[{...}, {...}]`) lidos um a um, sem carregar o arquivo inteiro."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    inicio = True
+    fim_arquivo = False
+    while True:
+        # Pula espaços, a abertura da lista e vírgulas entre objetos
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == "," or (inicio and buffer[pos] == "[")):
+            inicio = inicio and buffer[pos] != "["
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer):
+            try:
+                item, fim = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if fim_arquivo:
+                    raise
+            else:
+                yield item
+                pos = fim
+                continue
+        if fim_arquivo:
+            return
+        bloco = f.read(BLOCO_LEITURA)
+        fim_arquivo = not bloco
+        buffer = buffer[pos:] + bloco
+        pos = 0
+
+
+def _abrir(caminho: str):
+    if caminho.endswith(".gz"):
+        return gzip.open(caminho, "rt", encoding="utf-8")
+    return open(caminho, "r", encoding="utf-8")
+
+
+def ler_entradas(caminho: str) -> Iterator[Dict[str, Any]]:
+    """Entradas de um arquivo de histórico, em streaming; linhas inválidas são ignoradas."""
+    with _abrir(caminho) as f:
+        if caminho.endswith(".json"):
+            yield from _itens_array_json(f)
+            return
+        for linha in f:
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                continue
+
+
+def expandir_caminhos(caminhos: Iterable[str]) -> List[str]:
+    """Arquivos a processar: diretórios viram seus historico*.jsonl (e rotações .N) e segmentos .jsonl.gz, em ordem."""
+    arquivos: List[str] = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for nome in sorted(os.listdir(caminho)):
+                completo = os.path.join(caminho, nome)
+                if os.path.isfile(completo) and _e_historico(nome):
+                    arquivos.append(completo)
+        elif os.path.exists(caminho):
+            arquivos.append(caminho)
+    return arquivos
+
+
+def _e_historico(nome: str) -> bool:
+    if nome.endswith(".jsonl.gz"):
+        return True
+    if not nome.startswith("historico"):
+        return False
+    base, _, sufixo = nome.rpartition(".")
+    return nome.endswith(".jsonl") or (base.endswith(".jsonl") and sufixo.isdigit())
+
+
+class Acumulador:
+    """
+    Métricas combináveis de um fluxo de interações. Memória fixa: perguntas
+    num SpaceSaving, fallbacks em 24 faixas de hora (UTC), latência em
+    histograma por personalidade; tags e personalidades são conjuntos pequenos.
+    """
+
+    def __init__(self, capacidade_top: int = 1000):
+        self.total = 0
+        self.fallbacks = 0
+        self.perguntas = SpaceSaving(capacidade_top)
+        self.por_hora = [[0, 0] for _ in range(24)]  # [interações, fallbacks]
+        self.tags: Counter = Counter()
+        self.latencia: Dict[str, Dict[str, Any]] = {}
+        self.invalidas = 0
+
+    def adicionar(self, entrada: Dict[str, Any]):
+        self.total += 1
+        fallback = bool(entrada.get("is_fallback"))
+        self.fallbacks += fallback
+        pergunta = normalizar(str(entrada.get("pergunta") or ""))
+        if pergunta:
+            self.perguntas.add(pergunta)
+        self.tags[entrada.get("tag_intencao") or "sem_tag"] += 1
+
+        try:
+            ts_in = datetime.fromisoformat(str(entrada.get("timestamp_in")).replace("Z", "+00:00"))
+            ts_out = datetime.fromisoformat(str(entrada.get("timestamp_out")).replace("Z", "+00:00"))
+            latencia_ms = (ts_out - ts_in).total_seconds() * 1000
+        except (ValueError, TypeError):
+            # TypeError: um timestamp com fuso e outro sem
+            self.invalidas += 1
+            return
+        hora = (ts_in if ts_in.tzinfo is None else ts_in.astimezone(timezone.utc)).hour
+        self.por_hora[hora][0] += 1
+        self.por_hora[hora][1] += fallback
+        self._latencia(entrada.get("personalidade") or "desconhecida", latencia_ms)
+
+    def _latencia(self, personalidade: str, ms: float):
+        lat = self.latencia.get(personalidade)
+        if lat is None:
+            lat = self.latencia[personalidade] = {
+                "n": 0, "soma_ms": 0.0, "max_ms": 0.0, "histograma": [0] * (len(LIMITES_LATENCIA_MS) + 1),
+            }
+        ms = max(ms, 0.0)
+        lat["n"] += 1
+        lat["soma_ms"] += ms
+        lat["max_ms"] = max(lat["max_ms"], ms)
+        faixa = next((i for i, limite in enumerate(LIMITES_LATENCIA_MS) if ms <= limite), len(LIMITES_LATENCIA_MS))
+        lat["histograma"][faixa] += 1
+
+    def combinar(self, outro: "Acumulador") -> "Acumulador":
+        self.total += outro.total
+        self.fallbacks += outro.fallbacks
+        self.invalidas += outro.invalidas
+        self.perguntas.combinar(outro.perguntas)
+        for hora in range(24):
+            self.por_hora[hora][0] += outro.por_hora[hora][0]
+            self.por_hora[hora][1] += outro.por_hora[hora][1]
+        self.tags.update(outro.tags)
+        for pers, lat in outro.latencia.items():
+            atual = self.latencia.get(pers)
+            if atual is None:
+                self.latencia[pers] = lat
+                continue
+            atual["n"] += lat["n"]
+            atual["soma_ms"] += lat["soma_ms"]
+            atual["max_ms"] = max(atual["max_ms"], lat["max_ms"])
+            atual["histograma"] = [a + b for a, b in zip(atual["histograma"], lat["histograma"])]
+        return self
+
+    @staticmethod
+    def _percentil(histograma: List[int], n: int, p: float) -> Optional[float]:
+        """Limite superior da faixa do histograma que contém o percentil `p`."""
+        if n == 0:
+            return None
+        alvo = p * n
+        acumulado = 0
+        for i, quantidade in enumerate(histograma):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return float(LIMITES_LATENCIA_MS[i]) if i < len(LIMITES_LATENCIA_MS) else None
+        return None
+
+    def relatorio(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "fallbacks": self.fallbacks,
+            "taxa_fallback": self.fallbacks / self.total if self.total else 0.0,
+            "top_perguntas": [
+                {"pergunta": p, "contagem": int(c), "erro_max": int(e)} for p, c, e in self.perguntas.top(top)
+            ],
+            "fallback_por_hora": {
+                f"{hora:02d}": {"interacoes": n, "fallbacks": fb, "taxa": fb / n if n else 0.0}
+                for hora, (n, fb) in enumerate(self.por_hora) if n
+            },
+            "latencia_por_personalidade": {
+                pers: {
+                    "n": lat["n"],
+                    "media_ms": lat["soma_ms"] / lat["n"],
+                    "p50_ms": self._percentil(lat["histograma"], lat["n"], 0.50),
+                    "p95_ms": self._percentil(lat["histograma"], lat["n"], 0.95),
+                    "max_ms": lat["max_ms"],
+                }
+                for pers, lat in sorted(self.latencia.items())
+            },
+            "tags": {
+                tag: {"contagem": n, "perc": n / self.total * 100} for tag, n in self.tags.most_common()
+            },
+            "entradas_sem_timestamp": self.invalidas,
+        }
+
+
+def processar_arquivo(caminho: str, capacidade_top: int = 1000) -> Acumulador:
+    acumulador = Acumulador(capacidade_top)
+    for entrada in ler_entradas(caminho):
+        acumulador.adicionar(entrada)
+    return acumulador
+
+
+def analisar(caminhos: Iterable[str], workers: int = 1, capacidade_top: int = 1000) -> Acumulador:
+    """Uma passada sobre todos os arquivos; com `workers > 1`, um arquivo por tarefa em processos separados."""
+    arquivos = expandir_caminhos(caminhos)
+    total = Acumulador(capacidade_top)
+    if workers > 1 and len(arquivos) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for parcial in executor.map(processar_arquivo, arquivos, [capacidade_top] * len(arquivos)):
+                total.combinar(parcial)
+    else:
+        for caminho in arquivos:
+            for entrada in ler_entradas(caminho):
+                total.adicionar(entrada)
+    return total
+
+
+def formatar(relatorio: Dict[str, Any]) -> str:
+    linhas = [
+        "==== Análise do Histórico ====",
+        f"Interações: {relatorio['total']}  |  Fallbacks: {relatorio['fallbacks']} ({relatorio['taxa_fallback']:.1%})",
+        "",
+        "Perguntas mais frequentes:",
+    ]
+    for item in relatorio["top_perguntas"]:
+        erro = f" (±{item['erro_max']})" if item["erro_max"] else ""
+        linhas.append(f"  {item['contagem']:>6}{erro}  {item['pergunta']}")
+    linhas += ["", "Taxa de fallback por hora (UTC):"]
+    for hora, h in relatorio["fallback_por_hora"].items():
+        linhas.append(f"  {hora}h  {h['taxa']:6.1%}  ({h['fallbacks']}/{h['interacoes']})")
+    linhas += ["", "Latência por personalidade (ms):"]
+    for pers, lat in relatorio["latencia_por_personalidade"].items():
+        p50 = f"{lat['p50_ms']:.0f}" if lat["p50_ms"] is not None else "-"
+        p95 = f"{lat['p95_ms']:.0f}" if lat["p95_ms"] is not None else "-"
+        linhas.append(f"  {pers}: n={lat['n']} média={lat['media_ms']:.1f} p50<={p50} p95<={p95} máx={lat['max_ms']:.1f}")
+    linhas += ["", "Distribuição de tags:"]
+    for tag, t in relatorio["tags"].items():
+        linhas.append(f"  {tag}: {t['contagem']} ({t['perc']:.1f}%)")
+    return "\n".join(linhas) + "\n"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Relatórios sobre o histórico de interações (uma passada, memória constante).")
+    parser.add_argument("caminhos", nargs="*", default=CAMINHOS_PADRAO)
+    parser.add_argument("--top", type=int, default=10, help="quantidade de perguntas no ranking")
+    parser.add_argument("--capacidade", type=int, default=1000, help="perguntas distintas acompanhadas (memória)")
+    parser.add_argument("--workers", type=int, default=1, help="processos para dividir os arquivos")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args()
+
+    resultado = analisar(args.caminhos, workers=args.workers, capacidade_top=args.capacidade).relatorio(top=args.top)
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    else:
+        print(formatar(resultado), end="")
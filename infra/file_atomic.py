@@ -1,21 +1,223 @@
 import os
 import json
 import shutil
-from typing import Any, Optional
+import atexit
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+MODOS = ("seguro", "rapido")
+POLITICAS = ("none", "batch", "always")
+
+# Permissão de arquivo novo (0666 & ~umask), lida uma vez: mkstemp cria com 0600
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def fsync_diretorio(path: str):
+    """Persiste a entrada de diretório de `path` (o rename) no disco. Ignorado onde não é suportado."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _criar_tmp(path: str):
+    """
+    Cria um tmp de nome único no diretório de `path` e devolve (fd, caminho).
+    Escritores concorrentes do mesmo arquivo (ex.: vários workers) não dividem
+    o tmp; o último rename vence, mas nunca com um arquivo pela metade.
+    """
+    diretorio, nome = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{nome}.", suffix=".tmp", dir=diretorio)
+    try:
+        os.chmod(tmp, 0o666 & ~_UMASK)
+    except OSError:
+        pass
+    return fd, tmp
+
+
+def _remover_tmp(tmp: Optional[str]):
+    if tmp is not None and os.path.exists(tmp):
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+
+def fsync_arquivo(path: str):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+class Durabilidade:
+    """
+    Política de fsync de um repositório:
+      - "none": nenhum fsync (o SO decide quando gravar; dados descartáveis).
+        Uma queda logo após um tmp + rename pode deixar o arquivo vazio ou truncado
+      - "batch": o conteúdo do tmp passa por fsync antes do rename (o arquivo
+        nunca fica vazio/parcial: depois de uma queda vale a versão antiga ou a
+        nova); o fsync do diretório e o dos arquivos escritos em append são
+        agrupados, no máximo um a cada `intervalo_ms`, então uma escrita fica
+        no máximo `intervalo_ms` sem estar no disco
+      - "always": fsync a cada escrita (arquivo e diretório)
+    """
+
+    def __init__(self, politica: str = "always", intervalo_ms: int = 1000, logger: Optional[object] = None):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de durabilidade desconhecida: {politica} (opções: {', '.join(POLITICAS)})")
+        self.politica = politica
+        self.intervalo_ms = intervalo_ms
+        self.logger = logger
+        self._pendentes: Dict[str, bool] = {}  # path -> falta o fsync do conteúdo (append)
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._ultimo_sync = 0.0
+        self._atexit = False
+        self.fsyncs = 0
+
+    @property
+    def imediata(self) -> bool:
+        return self.politica == "always"
+
+    @property
+    def sincroniza_tmp(self) -> bool:
+        """Se o tmp passa por fsync antes do rename ("batch" e "always")."""
+        return self.politica != "none"
+
+    def fsync_fd(self, fd: int):
+        """fsync do arquivo ainda aberto (política "always")."""
+        os.fsync(fd)
+        self.fsyncs += 1
+
+    def apos_escrita(self, path: str, rename: bool = True):
+        """
+        Chamado depois que `path` foi escrito (`rename=True`: via tmp + rename).
+        Com rename, o conteúdo já passou por `fsync_fd` ("always" e "batch");
+        falta o diretório, agora ("always") ou em grupo ("batch").
+        """
+        if self.politica == "always":
+            if rename:
+                fsync_diretorio(path)
+                self.fsyncs += 1
+        elif self.politica == "batch":
+            self._agendar(path, conteudo=not rename)
+
+    def _agendar(self, path: str, conteudo: bool = True):
+        with self._lock:
+            self._pendentes[path] = self._pendentes.get(path, False) or conteudo
+            if not self._atexit:
+                atexit.register(self.sincronizar)
+                self._atexit = True
+            if (time.monotonic() - self._ultimo_sync) * 1000 < self.intervalo_ms:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.intervalo_ms / 1000, self.sincronizar)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.sincronizar()
+
+    def sincronizar(self):
+        """fsync de todos os arquivos pendentes (e seus diretórios)."""
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._ultimo_sync = time.monotonic()
+        por_diretorio = {}
+        for path, conteudo in pendentes.items():
+            try:
+                if conteudo:
+                    fsync_arquivo(path)
+                    self.fsyncs += 1
+            except FileNotFoundError:
+                continue  # rotacionado/removido depois da escrita
+            except OSError as e:
+                if self.logger:
+                    self.logger.error(f"Erro no fsync de {path}: {e}")
+            por_diretorio[os.path.dirname(os.path.abspath(path))] = path
+        for path in por_diretorio.values():
+            fsync_diretorio(path)
+            self.fsyncs += 1
+
 
 class AtomicWriter:
-    """Escrita atômica com backup/rollback para JSON (UTF-8)."""
-    def __init__(self, logger: Optional[object] = None):
+    """
+    Escrita atômica para JSON (UTF-8), em dois modos:
+      - "seguro" (padrão): backup, dupla validação do JSON e rollback
+      - "rapido": serializa uma vez, grava o tmp, fsync, rename e fsync do
+        diretório; a atomicidade vem do rename. Com `checksum=True`, o tmp é
+        relido e comparado byte a byte com o conteúdo serializado (detecta
+        escrita curta/corrompida) em vez de ser re-parseado.
+    `durabilidade` define quando há fsync (ver Durabilidade). Sem ela, o modo
+    seguro não faz fsync e o rápido faz fsync a cada escrita.
+    """
+    def __init__(self, logger: Optional[object] = None, modo: str = "seguro", checksum: bool = False,
+                 durabilidade: Optional[Durabilidade] = None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de escrita desconhecido: {modo} (opções: {', '.join(MODOS)})")
         self.logger = logger
+        self.modo = modo
+        self.checksum = checksum
+        if durabilidade is None and modo == "rapido":
+            durabilidade = Durabilidade("always", logger=logger)
+        self.durabilidade = durabilidade
+
+    def _sync_tmp(self, f):
+        # O conteúdo precisa estar no disco antes do rename; só o diretório pode esperar
+        if self.durabilidade is not None and self.durabilidade.sincroniza_tmp:
+            f.flush()
+            self.durabilidade.fsync_fd(f.fileno())
+
+    def _apos_rename(self, path: str):
+        if self.durabilidade is not None:
+            self.durabilidade.apos_escrita(path)
 
     def _log(self, level: str, msg: str):
         if self.logger:
             getattr(self.logger, level)(msg)
 
     def write_json_atomic(self, path: str, data: Any, ensure_ascii: bool = False, indent: int = 2) -> bool:
-        """Escrita atômica com backup/rollback para JSON (UTF-8)."""
+        """Escrita atômica de JSON (UTF-8) no modo configurado."""
+        if self.modo == "rapido":
+            return self._write_json_rapido(path, data, ensure_ascii, indent)
+        return self._write_json_seguro(path, data, ensure_ascii, indent)
+
+    def _write_json_rapido(self, path: str, data: Any, ensure_ascii: bool, indent: int) -> bool:
+        tmp = None
+        try:
+            conteudo = json.dumps(data, ensure_ascii=ensure_ascii, indent=indent).encode('utf-8')
+            fd, tmp = _criar_tmp(path)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(conteudo)
+                self._sync_tmp(f)
+
+            if self.checksum:
+                with open(tmp, 'rb') as f:
+                    if f.read() != conteudo:
+                        raise IOError(f"Conteúdo divergente em {tmp}")
+
+            os.replace(tmp, path)
+            self._apos_rename(path)
+            self._log('info', f"Arquivo salvo com sucesso: {path}")
+            return True
+
+        except Exception as e:
+            self._log('error', f"Erro na escrita atômica: {e}")
+            _remover_tmp(tmp)
+            return False
+
+    def _write_json_seguro(self, path: str, data: Any, ensure_ascii: bool, indent: int) -> bool:
         backup = f"{path}.backup"
-        tmp = f"{path}.tmp"
+        tmp = None
 
         try:
             if os.path.exists(path):
@@ -25,13 +227,16 @@ class AtomicWriter:
             json_string = json.dumps(data, ensure_ascii=ensure_ascii, indent=indent)
             json.loads(json_string)  # valida parsing
 
-            with open(tmp, 'w', encoding='utf-8') as f:
+            fd, tmp = _criar_tmp(path)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
                 f.write(json_string)
+                self._sync_tmp(f)
 
             with open(tmp, 'r', encoding='utf-8') as f:
                 json.load(f)  # valida integridade
 
             os.replace(tmp, path)
+            self._apos_rename(path)
 
             if os.path.exists(backup):
                 os.remove(backup)
@@ -55,10 +260,42 @@ class AtomicWriter:
                     pass
                 self._log('info', "Rollback executado")
 
-            if os.path.exists(tmp):
-                try:
-                    os.remove(tmp)
-                except Exception:
-                    pass
+            _remover_tmp(tmp)
+            return False
+
+    def write_bytes_atomic(self, path: str, data: bytes) -> bool:
+        """Escrita atômica de arquivo binário (tmp + rename). Sem backup: o destino é descartável."""
+        tmp = None
+        try:
+            fd, tmp = _criar_tmp(path)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._log('info', f"Arquivo salvo com sucesso: {path}")
+            return True
+        except Exception as e:
+            self._log('error', f"Erro na escrita atômica: {e}")
+            _remover_tmp(tmp)
+            return False
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m infra.file_atomic [n_escritas] [n_itens]
+    import sys
+    import tempfile
+    import time
+
+    n_escritas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_itens = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    dados = [{"pergunta": f"pergunta {i}", "resposta_ensinada": "resposta " * 10} for i in range(n_itens)]
 
-            return False
\ No newline at end of file
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = os.path.join(pasta, "bench.json")
+        for modo, checksum in (("seguro", False), ("rapido", False), ("rapido", True)):
+            writer = AtomicWriter(modo=modo, checksum=checksum)
+            inicio = time.perf_counter()
+            for _ in range(n_escritas):
+                writer.write_json_atomic(destino, dados)
+            ms = (time.perf_counter() - inicio) * 1000 / n_escritas
+            rotulo = f"{modo}{' + checksum' if checksum else ''}"
+            print(f"{rotulo:<18} {ms:8.3f} ms/escrita ({n_escritas} escritas, {n_itens} itens)")
@@ -0,0 +1,198 @@
+import glob
+import gzip
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .file_atomic import fsync_diretorio
+
+Instante = Union[datetime, str, None]
+
+
+def _instante(valor: Instante) -> Optional[datetime]:
+    """datetime com fuso (UTC quando não informado), a partir de datetime ou texto ISO."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+    return valor if valor.tzinfo else valor.replace(tzinfo=timezone.utc)
+
+
+class ArquivoHistorico:
+    """
+    Camada de arquivamento do histórico completo, particionada por dia.
+
+    Cada dia (UTC, pelo `timestamp_in`) é um segmento `AAAA-MM-DD.jsonl.gz`
+    formado por membros gzip independentes, um por lote arquivado, e um
+    índice ao lado (`AAAA-MM-DD.idx.jsonl`) com uma linha por membro: offset
+    e tamanho no arquivo, intervalo de tempo, número de linhas e de
+    fallbacks. O índice só recebe appends (custo por lote constante, sem
+    reescrever o dia); o membro é gravado (com fsync) antes da linha do
+    índice, então o índice nunca aponta para dados que não existem. Índices
+    antigos em `AAAA-MM-DD.idx.json` continuam sendo lidos.
+
+    `consultar` escolhe os dias pelo nome do arquivo e, dentro de cada dia,
+    só descompacta os membros cujo intervalo (e contagem de fallbacks) pode
+    conter resultados — ex.: `consultar(inicio=agora - timedelta(days=7), fallback=True)`.
+    """
+
+    def __init__(self, diretorio: str = "data/historico_arquivo", logger: Optional[object] = None):
+        self.diretorio = diretorio
+        self.logger = logger
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+        self.arquivadas = 0
+        self.blocos_lidos = 0
+        self.blocos_ignorados = 0
+
+    def _log(self, level: str, msg: str):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def _segmento(self, dia: str) -> str:
+        return os.path.join(self.diretorio, f"{dia}.jsonl.gz")
+
+    def _indice(self, dia: str) -> str:
+        return os.path.join(self.diretorio, f"{dia}.idx.jsonl")
+
+    def _ler_indice(self, dia: str) -> List[Dict[str, Any]]:
+        blocos: List[Dict[str, Any]] = []
+        try:
+            with open(os.path.join(self.diretorio, f"{dia}.idx.json"), 'r', encoding='utf-8') as f:
+                blocos = json.load(f).get("blocos", [])  # formato antigo (documento único)
+        except (FileNotFoundError, ValueError):
+            pass
+        try:
+            with open(self._indice(dia), 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        blocos.append(json.loads(linha))
+                    except ValueError:
+                        continue  # linha truncada por uma queda no meio do append
+        except FileNotFoundError:
+            pass
+        return blocos
+
+    def _acrescentar_indice(self, dia: str, bloco: Dict[str, Any]):
+        caminho = self._indice(dia)
+        with open(caminho, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            prefixo = b""
+            if offset > 0:
+                with open(caminho, 'rb') as leitura:
+                    leitura.seek(offset - 1)
+                    if leitura.read(1) != b"\n":
+                        prefixo = b"\n"  # não emenda no resto de uma linha truncada
+            f.write(prefixo + json.dumps(bloco).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if offset == 0:
+            fsync_diretorio(caminho)
+
+    def dias(self) -> List[str]:
+        """Dias com segmento arquivado, em ordem."""
+        sufixo = ".jsonl.gz"
+        segmentos = glob.glob(os.path.join(glob.escape(self.diretorio), "*" + sufixo))
+        return sorted(os.path.basename(p)[:-len(sufixo)] for p in segmentos)
+
+    def arquivar(self, entradas: Iterable[Dict[str, Any]]) -> int:
+        """Acrescenta as entradas aos segmentos dos seus dias. Retorna quantas foram arquivadas."""
+        por_dia: Dict[str, List[tuple]] = defaultdict(list)
+        for entrada in entradas:
+            try:
+                ts = _instante(entrada.get("timestamp_in")) or datetime.now(timezone.utc)
+            except (ValueError, TypeError):
+                ts = datetime.now(timezone.utc)  # sem data válida: fica no dia do arquivamento
+            ts = ts.astimezone(timezone.utc)
+            por_dia[ts.date().isoformat()].append((ts, entrada))
+
+        total = 0
+        with self._lock:
+            for dia in sorted(por_dia):
+                lote = por_dia[dia]
+                dados = "".join(json.dumps(e, ensure_ascii=False) + "\n" for _, e in lote).encode("utf-8")
+                membro = gzip.compress(dados)
+                caminho = self._segmento(dia)
+                with open(caminho, 'ab') as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(membro)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if offset == 0:
+                    fsync_diretorio(caminho)  # segmento novo
+
+                try:
+                    self._acrescentar_indice(dia, {
+                        "offset": offset,
+                        "tamanho": len(membro),
+                        "inicio": min(ts for ts, _ in lote).isoformat(),
+                        "fim": max(ts for ts, _ in lote).isoformat(),
+                        "linhas": len(lote),
+                        "fallbacks": sum(1 for _, e in lote if e.get("is_fallback")),
+                    })
+                except OSError as e:
+                    self._log('error', f"Falha ao gravar índice do arquivo de histórico: {dia}: {e}")
+                total += len(lote)
+            self.arquivadas += total
+        return total
+
+    def _bloco_relevante(self, bloco: Dict[str, Any], inicio: Optional[datetime], fim: Optional[datetime],
+                         fallback: Optional[bool]) -> bool:
+        if inicio is not None and _instante(bloco["fim"]) < inicio:
+            return False
+        if fim is not None and _instante(bloco["inicio"]) > fim:
+            return False
+        if fallback is True and bloco["fallbacks"] == 0:
+            return False
+        if fallback is False and bloco["fallbacks"] == bloco["linhas"]:
+            return False
+        return True
+
+    def consultar(self, inicio: Instante = None, fim: Instante = None, fallback: Optional[bool] = None,
+                  tag: Optional[str] = None, personalidade: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Entradas com `inicio <= timestamp_in <= fim` (limites opcionais) e os
+        filtros dados, na ordem em que foram arquivadas dentro de cada dia.
+        """
+        inicio, fim = _instante(inicio), _instante(fim)
+        dia_min = inicio.astimezone(timezone.utc).date().isoformat() if inicio else None
+        dia_max = fim.astimezone(timezone.utc).date().isoformat() if fim else None
+
+        for dia in self.dias():
+            if (dia_min and dia < dia_min) or (dia_max and dia > dia_max):
+                continue
+            with open(self._segmento(dia), 'rb') as f:
+                for bloco in self._ler_indice(dia):
+                    if not self._bloco_relevante(bloco, inicio, fim, fallback):
+                        self.blocos_ignorados += 1
+                        continue
+                    self.blocos_lidos += 1
+                    f.seek(bloco["offset"])
+                    for linha in gzip.decompress(f.read(bloco["tamanho"])).splitlines():
+                        entrada = json.loads(linha)
+                        if fallback is not None and bool(entrada.get("is_fallback")) != fallback:
+                            continue
+                        if tag is not None and entrada.get("tag_intencao") != tag:
+                            continue
+                        if personalidade is not None and entrada.get("personalidade") != personalidade:
+                            continue
+                        if inicio is not None or fim is not None:
+                            try:
+                                ts = _instante(entrada.get("timestamp_in"))
+                            except (ValueError, TypeError):
+                                continue
+                            if ts is None or (inicio and ts < inicio) or (fim and ts > fim):
+                                continue
+                        yield entrada
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            "dias": len(self.dias()),
+            "arquivadas": self.arquivadas,
+            "blocos_lidos": self.blocos_lidos,
+            "blocos_ignorados": self.blocos_ignorados,
+        }
@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def copiar_json(valor: Any) -> Any:
+    """
+    Cópia profunda de um valor vindo de `json.load` (dict/list/escalares).
+    Bem mais barata que `copy.deepcopy`, que não sabe que só há tipos JSON.
+    """
+    if isinstance(valor, dict):
+        return {k: copiar_json(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [copiar_json(v) for v in valor]
+    return valor
+
+
+class CacheLeitura:
+    """
+    Cache dos JSON já parseados, validado pelo estado do arquivo.
+
+    A chave de validação é (mtime_ns, tamanho, inode): qualquer escrita muda
+    pelo menos um deles (o AtomicWriter troca o arquivo por rename, o que
+    gera um inode novo mesmo se mtime e tamanho coincidirem). Cada leitura
+    custa um `os.stat`; o parse só acontece quando o arquivo mudou.
+    Quem lê recebe uma cópia (`copiar_json`), então pode alterar o resultado
+    sem corromper o cache.
+    """
+
+    def __init__(self, max_itens: int = 64):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, Tuple[tuple, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+
+    @staticmethod
+    def _assinatura(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def obter(self, path: str, carregar: Callable[[], Any]) -> Any:
+        """
+        Devolve uma cópia do conteúdo de `path`, usando `carregar()` (parse do
+        disco) só quando o arquivo mudou. Resultados None (erro de leitura)
+        não são guardados.
+        """
+        chave = os.path.abspath(path)
+        assinatura = self._assinatura(chave)
+        if assinatura is not None:
+            with self._lock:
+                item = self._itens.get(chave)
+                if item is not None and item[0] == assinatura:
+                    self._itens.move_to_end(chave)
+                    self.hits += 1
+                    return copiar_json(item[1])
+                if item is not None:
+                    del self._itens[chave]
+                    self.invalidacoes += 1
+                self.misses += 1
+        else:
+            with self._lock:
+                self.misses += 1
+
+        valor = carregar()
+        # Só guarda se o arquivo não mudou durante o parse
+        if valor is None or assinatura is None or self.max_itens <= 0 or self._assinatura(chave) != assinatura:
+            return valor
+        with self._lock:
+            self._itens[chave] = (assinatura, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+        return copiar_json(valor)
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        consultas = self.hits + self.misses
+        return {
+            "tamanho": len(self._itens),
+            "max_itens": self.max_itens,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / consultas if consultas > 0 else 0.0,
+            "invalidacoes": self.invalidacoes,
+        }
@@ -0,0 +1,254 @@
+import atexit
+import glob
+import gzip
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+CABECALHO = "==== Relatório de Interações do Chatbot ====\n\n"
+
+
+class RelatorioInteracoes:
+    """
+    Relatório de interações (reports/relatório.txt) gravado em lote.
+
+    `registrar` só formata os blocos em memória; a gravação acontece em
+    `flush` — chamado pela thread de fundo a cada `intervalo_seg`, antes
+    disso se houver `max_pendentes` blocos, e no desligamento (atexit) —
+    com uma única abertura do arquivo por lote.
+    O arquivo é rotacionado quando passa de `max_bytes` ou quando o dia
+    muda (`rotacao_diaria`): o segmento fechado vira `<path>.<data-hora>.gz`
+    e só os `backups` mais recentes são mantidos.
+    Se a gravação falhar, o lote volta para o início da fila e é tentado no
+    próximo flush; com o disco indisponível por muito tempo, a fila guarda no
+    máximo `max_retidos` blocos (os mais antigos são descartados e contados).
+    """
+
+    def __init__(self, path: str = "reports/relatório.txt", max_bytes: int = 1024 * 1024, rotacao_diaria: bool = True,
+                 backups: int = 7, intervalo_seg: float = 5.0, max_pendentes: int = 200, max_retidos: int = 10000,
+                 logger: Optional[object] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotacao_diaria = rotacao_diaria
+        self.backups = backups
+        self.intervalo_seg = intervalo_seg
+        self.max_pendentes = max_pendentes
+        self.max_retidos = max_retidos
+        self.logger = logger
+
+        self._pendentes: List[str] = []
+        self._cond = threading.Condition()
+        self._gravacao = threading.Lock()
+        self._fechado = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.lotes = 0
+        self.rotacoes = 0
+        self.falhas = 0
+        self.descartados = 0
+
+    def _log(self, level: str, msg: str):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def start(self):
+        if self._thread is not None or self._fechado:
+            return
+        self._thread = threading.Thread(target=self._executar, name="relatorio", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _horario(timestamp: Optional[str]) -> str:
+        """Horário local do bloco: o da interação (`timestamp_in`) ou, sem ele, o atual."""
+        try:
+            instante = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+        except ValueError:
+            instante = datetime.now(timezone.utc)
+        return instante.astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
+
+    def registrar(self, registros: List[tuple]):
+        """
+        Enfileira um bloco por interação: (total, fallbacks, personalidade, tag,
+        timestamp_in) após aplicá-la; sem `timestamp_in`, vale o horário atual.
+        """
+        blocos = []
+        for registro in registros:
+            total, fallbacks, personalidade, tag = registro[:4]
+            timestamp = self._horario(registro[4] if len(registro) > 4 else None)
+            bloco = (
+                f"[{timestamp}] Interação registrada\n"
+                f"  - Total: {total}\n"
+                f"  - Fallbacks: {fallbacks}\n"
+                f"  - Personalidade usada: {personalidade}\n"
+            )
+            if tag:
+                bloco += f"  - Tag: {tag}\n"
+            blocos.append(bloco + "-" * 40 + "\n")
+
+        with self._cond:
+            self._pendentes.extend(blocos)
+            fechado = self._fechado
+            if len(self._pendentes) >= self.max_pendentes:
+                self._cond.notify()
+        if fechado:
+            self.flush()  # depois do desligamento não há thread: grava direto
+        else:
+            self.start()
+
+    def pendentes(self) -> int:
+        with self._cond:
+            return len(self._pendentes)
+
+    def flush(self) -> bool:
+        """Grava os blocos pendentes com uma única escrita, rotacionando antes se preciso."""
+        with self._gravacao:
+            with self._cond:
+                lote, self._pendentes = self._pendentes, []
+            if not lote:
+                return True
+            try:
+                self._rotacionar_se_preciso()
+                novo = not os.path.exists(self.path)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write((CABECALHO if novo else "") + "".join(lote))
+                self.lotes += 1
+                return True
+            except Exception as e:
+                self.falhas += 1
+                with self._cond:
+                    # Volta para a frente da fila (ordem preservada), com limite de tamanho
+                    self._pendentes[:0] = lote
+                    excesso = len(self._pendentes) - self.max_retidos
+                    if excesso > 0:
+                        del self._pendentes[:excesso]
+                        self.descartados += excesso
+                self._log('error', f"Erro ao salvar no relatório.txt: {e}")
+                return False
+
+    def _rotacionar_se_preciso(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        dia_arquivo = datetime.fromtimestamp(st.st_mtime).date()
+        mudou_dia = self.rotacao_diaria and dia_arquivo != datetime.now().date()
+        if st.st_size < self.max_bytes and not mudou_dia:
+            return
+
+        base = f"{self.path}.{datetime.fromtimestamp(st.st_mtime).strftime('%Y%m%d-%H%M%S')}"
+        destino, sufixo = base, 1
+        while os.path.exists(destino + ".gz"):
+            destino, sufixo = f"{base}-{sufixo}", sufixo + 1
+        os.replace(self.path, destino)
+        with open(destino, "rb") as origem, gzip.open(destino + ".gz", "wb") as compactado:
+            shutil.copyfileobj(origem, compactado)
+        os.remove(destino)
+        self.rotacoes += 1
+
+        antigos = self.segmentos()
+        for antigo in antigos[:max(0, len(antigos) - self.backups)]:
+            os.remove(antigo)
+
+    def segmentos(self) -> List[str]:
+        """Segmentos compactados existentes, do mais antigo ao mais recente."""
+        return sorted(glob.glob(glob.escape(self.path) + ".*.gz"), key=os.path.getmtime)
+
+    def _executar(self):
+        while True:
+            with self._cond:
+                if not self._fechado and len(self._pendentes) < self.max_pendentes:
+                    self._cond.wait(self.intervalo_seg)
+                fechado = self._fechado
+            self.flush()
+            if fechado:
+                return
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Para a thread e grava os pendentes. Pode ser chamado mais de uma vez."""
+        with self._cond:
+            if self._fechado:
+                return
+            self._fechado = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def metricas(self) -> Dict[str, Any]:
+        return {"pendentes": self.pendentes(), "lotes": self.lotes, "rotacoes": self.rotacoes, "falhas": self.falhas,
+                "descartados": self.descartados}
+
+
+_relatorios: Dict[str, RelatorioInteracoes] = {}
+_relatorios_lock = threading.Lock()
+
+
+def relatorio_para(path: str = "reports/relatório.txt", logger: Optional[object] = None) -> RelatorioInteracoes:
+    """Um RelatorioInteracoes por arquivo no processo (compartilhado entre os StatsRepo)."""
+    chave = os.path.abspath(path)
+    with _relatorios_lock:
+        relatorio = _relatorios.get(chave)
+        if relatorio is None:
+            relatorio = _relatorios[chave] = RelatorioInteracoes(path, logger=logger)
+        return relatorio
+
+
+def gerar_resumo(stats: Dict[str, Any], destino: Optional[str] = None) -> str:
+    """
+    Resumo legível a partir das estatísticas agregadas (formato de
+    `StatsRepo.load`), em vez de percorrer interação por interação.
+    Se `destino` for informado, também grava o texto nesse arquivo.
+    """
+    from .stats_aggregator import resumir_stats
+
+    resumo = resumir_stats(stats)
+    agora = datetime.now(timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
+    linhas = [
+        "==== Resumo de Interações do Chatbot ====",
+        f"Gerado em: {agora}",
+        "",
+        f"Total de interações: {resumo['total_interactions']}",
+        f"Fallbacks: {resumo['fallback_count']} ({resumo['fallback_rate']:.1%})",
+        f"Sessões: {resumo['num_sessoes']} (duração média {resumo['media_duracao_sessao_min']:.1f} min)",
+        "",
+        "Por personalidade:",
+    ]
+    for pers, count in sorted(resumo["por_personalidade"].items(), key=lambda item: -item[1]):
+        linhas.append(f"  - {pers}: {count} ({resumo['por_personalidade_perc'][pers]:.1f}%)")
+    linhas += ["", "Por tag:"]
+    for tag, count in sorted(resumo["por_tag"].items(), key=lambda item: -item[1]):
+        linhas.append(f"  - {tag}: {count} ({resumo['por_tag_perc'][tag]:.1f}%)")
+
+    por_dia = stats.get("sessoes_por_dia", {})
+    if por_dia:
+        linhas += ["", "Sessões encerradas por dia:"]
+        for dia in sorted(por_dia)[-14:]:
+            d = por_dia[dia]
+            linhas.append(f"  - {dia}: {d['sessoes']} sessões, {d['interacoes']} interações, {d['duracao_seg']:.0f} s")
+
+    texto = "\n".join(linhas) + "\n"
+    if destino:
+        with open(destino, "w", encoding="utf-8") as f:
+            f.write(texto)
+    return texto
+
+
+if __name__ == "__main__":
+    import argparse
+    from .repositories import StatsRepo
+
+    parser = argparse.ArgumentParser(description="Gera o resumo legível das estatísticas do chatbot.")
+    parser.add_argument("--stats", default="data/stats.json")
+    parser.add_argument("--sqlite", help="banco do modo ARMAZENAMENTO = 'sqlite' (ex.: data/educalin.db), no lugar do --stats")
+    parser.add_argument("--destino", default="reports/resumo.txt")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from .sqlite_repositories import SqliteDatabase, SqliteStatsRepo
+        stats = SqliteStatsRepo(SqliteDatabase(args.sqlite)).load()
+    else:
+        stats = StatsRepo(args.stats).load()
+    print(gerar_resumo(stats, destino=args.destino), end="")
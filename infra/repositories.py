@@ -1,17 +1,47 @@
 import os
 import json
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
-from .file_atomic import AtomicWriter
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .file_atomic import AtomicWriter, Durabilidade
+from .read_cache import CacheLeitura
+from .report_writer import RelatorioInteracoes, relatorio_para
+from .history_archive import ArquivoHistorico
 
 class BaseRepo:
-    """Base para repositórios que leem/escrevem JSON."""
-    def __init__(self, path: str, logger: Optional[object] = None):
+    """
+    Base para repositórios que leem/escrevem JSON.
+    Cada subclasse define seu modo de escrita (`MODO_ESCRITA`) e sua política
+    de fsync (`DURABILIDADE`: "none", "batch" ou "always"; None mantém a
+    escrita segura sem fsync). `durabilidade`/`intervalo_fsync_ms` sobrescrevem a política.
+    Leituras passam pelo `CACHE_LEITURA` (compartilhado, validado por
+    mtime/tamanho/inode); `USAR_CACHE = False` desliga por subclasse.
+    """
+    MODO_ESCRITA = "seguro"
+    DURABILIDADE: Optional[str] = None
+    USAR_CACHE = True
+    CACHE_LEITURA = CacheLeitura()
+
+    def __init__(self, path: str, logger: Optional[object] = None, durabilidade: Optional[str] = None,
+                 intervalo_fsync_ms: int = 1000):
         self.path = path
         self.logger = logger
-        self.atomic = AtomicWriter(logger=logger)
+        politica = durabilidade or self.DURABILIDADE
+        self.durabilidade = Durabilidade(politica, intervalo_fsync_ms, logger=logger) if politica else None
+        self.atomic = AtomicWriter(logger=logger, modo=self.MODO_ESCRITA, durabilidade=self.durabilidade)
+
+    @classmethod
+    def read_cache_stats(cls) -> Dict[str, Any]:
+        """Contadores do cache de leitura (hits, misses, invalidações)."""
+        return cls.CACHE_LEITURA.stats()
 
     def _read_json(self) -> Optional[Any]:
+        """Conteúdo do JSON (cópia própria do chamador); None se ausente ou inválido."""
+        if self.USAR_CACHE:
+            return self.CACHE_LEITURA.obter(self.path, self._ler_disco)
+        return self._ler_disco()
+
+    def _ler_disco(self) -> Optional[Any]:
         try:
             with open(self.path, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -42,7 +72,9 @@ class LearnedRepo(BaseRepo):
     """
     Lê/adiciona aprendizados em new_data.json.
     Obs.: Validação de entrada deve ser feita na camada de negócio.
+    Ensinos não se perdem: escrita segura com fsync a cada gravação.
     """
+    DURABILIDADE = "always"
     def load(self) -> List[Dict[str, str]]:
         data = self._read_json()
         return data if isinstance(data, list) else []
@@ -56,12 +88,39 @@ class LearnedRepo(BaseRepo):
         return self.atomic.write_json_atomic(self.path, dados, ensure_ascii=False, indent=2)
 
 
+def entrada_historico(pergunta: str, resposta: str, personalidade: str, tag_intencao: Optional[str] = None, is_fallback: bool = False, timestamp_in: Optional[str] = None, timestamp_out: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "timestamp_in": timestamp_in or datetime.now().isoformat(),
+        "timestamp_out": timestamp_out or datetime.now().isoformat(),
+        "pergunta": pergunta,
+        "resposta": resposta,
+        "personalidade": personalidade,
+        "tag_intencao": tag_intencao,
+        "is_fallback": is_fallback
+    }
+
+
 class HistoryRepo(BaseRepo):
     """
     Persiste o histórico em historico.json.
     Mantém apenas as últimas `max_len` interações (padrão: 5).
     Suporta tag_intencao, is_fallback, timestamp_in/out opcionais para compatibilidade com stats.
+    Durabilidade relaxada: escrita rápida com fsync em grupo.
+    `arquivo`: ArquivoHistorico que recebe as interações que saem da janela (nada se perde).
+    Com arquivo, os excedentes ficam no próprio historico.json até somarem
+    `lote_arquivo` e são arquivados de uma vez (um membro gzip e uma linha de
+    índice por lote, não por mensagem); o arquivo guarda então até
+    `max_len + lote_arquivo - 1` entradas.
     """
+    MODO_ESCRITA = "rapido"
+    DURABILIDADE = "batch"
+
+    def __init__(self, path: str, logger: Optional[object] = None, durabilidade: Optional[str] = None,
+                 intervalo_fsync_ms: int = 1000, arquivo: Optional[ArquivoHistorico] = None, lote_arquivo: int = 50):
+        super().__init__(path, logger=logger, durabilidade=durabilidade, intervalo_fsync_ms=intervalo_fsync_ms)
+        self.arquivo = arquivo
+        self.lote_arquivo = lote_arquivo
+
     def load_last(self, n: int = 5) -> List[Dict[str, Any]]:
         data = self._read_json()
         if isinstance(data, list):
@@ -69,40 +128,299 @@ class HistoryRepo(BaseRepo):
         return []
 
     def append(self, pergunta: str, resposta: str, personalidade: str, max_len: int = 5, tag_intencao: Optional[str] = None, is_fallback: bool = False, timestamp_in: Optional[str] = None, timestamp_out: Optional[str] = None) -> bool:
+        return self.append_many([
+            entrada_historico(pergunta, resposta, personalidade, tag_intencao, is_fallback, timestamp_in, timestamp_out)
+        ], max_len=max_len)
+
+    def append_many(self, entradas: List[Dict[str, Any]], max_len: int = 5) -> bool:
+        """Grava várias entradas (já no formato do histórico) com uma única escrita."""
         historico = self._read_json()
         if not isinstance(historico, list):
             historico = []
 
-        now_in = timestamp_in or datetime.now().isoformat()
-        now_out = timestamp_out or datetime.now().isoformat()
+        historico.extend(entradas)
+        excedentes = historico[:-max_len]
+        if self.arquivo is None:
+            historico = historico[-max_len:]  # rotação
+        elif len(excedentes) >= self.lote_arquivo:
+            # Arquiva antes de truncar: numa falha no meio sobra duplicata, nunca perda
+            self.arquivo.arquivar(excedentes)
+            historico = historico[-max_len:]
+        return self.atomic.write_json_atomic(self.path, historico, ensure_ascii=False, indent=2)
 
-        historico.append({
-            "timestamp_in": now_in,
-            "timestamp_out": now_out,
-            "pergunta": pergunta,
-            "resposta": resposta,
-            "personalidade": personalidade,
-            "tag_intencao": tag_intencao,
-            "is_fallback": is_fallback
-        })
 
-        historico = historico[-max_len:]  # rotação
-        return self.atomic.write_json_atomic(self.path, historico, ensure_ascii=False, indent=2)
+class JsonlHistoryRepo(BaseRepo):
+    """
+    Histórico completo em JSON Lines: uma linha por interação, gravada em modo
+    append (custo O(1), sem reescrever o arquivo). Quando o arquivo passa de
+    `max_bytes`, é rotacionado para `<path>.1` (e os anteriores para `.2`, ...),
+    mantendo até `backups` arquivos antigos.
+    `load_last(n)` lê o arquivo de trás para frente, sem percorrer o histórico todo.
+    Mesma interface do HistoryRepo; `max_len` do append é ignorado.
+    `legado`: historico.json antigo importado na primeira gravação, se o .jsonl ainda não existir.
+    `arquivo`: ArquivoHistorico que recebe cada segmento fechado na rotação, guardando o
+    histórico completo mesmo depois que os `backups` mais antigos são descartados.
+    """
+    BLOCO = 64 * 1024
+    DURABILIDADE = "batch"
+
+    def __init__(self, path: str, logger: Optional[object] = None, max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 legado: Optional[str] = None, durabilidade: Optional[str] = None, intervalo_fsync_ms: int = 1000,
+                 arquivo: Optional[ArquivoHistorico] = None):
+        super().__init__(path, logger=logger, durabilidade=durabilidade, intervalo_fsync_ms=intervalo_fsync_ms)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.legado = legado
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+
+    def _arquivos(self) -> List[str]:
+        """Arquivo atual seguido dos rotacionados, do mais novo ao mais antigo."""
+        return [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+
+    def _ultimas_linhas(self, caminho: str, n: int) -> List[bytes]:
+        try:
+            with open(caminho, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                pos = f.tell()
+                resto = b""
+                linhas: List[bytes] = []
+                while pos > 0 and len(linhas) < n:
+                    tamanho = min(self.BLOCO, pos)
+                    pos -= tamanho
+                    f.seek(pos)
+                    partes = (f.read(tamanho) + resto).split(b"\n")
+                    # A primeira parte pode ser o fim de uma linha que começa no bloco anterior
+                    resto = partes.pop(0) if pos > 0 else b""
+                    linhas = [p for p in partes if p.strip()] + linhas
+                return linhas[-n:]
+        except FileNotFoundError:
+            return []
+
+    def load_last(self, n: int = 5) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        self._importar_legado()
+        entradas: List[Dict[str, Any]] = []
+        for caminho in self._arquivos():
+            faltam = n - len(entradas)
+            if faltam <= 0:
+                break
+            novas = []
+            for linha in self._ultimas_linhas(caminho, faltam):
+                try:
+                    novas.append(json.loads(linha))
+                except ValueError:
+                    # Linha truncada (ex.: queda durante a escrita): ignora
+                    if self.logger:
+                        self.logger.warning(f"Linha inválida ignorada em {caminho}")
+            entradas = novas + entradas
+        return entradas[-n:]
+
+    def _entradas(self, caminho: str) -> Iterator[Dict[str, Any]]:
+        with open(caminho, 'rb') as f:
+            for linha in f:
+                if not linha.strip():
+                    continue
+                try:
+                    yield json.loads(linha)
+                except ValueError:
+                    if self.logger:
+                        self.logger.warning(f"Linha inválida ignorada em {caminho}")
+
+    def _rotacionar(self):
+        self.durabilidade.sincronizar()  # o conteúdo rotacionado não pode ficar sem fsync
+        if self.arquivo is not None:
+            self.arquivo.arquivar(self._entradas(self.path))
+        for i in range(self.backups - 1, 0, -1):
+            origem = f"{self.path}.{i}"
+            if os.path.exists(origem):
+                os.replace(origem, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        if self.logger:
+            self.logger.info(f"Histórico rotacionado: {self.path}")
+
+    def _importar_legado(self):
+        if not self.legado or os.path.exists(self.path):
+            return
+        with self._lock:
+            if os.path.exists(self.path):
+                return
+            dados = BaseRepo(self.legado, logger=self.logger)._read_json()
+            if not isinstance(dados, list) or not dados:
+                return
+            with open(self.path, 'w', encoding='utf-8') as f:
+                for entrada in dados:
+                    f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            if self.logger:
+                self.logger.info(f"Histórico legado importado de {self.legado}: {len(dados)} entradas")
+
+    def append(self, pergunta: str, resposta: str, personalidade: str, max_len: int = 5, tag_intencao: Optional[str] = None, is_fallback: bool = False, timestamp_in: Optional[str] = None, timestamp_out: Optional[str] = None) -> bool:
+        return self.append_many([
+            entrada_historico(pergunta, resposta, personalidade, tag_intencao, is_fallback, timestamp_in, timestamp_out)
+        ])
+
+    def append_many(self, entradas: List[Dict[str, Any]], max_len: int = 5) -> bool:
+        """Grava várias entradas com uma única escrita no fim do arquivo."""
+        linhas = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entradas)
+
+        self._importar_legado()
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(linhas)
+                    tamanho = f.tell()
+                    if self.durabilidade.imediata:
+                        f.flush()
+                        self.durabilidade.fsync_fd(f.fileno())
+                self.durabilidade.apos_escrita(self.path, rename=False)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Erro ao gravar histórico em {self.path}: {e}")
+                return False
+            if tamanho >= self.max_bytes:
+                # As linhas já estão no arquivo: uma falha na rotação não pode
+                # fazer quem chamou gravá-las de novo (é tentada no próximo append)
+                try:
+                    self._rotacionar()
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error(f"Erro ao rotacionar histórico {self.path}: {e}")
+        return True
+
+
+# Dias com resumo de sessões guardados no stats.json (os mais antigos saem; os totais ficam)
+MAX_DIAS_SESSOES = 366
+
+
+def _fechar_sessao(data: Dict[str, Any], sessao: Dict[str, Any]):
+    """Soma uma sessão encerrada nos totais e no resumo do dia em que começou."""
+    fechadas = data["sessoes_fechadas"]
+    fechadas["quantidade"] += 1
+    fechadas["duracao_seg"] += sessao["duracao_seg"]
+    fechadas["interacoes"] += sessao["num_interacoes"]
+
+    dias = data["sessoes_por_dia"]
+    dia = dias.setdefault(sessao["inicio"][:10], {"sessoes": 0, "duracao_seg": 0, "interacoes": 0})
+    dia["sessoes"] += 1
+    dia["duracao_seg"] += sessao["duracao_seg"]
+    dia["interacoes"] += sessao["num_interacoes"]
+    if len(dias) > MAX_DIAS_SESSOES:
+        del dias[min(dias)]  # datas ISO ordenam como texto
+
+
+def normalizar_stats(data: Any) -> Dict[str, Any]:
+    """
+    Completa as chaves do stats.json e converte o formato antigo (um item
+    por sessão em "sessoes"): a última sessão vira a sessão aberta e as
+    demais entram em `sessoes_fechadas`/`sessoes_por_dia`.
+    """
+    if not isinstance(data, dict):
+        data = {}
+
+    data.setdefault("total_interactions", 0)
+    data.setdefault("fallback_count", 0)
+    data.setdefault("por_personalidade", {})
+    data.setdefault("por_tag", {})
+    data.setdefault("sessao_aberta", None)
+    data.setdefault("sessoes_fechadas", {"quantidade": 0, "duracao_seg": 0, "interacoes": 0})
+    data.setdefault("sessoes_por_dia", {})
+    data.setdefault("total_duracao_sessoes_seg", 0)
+
+    legado = data.pop("sessoes", None)
+    if isinstance(legado, dict) and legado:
+        ids = sorted(legado, key=int)
+        for id_sessao in ids[:-1]:
+            _fechar_sessao(data, legado[id_sessao])
+        ultima = dict(legado[ids[-1]], id=int(ids[-1]))
+        if data["sessao_aberta"] is None:
+            data["sessao_aberta"] = ultima
+        else:
+            _fechar_sessao(data, ultima)
+        aberta = data["sessao_aberta"]
+        data["total_duracao_sessoes_seg"] = data["sessoes_fechadas"]["duracao_seg"] + aberta["duracao_seg"]
+    return data
+
+
+def num_sessoes(data: Dict[str, Any]) -> int:
+    """Sessões encerradas mais a aberta, se houver."""
+    return data["sessoes_fechadas"]["quantidade"] + (1 if data.get("sessao_aberta") else 0)
+
+
+def aplicar_interacao(
+    data: Dict[str, Any],
+    is_fallback: bool,
+    personalidade: str,
+    tag: Optional[str],
+    timestamp_in: str,
+    timestamp_out: str,
+    session_timeout_min: int = 30,
+    logger: Optional[object] = None,
+):
+    """
+    Aplica uma interação às estatísticas (já normalizadas) em tempo constante:
+    só a sessão aberta é alterada; ao abrir uma nova, a anterior é resumida.
+    """
+    # Atualiza métricas básicas
+    data["total_interactions"] += 1
+    if is_fallback:
+        data["fallback_count"] += 1
+    data["por_personalidade"][personalidade] = data["por_personalidade"].get(personalidade, 0) + 1
+    if tag:
+        data["por_tag"][tag] = data["por_tag"].get(tag, 0) + 1
+
+    try:
+        ts_in = datetime.fromisoformat(timestamp_in)
+        ts_out = datetime.fromisoformat(timestamp_out)
+        duracao_interacao = (ts_out - ts_in).total_seconds()
+
+        aberta = data["sessao_aberta"]
+        if aberta and (ts_in - datetime.fromisoformat(aberta["fim"])) < timedelta(minutes=session_timeout_min):
+            # Continua sessão existente
+            aberta["fim"] = ts_out.isoformat()
+            aberta["duracao_seg"] += duracao_interacao
+            aberta["num_interacoes"] += 1
+        else:
+            # Nova sessão; a anterior vai para o resumo
+            if aberta:
+                _fechar_sessao(data, aberta)
+            data["sessao_aberta"] = {
+                "id": aberta["id"] + 1 if aberta else 1,
+                "inicio": ts_in.isoformat(),
+                "fim": ts_out.isoformat(),
+                "duracao_seg": duracao_interacao,
+                "num_interacoes": 1,
+            }
+        # Duração total agregada (para a média), mantida de forma incremental
+        data["total_duracao_sessoes_seg"] += duracao_interacao
+
+    except (ValueError, TypeError) as e:
+        if logger:
+            logger.error(f"Erro ao processar timestamps para sessão: {e}")
 
 
 class StatsRepo(BaseRepo):
-    def load(self) -> Dict[str, Any]:
-        data = self._read_json()
-        if not isinstance(data, dict):
-            data = {}
+    """
+    Estatísticas agregadas em stats.json. Durabilidade relaxada: escrita rápida com fsync em grupo.
+    Só a sessão aberta é guardada por inteiro; as encerradas viram totais e
+    resumos por dia, então o arquivo não cresce com o número de sessões.
+    O relatório de interações é gravado em lote e rotacionado por `relatorio`
+    (por padrão o RelatorioInteracoes compartilhado de `RELATORIO_PATH`).
+    """
+    MODO_ESCRITA = "rapido"
+    DURABILIDADE = "batch"
+    RELATORIO_PATH = "reports/relatório.txt"
 
-        data.setdefault("total_interactions", 0)
-        data.setdefault("fallback_count", 0)
-        data.setdefault("por_personalidade", {})
-        data.setdefault("por_tag", {})
-        data.setdefault("sessoes", {})
-        data.setdefault("total_duracao_sessoes_seg", 0)
-        return data
+    def __init__(self, path: str, logger: Optional[object] = None, durabilidade: Optional[str] = None,
+                 intervalo_fsync_ms: int = 1000, relatorio: Optional[RelatorioInteracoes] = None):
+        super().__init__(path, logger=logger, durabilidade=durabilidade, intervalo_fsync_ms=intervalo_fsync_ms)
+        self.relatorio = relatorio or relatorio_para(self.RELATORIO_PATH, logger=logger)
+
+    def load(self) -> Dict[str, Any]:
+        return normalizar_stats(self._read_json())
 
     def update_interaction(
         self,
@@ -113,86 +431,60 @@ class StatsRepo(BaseRepo):
         timestamp_out: str,
         session_timeout_min: int = 30,
     ) -> bool:
-        if self.logger:
-            self.logger.info(f"Atualizando stats: fallback={is_fallback}, pers={personalidade}, tag={tag}")
+        return self.update_interactions(
+            [(is_fallback, personalidade, tag, timestamp_in, timestamp_out)],
+            session_timeout_min=session_timeout_min,
+        )
 
+    def update_interactions(self, interacoes: List[tuple], session_timeout_min: int = 30) -> bool:
+        """
+        Aplica um lote de interações (tuplas com os argumentos de `update_interaction`)
+        com uma única leitura e uma única escrita do stats.json.
+        """
         data = self.load()
-
-        # Atualiza métricas básicas
-        data["total_interactions"] += 1
-        if is_fallback:
-            data["fallback_count"] += 1
-        data["por_personalidade"][personalidade] = data["por_personalidade"].get(personalidade, 0) + 1
-        if tag:
-            data["por_tag"][tag] = data["por_tag"].get(tag, 0) + 1
-
-        try:
-            ts_in = datetime.fromisoformat(timestamp_in)
-            ts_out = datetime.fromisoformat(timestamp_out)
-            duracao_interacao = (ts_out - ts_in).total_seconds()
-
-            sessoes = data.get("sessoes", {})
-            ultima_sessao_id = max(sessoes.keys()) if sessoes else None
-
-            if ultima_sessao_id:
-                ultima_sessao = sessoes[ultima_sessao_id]
-                ultimo_ts_out = datetime.fromisoformat(ultima_sessao["fim"])
-                
-                if (ts_in - ultimo_ts_out) < timedelta(minutes=session_timeout_min):
-                    # Continua sessão existente
-                    sessoes[ultima_sessao_id]["fim"] = ts_out.isoformat()
-                    sessoes[ultima_sessao_id]["duracao_seg"] += duracao_interacao
-                    sessoes[ultima_sessao_id]["num_interacoes"] += 1
-                else:
-                    # Nova sessão
-                    nova_sessao_id = str(int(ultima_sessao_id) + 1)
-                    sessoes[nova_sessao_id] = {
-                        "inicio": ts_in.isoformat(),
-                        "fim": ts_out.isoformat(),
-                        "duracao_seg": duracao_interacao,
-                        "num_interacoes": 1,
-                    }
-            else:
-                # Primeira sessão
-                sessoes["1"] = {
-                    "inicio": ts_in.isoformat(),
-                    "fim": ts_out.isoformat(),
-                    "duracao_seg": duracao_interacao,
-                    "num_interacoes": 1,
-                }
-            
-            data["sessoes"] = sessoes
-            # Atualiza a duração total agregada para cálculo de média
-            data["total_duracao_sessoes_seg"] = sum(s["duracao_seg"] for s in sessoes.values())
-
-        except (ValueError, TypeError) as e:
+        registros = []
+        for is_fallback, personalidade, tag, timestamp_in, timestamp_out in interacoes:
             if self.logger:
-                self.logger.error(f"Erro ao processar timestamps para sessão: {e}")
+                self.logger.info(f"Atualizando stats: fallback={is_fallback}, pers={personalidade}, tag={tag}")
+            aplicar_interacao(data, is_fallback, personalidade, tag, timestamp_in, timestamp_out, session_timeout_min, self.logger)
+            registros.append((data["total_interactions"], data["fallback_count"], personalidade, tag, timestamp_in))
+        return self.salvar(data, registros)
 
+    def salvar(self, data: Dict[str, Any], registros: Optional[List[tuple]] = None) -> bool:
+        """
+        Grava o stats.json inteiro e os blocos do relatório (usado também pelo AgregadorStats).
+        Os blocos só são enfileirados se o stats.json foi gravado: em falha o
+        chamador os mantém para a próxima tentativa, sem duplicar linhas.
+        """
         success = self.atomic.write_json_atomic(self.path, data, ensure_ascii=False, indent=2)
 
-        self._write_to_report(data, personalidade, tag)
+        if success and registros:
+            self._write_to_report(registros)
 
         if self.logger:
             self.logger.info(f"Stats salvo: {success}")
         return success
 
-    def _write_to_report(self, data: Dict[str, Any], personalidade: str, tag: Optional[str]):
-        relatorio_path = "reports/relatório.txt"
-        try:
-            if not os.path.exists(relatorio_path):
-                with open(relatorio_path, "w", encoding="utf-8") as f:
-                    f.write("==== Relatório de Interações do Chatbot ====\n\n")
-            
-            with open(relatorio_path, "a", encoding="utf-8") as f:
-                timestamp = datetime.now(timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
-                f.write(f"[{timestamp}] Interação registrada\n")
-                f.write(f"  - Total: {data['total_interactions']}\n")
-                f.write(f"  - Fallbacks: {data['fallback_count']}\n")
-                f.write(f"  - Personalidade usada: {personalidade}\n")
-                if tag:
-                    f.write(f"  - Tag: {tag}\n")
-                f.write("-" * 40 + "\n")
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"Erro ao salvar no relatório.txt: {e}")
\ No newline at end of file
+    def _write_to_report(self, registros: List[tuple]):
+        """Um bloco por interação: (total, fallbacks, personalidade, tag, timestamp_in) após aplicá-la; gravado em lote."""
+        self.relatorio.registrar(registros)
+
+
+class PerguntasFrequentesRepo(BaseRepo):
+    """
+    Resumo das perguntas mais frequentes (FrequentesComDecaimento.to_dict) em JSON compacto.
+    Tamanho fixo (limitado pela capacidade do resumo); lido só na inicialização.
+    Um único processo escreve o arquivo; com vários workers use o
+    SqlitePerguntasFrequentesRepo, que soma as `novas` de cada um.
+    """
+    MODO_ESCRITA = "rapido"
+    DURABILIDADE = "batch"
+    USAR_CACHE = False
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        data = self._read_json()
+        return data if isinstance(data, dict) else None
+
+    def salvar(self, data: Dict[str, Any], novas: Iterable[tuple] = ()) -> bool:
+        """Grava o resumo inteiro; `novas` (perguntas desde a última gravação) não é usado aqui."""
+        return self.atomic.write_json_atomic(self.path, data, ensure_ascii=False, indent=None)
@@ -0,0 +1,177 @@
+import heapq
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """
+    Contagem aproximada dos itens mais frequentes (Space-Saving) com memória fixa.
+
+    Guarda no máximo `capacidade` itens. Um item novo com a estrutura cheia
+    substitui o de menor contagem e herda essa contagem como erro máximo,
+    então todo item com frequência real acima de total/capacidade está
+    garantidamente presente, e `contagem - erro <= real <= contagem`.
+    O menor item é achado por um heap com remoção preguiçosa (O(log k) amortizado).
+    """
+
+    def __init__(self, capacidade: int = 1000):
+        if capacidade <= 0:
+            raise ValueError("capacidade deve ser positiva")
+        self.capacidade = capacidade
+        self._contagens: Dict[Hashable, List[float]] = {}  # item -> [contagem, erro]
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._seq = 0
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        return len(self._contagens)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._contagens
+
+    def _empilhar(self, item: Hashable, contagem: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (contagem, self._seq, item))
+        if len(self._heap) > 4 * self.capacidade:
+            # Descarta as entradas velhas acumuladas pela remoção preguiçosa
+            self._reconstruir_heap()
+
+    def _reconstruir_heap(self):
+        self._heap = [(c, i, it) for i, (it, (c, _)) in enumerate(self._contagens.items())]
+        heapq.heapify(self._heap)
+        self._seq = len(self._heap)
+
+    def _menor(self) -> Hashable:
+        while True:
+            contagem, _, item = self._heap[0]
+            atual = self._contagens.get(item)
+            if atual is not None and atual[0] == contagem:
+                return item
+            heapq.heappop(self._heap)
+
+    def add(self, item: Hashable, peso: float = 1.0):
+        self.total += peso
+        atual = self._contagens.get(item)
+        if atual is not None:
+            atual[0] += peso
+        elif len(self._contagens) < self.capacidade:
+            atual = self._contagens[item] = [peso, 0.0]
+        else:
+            menor = self._menor()
+            minimo = self._contagens.pop(menor)[0]
+            atual = self._contagens[item] = [minimo + peso, minimo]
+        self._empilhar(item, atual[0])
+
+    def contagem(self, item: Hashable) -> float:
+        atual = self._contagens.get(item)
+        return atual[0] if atual else 0.0
+
+    def top(self, n: int) -> List[Tuple[Hashable, float, float]]:
+        """Os `n` itens mais frequentes: (item, contagem estimada, erro máximo)."""
+        maiores = heapq.nlargest(n, self._contagens.items(), key=lambda kv: kv[1][0])
+        return [(item, contagem, erro) for item, (contagem, erro) in maiores]
+
+    def escalar(self, fator: float):
+        """Multiplica todas as contagens (e erros) por `fator`; a ordem entre os itens não muda."""
+        for atual in self._contagens.values():
+            atual[0] *= fator
+            atual[1] *= fator
+        self.total *= fator
+        self._reconstruir_heap()
+
+    def combinar(self, outro: "SpaceSaving") -> "SpaceSaving":
+        """Soma outro resumo a este (ex.: parciais de processos diferentes), mantendo a capacidade."""
+        for item, (contagem, erro) in outro._contagens.items():
+            atual = self._contagens.get(item)
+            if atual is None:
+                self._contagens[item] = [contagem, erro]
+            else:
+                atual[0] += contagem
+                atual[1] += erro
+        self.total += outro.total
+        if len(self._contagens) > self.capacidade:
+            maiores = heapq.nlargest(self.capacidade, self._contagens.items(), key=lambda kv: kv[1][0])
+            self._contagens = {item: valor for item, valor in maiores}
+        self._reconstruir_heap()
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacidade": self.capacidade,
+            "total": self.total,
+            "itens": [[item, contagem, erro] for item, (contagem, erro) in self._contagens.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, dados: Dict[str, Any]) -> "SpaceSaving":
+        resumo = cls(dados["capacidade"])
+        resumo.total = dados.get("total", 0.0)
+        for item, contagem, erro in dados.get("itens", []):
+            resumo._contagens[item] = [contagem, erro]
+        resumo._reconstruir_heap()
+        return resumo
+
+
+class FrequentesComDecaimento:
+    """
+    Itens mais frequentes com decaimento exponencial (meia-vida), sobre um SpaceSaving.
+
+    Decaimento "para frente": em vez de envelhecer todas as contagens a cada
+    evento, cada ocorrência entra com peso 2 ** ((t - t0) / meia_vida), que
+    cresce com o tempo. A ordem entre os itens é a mesma do decaimento
+    tradicional e `add` continua O(log k); quando o peso passa de
+    2 ** MAX_EXPOENTE as contagens são reescaladas e `t0` avança (O(k), raro).
+    Guarda também um texto de exibição por item (ex.: a pergunta como foi digitada).
+    """
+
+    MAX_EXPOENTE = 60
+
+    def __init__(self, capacidade: int = 500, meia_vida_seg: float = 7 * 86400,
+                 relogio: Callable[[], float] = time.time):
+        if meia_vida_seg <= 0:
+            raise ValueError("meia_vida_seg deve ser positiva")
+        self.meia_vida_seg = meia_vida_seg
+        self.relogio = relogio
+        self.resumo = SpaceSaving(capacidade)
+        self.t0 = relogio()
+        self.exibicao: Dict[Hashable, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.resumo)
+
+    def _expoente(self, instante: float) -> float:
+        return (instante - self.t0) / self.meia_vida_seg
+
+    def add(self, item: Hashable, exibicao: Optional[str] = None, instante: Optional[float] = None):
+        instante = self.relogio() if instante is None else instante
+        if self._expoente(instante) > self.MAX_EXPOENTE:
+            self.resumo.escalar(2.0 ** -self._expoente(instante))
+            self.t0 = instante
+        self.resumo.add(item, 2.0 ** self._expoente(instante))
+        if exibicao:
+            self.exibicao[item] = exibicao
+            if len(self.exibicao) > 2 * self.resumo.capacidade:
+                # Itens que saíram do resumo não precisam mais do texto
+                self.exibicao = {i: t for i, t in self.exibicao.items() if i in self.resumo}
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        """Os `n` itens mais frequentes: (texto de exibição, contagem com decaimento até agora)."""
+        fator = 2.0 ** -self._expoente(self.relogio())
+        return [(self.exibicao.get(item, item), contagem * fator) for item, contagem, _ in self.resumo.top(n)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "meia_vida_seg": self.meia_vida_seg,
+            "t0": self.t0,
+            "resumo": self.resumo.to_dict(),
+            "exibicao": {item: texto for item, texto in self.exibicao.items() if item in self.resumo},
+        }
+
+    @classmethod
+    def from_dict(cls, dados: Dict[str, Any], relogio: Callable[[], float] = time.time) -> "FrequentesComDecaimento":
+        resumo = SpaceSaving.from_dict(dados["resumo"])
+        frequentes = cls(resumo.capacidade, dados["meia_vida_seg"], relogio=relogio)
+        frequentes.resumo = resumo
+        frequentes.t0 = dados["t0"]
+        frequentes.exibicao = dict(dados.get("exibicao", {}))
+        return frequentes
@@ -0,0 +1,498 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from .report_writer import RelatorioInteracoes, relatorio_para
+from .repositories import (
+    JsonlHistoryRepo, LearnedRepo, StatsRepo, BaseRepo, PerguntasFrequentesRepo, entrada_historico, MAX_DIAS_SESSOES,
+)
+from .sketches import FrequentesComDecaimento
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp_in TEXT,
+    timestamp_out TEXT,
+    pergunta TEXT,
+    resposta TEXT,
+    personalidade TEXT,
+    tag_intencao TEXT,
+    is_fallback INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_historico_timestamp ON historico (timestamp_in);
+CREATE INDEX IF NOT EXISTS idx_historico_tag ON historico (tag_intencao);
+CREATE INDEX IF NOT EXISTS idx_historico_personalidade ON historico (personalidade);
+
+CREATE TABLE IF NOT EXISTS aprendidos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pergunta TEXT NOT NULL,
+    resposta_ensinada TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS interacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp_in TEXT,
+    timestamp_out TEXT,
+    personalidade TEXT,
+    tag TEXT,
+    is_fallback INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interacoes_timestamp ON interacoes (timestamp_in);
+CREATE INDEX IF NOT EXISTS idx_interacoes_tag ON interacoes (tag);
+CREATE INDEX IF NOT EXISTS idx_interacoes_personalidade ON interacoes (personalidade);
+
+-- Contadores agregados (tipo: total, fallback, personalidade, tag, sessoes_fechadas); load() não varre interacoes
+CREATE TABLE IF NOT EXISTS contadores (
+    tipo TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    valor INTEGER NOT NULL,
+    PRIMARY KEY (tipo, chave)
+);
+CREATE TABLE IF NOT EXISTS sessoes (
+    id INTEGER PRIMARY KEY,
+    inicio TEXT NOT NULL,
+    fim TEXT NOT NULL,
+    duracao_seg REAL NOT NULL,
+    num_interacoes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessoes_por_dia (
+    dia TEXT PRIMARY KEY,
+    sessoes INTEGER NOT NULL,
+    duracao_seg REAL NOT NULL,
+    interacoes INTEGER NOT NULL
+);
+
+-- Perguntas mais feitas, somadas por todos os workers; peso relativo ao t0 em meta 'frequentes_t0'
+CREATE TABLE IF NOT EXISTS perguntas_frequentes (
+    chave TEXT PRIMARY KEY,
+    pergunta TEXT NOT NULL,
+    peso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_perguntas_frequentes_peso ON perguntas_frequentes (peso);
+"""
+
+# SQL constante com parâmetros: o sqlite3 reaproveita o statement preparado (cache por conexão)
+_SQL_HISTORICO_INSERT = (
+    "INSERT INTO historico (timestamp_in, timestamp_out, pergunta, resposta, personalidade, tag_intencao, is_fallback) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_HISTORICO_ULTIMOS = (
+    "SELECT timestamp_in, timestamp_out, pergunta, resposta, personalidade, tag_intencao, is_fallback "
+    "FROM historico ORDER BY id DESC LIMIT ?"
+)
+_SQL_APRENDIDO_INSERT = "INSERT INTO aprendidos (pergunta, resposta_ensinada) VALUES (?, ?)"
+_SQL_APRENDIDOS = "SELECT pergunta, resposta_ensinada FROM aprendidos ORDER BY id"
+_SQL_INTERACAO_INSERT = (
+    "INSERT INTO interacoes (timestamp_in, timestamp_out, personalidade, tag, is_fallback) VALUES (?, ?, ?, ?, ?)"
+)
+_SQL_CONTADOR_SOMAR = (
+    "INSERT INTO contadores (tipo, chave, valor) VALUES (?, ?, ?) "
+    "ON CONFLICT (tipo, chave) DO UPDATE SET valor = valor + excluded.valor"
+)
+_SQL_ULTIMA_SESSAO = "SELECT id, inicio, fim, duracao_seg, num_interacoes FROM sessoes ORDER BY id DESC LIMIT 1"
+_SQL_SESSAO_CONTINUAR = (
+    "UPDATE sessoes SET fim = ?, duracao_seg = duracao_seg + ?, num_interacoes = num_interacoes + 1 WHERE id = ?"
+)
+_SQL_SESSAO_INSERT = "INSERT INTO sessoes (id, inicio, fim, duracao_seg, num_interacoes) VALUES (?, ?, ?, ?, ?)"
+_SQL_CONTADOR = "SELECT valor FROM contadores WHERE tipo = ? AND chave = ''"
+_SQL_FREQUENTE_SOMAR = (
+    "INSERT INTO perguntas_frequentes (chave, pergunta, peso) VALUES (?, ?, ?) "
+    "ON CONFLICT (chave) DO UPDATE SET pergunta = excluded.pergunta, peso = peso + excluded.peso"
+)
+_SQL_FREQUENTES_TOP = "SELECT chave, pergunta, peso FROM perguntas_frequentes ORDER BY peso DESC LIMIT ?"
+_SQL_FREQUENTES_PODAR = (
+    "DELETE FROM perguntas_frequentes WHERE chave NOT IN "
+    "(SELECT chave FROM perguntas_frequentes ORDER BY peso DESC LIMIT ?)"
+)
+_SQL_META_GRAVAR = "INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)"
+_SQL_DIA_SOMAR = (
+    "INSERT INTO sessoes_por_dia (dia, sessoes, duracao_seg, interacoes) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (dia) DO UPDATE SET sessoes = sessoes + excluded.sessoes, "
+    "duracao_seg = duracao_seg + excluded.duracao_seg, interacoes = interacoes + excluded.interacoes"
+)
+
+
+class SqliteDatabase:
+    """
+    Banco SQLite compartilhado pelos repositórios: uma conexão por thread,
+    WAL (leitores não bloqueiam o escritor) e busy_timeout para vários
+    processos/workers escrevendo no mesmo arquivo.
+    """
+
+    def __init__(self, path: str, logger: Optional[object] = None, timeout_seg: float = 10.0):
+        self.path = path
+        self.logger = logger
+        self.timeout_seg = timeout_seg
+        self._local = threading.local()
+        self.conexao().executescript(_ESQUEMA)  # idempotente (IF NOT EXISTS); executescript faz o próprio COMMIT
+
+    def conexao(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout_seg, isolation_level=None, cached_statements=128)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout_seg * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def transacao(self) -> "_Transacao":
+        """`with db.transacao() as conn:` — BEGIN IMMEDIATE / COMMIT (ROLLBACK em erro)."""
+        return _Transacao(self.conexao())
+
+    def fechar(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get_meta(self, chave: str) -> Optional[str]:
+        linha = self.conexao().execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+
+class _Transacao:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        # IMMEDIATE: pega o lock de escrita já no início e evita deadlock entre leitor que vira escritor
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, tipo, valor, tb):
+        self.conn.execute("ROLLBACK" if tipo else "COMMIT")
+        return False
+
+
+class _SqliteRepo:
+    def __init__(self, db: SqliteDatabase, logger: Optional[object] = None):
+        self.db = db
+        self.logger = logger or db.logger
+
+    def _erro(self, acao: str, e: Exception) -> bool:
+        if self.logger:
+            self.logger.error(f"Erro ao {acao} no SQLite ({self.db.path}): {e}")
+        return False
+
+
+class SqliteHistoryRepo(_SqliteRepo):
+    """HistoryRepo em SQLite: histórico completo, uma linha por interação."""
+
+    def load_last(self, n: int = 5) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        linhas = self.db.conexao().execute(_SQL_HISTORICO_ULTIMOS, (n,)).fetchall()
+        return [
+            {
+                "timestamp_in": ts_in,
+                "timestamp_out": ts_out,
+                "pergunta": pergunta,
+                "resposta": resposta,
+                "personalidade": personalidade,
+                "tag_intencao": tag,
+                "is_fallback": bool(is_fallback),
+            }
+            for ts_in, ts_out, pergunta, resposta, personalidade, tag, is_fallback in reversed(linhas)
+        ]
+
+    def append(self, pergunta: str, resposta: str, personalidade: str, max_len: int = 5, tag_intencao: Optional[str] = None, is_fallback: bool = False, timestamp_in: Optional[str] = None, timestamp_out: Optional[str] = None) -> bool:
+        return self.append_many([
+            entrada_historico(pergunta, resposta, personalidade, tag_intencao, is_fallback, timestamp_in, timestamp_out)
+        ])
+
+    def append_many(self, entradas: List[Dict[str, Any]], max_len: int = 5) -> bool:
+        try:
+            with self.db.transacao() as conn:
+                conn.executemany(_SQL_HISTORICO_INSERT, [
+                    (e.get("timestamp_in"), e.get("timestamp_out"), e.get("pergunta"), e.get("resposta"),
+                     e.get("personalidade"), e.get("tag_intencao"), int(bool(e.get("is_fallback"))))
+                    for e in entradas
+                ])
+            return True
+        except sqlite3.Error as e:
+            return self._erro("gravar histórico", e)
+
+
+class SqliteLearnedRepo(_SqliteRepo):
+    """LearnedRepo em SQLite; `load` mantém a ordem de ensino."""
+
+    def load(self) -> List[Dict[str, str]]:
+        return [
+            {"pergunta": pergunta, "resposta_ensinada": resposta}
+            for pergunta, resposta in self.db.conexao().execute(_SQL_APRENDIDOS)
+        ]
+
+    def append(self, pergunta: str, resposta: str) -> bool:
+        try:
+            with self.db.transacao() as conn:
+                conn.execute(_SQL_APRENDIDO_INSERT, (pergunta, resposta))
+            return True
+        except sqlite3.Error as e:
+            return self._erro("gravar aprendizado", e)
+
+
+class SqliteStatsRepo(_SqliteRepo):
+    """
+    StatsRepo em SQLite. Cada interação vira uma linha em `interacoes`
+    (indexada por timestamp, tag e personalidade) e soma nos `contadores`;
+    sessões encerradas são somadas em `contadores`/`sessoes_por_dia` ao
+    fechar (a tabela `sessoes` fica como arquivo). `load` devolve o mesmo
+    dicionário do stats.json sem varrer interações nem sessões.
+    Como o StatsRepo, enfileira os blocos do relatório de interações em
+    `relatorio` depois de cada transação confirmada. Cada worker grava os
+    próprios lotes no mesmo arquivo (modo append), então os blocos de
+    workers diferentes podem se intercalar por lote.
+    """
+
+    def __init__(self, db: SqliteDatabase, logger: Optional[object] = None,
+                 relatorio: Optional[RelatorioInteracoes] = None):
+        super().__init__(db, logger=logger)
+        self.relatorio = relatorio or relatorio_para(StatsRepo.RELATORIO_PATH, logger=self.logger)
+
+    def load(self) -> Dict[str, Any]:
+        conn = self.db.conexao()
+        data: Dict[str, Any] = {
+            "total_interactions": 0,
+            "fallback_count": 0,
+            "por_personalidade": {},
+            "por_tag": {},
+            "sessao_aberta": None,
+            "sessoes_fechadas": {"quantidade": 0, "duracao_seg": 0, "interacoes": 0},
+            "sessoes_por_dia": {},
+            "total_duracao_sessoes_seg": 0,
+        }
+        for tipo, chave, valor in conn.execute("SELECT tipo, chave, valor FROM contadores"):
+            if tipo == "total":
+                data["total_interactions"] = valor
+            elif tipo == "fallback":
+                data["fallback_count"] = valor
+            elif tipo == "personalidade":
+                data["por_personalidade"][chave] = valor
+            elif tipo == "tag":
+                data["por_tag"][chave] = valor
+            elif tipo == "sessoes_fechadas":
+                data["sessoes_fechadas"][chave] = valor
+
+        for dia, sessoes, duracao, interacoes in reversed(conn.execute(
+            "SELECT dia, sessoes, duracao_seg, interacoes FROM sessoes_por_dia ORDER BY dia DESC LIMIT ?",
+            (MAX_DIAS_SESSOES,),
+        ).fetchall()):
+            data["sessoes_por_dia"][dia] = {"sessoes": sessoes, "duracao_seg": duracao, "interacoes": interacoes}
+
+        ultima = conn.execute(_SQL_ULTIMA_SESSAO).fetchone()
+        duracao_aberta = 0
+        if ultima:
+            id_sessao, inicio, fim, duracao_aberta, num = ultima
+            data["sessao_aberta"] = {
+                "id": id_sessao, "inicio": inicio, "fim": fim, "duracao_seg": duracao_aberta, "num_interacoes": num,
+            }
+        data["total_duracao_sessoes_seg"] = data["sessoes_fechadas"]["duracao_seg"] + duracao_aberta
+        return data
+
+    def update_interaction(
+        self,
+        is_fallback: bool,
+        personalidade: str,
+        tag: Optional[str],
+        timestamp_in: str,
+        timestamp_out: str,
+        session_timeout_min: int = 30,
+    ) -> bool:
+        return self.update_interactions(
+            [(is_fallback, personalidade, tag, timestamp_in, timestamp_out)],
+            session_timeout_min=session_timeout_min,
+        )
+
+    def update_interactions(self, interacoes: List[tuple], session_timeout_min: int = 30) -> bool:
+        """Aplica um lote de interações numa única transação."""
+        registros = []
+        try:
+            with self.db.transacao() as conn:
+                # Sob BEGIN IMMEDIATE nenhum outro worker altera os totais até o commit
+                total = self._contador(conn, "total")
+                fallbacks = self._contador(conn, "fallback")
+                for is_fallback, personalidade, tag, timestamp_in, timestamp_out in interacoes:
+                    if self.logger:
+                        self.logger.info(f"Atualizando stats: fallback={is_fallback}, pers={personalidade}, tag={tag}")
+                    conn.execute(_SQL_INTERACAO_INSERT, (timestamp_in, timestamp_out, personalidade, tag, int(bool(is_fallback))))
+                    conn.execute(_SQL_CONTADOR_SOMAR, ("total", "", 1))
+                    if is_fallback:
+                        conn.execute(_SQL_CONTADOR_SOMAR, ("fallback", "", 1))
+                    conn.execute(_SQL_CONTADOR_SOMAR, ("personalidade", personalidade, 1))
+                    if tag:
+                        conn.execute(_SQL_CONTADOR_SOMAR, ("tag", tag, 1))
+                    self._atualizar_sessao(conn, timestamp_in, timestamp_out, session_timeout_min)
+                    total += 1
+                    fallbacks += 1 if is_fallback else 0
+                    registros.append((total, fallbacks, personalidade, tag, timestamp_in))
+        except sqlite3.Error as e:
+            return self._erro("atualizar stats", e)
+        if registros:
+            self.relatorio.registrar(registros)
+        return True
+
+    @staticmethod
+    def _contador(conn: sqlite3.Connection, tipo: str) -> int:
+        linha = conn.execute(_SQL_CONTADOR, (tipo,)).fetchone()
+        return linha[0] if linha else 0
+
+    def _atualizar_sessao(self, conn: sqlite3.Connection, timestamp_in: str, timestamp_out: str, session_timeout_min: int):
+        try:
+            ts_in = datetime.fromisoformat(timestamp_in)
+            ts_out = datetime.fromisoformat(timestamp_out)
+        except (ValueError, TypeError) as e:
+            if self.logger:
+                self.logger.error(f"Erro ao processar timestamps para sessão: {e}")
+            return
+        duracao = (ts_out - ts_in).total_seconds()
+
+        ultima = conn.execute(_SQL_ULTIMA_SESSAO).fetchone()
+        if ultima and (ts_in - datetime.fromisoformat(ultima[2])) < timedelta(minutes=session_timeout_min):
+            conn.execute(_SQL_SESSAO_CONTINUAR, (ts_out.isoformat(), duracao, ultima[0]))
+            return
+        if ultima:
+            # A sessão anterior fecha: entra nos totais e no resumo do dia em que começou
+            _, inicio, _, duracao_fechada, num = ultima
+            conn.executemany(_SQL_CONTADOR_SOMAR, [
+                ("sessoes_fechadas", "quantidade", 1),
+                ("sessoes_fechadas", "duracao_seg", duracao_fechada),
+                ("sessoes_fechadas", "interacoes", num),
+            ])
+            conn.execute(_SQL_DIA_SOMAR, (inicio[:10], 1, duracao_fechada, num))
+        proximo_id = ultima[0] + 1 if ultima else 1
+        conn.execute(_SQL_SESSAO_INSERT, (proximo_id, ts_in.isoformat(), ts_out.isoformat(), duracao, 1))
+
+
+class SqlitePerguntasFrequentesRepo(_SqliteRepo):
+    """
+    PerguntasFrequentesRepo em SQLite, compartilhado pelos workers. Em vez de
+    cada processo sobrescrever o resumo inteiro, `salvar` soma só as perguntas
+    registradas desde a última gravação (`novas`) na tabela
+    `perguntas_frequentes`, com o mesmo decaimento para frente do
+    FrequentesComDecaimento. `load` devolve as `capacidade` mais pesadas no
+    formato de `FrequentesComDecaimento.to_dict`. A tabela guarda no máximo
+    `10 * capacidade` perguntas.
+    """
+
+    def __init__(self, db: SqliteDatabase, logger: Optional[object] = None, capacidade: int = 500,
+                 meia_vida_seg: float = 7 * 86400):
+        super().__init__(db, logger=logger)
+        self.capacidade = capacidade
+        self.meia_vida_seg = meia_vida_seg
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        t0 = self.db.get_meta("frequentes_t0")
+        linhas = self.db.conexao().execute(_SQL_FREQUENTES_TOP, (self.capacidade,)).fetchall()
+        if t0 is None or not linhas:
+            return None
+        return {
+            "meia_vida_seg": self.meia_vida_seg,
+            "t0": float(t0),
+            "resumo": {
+                "capacidade": self.capacidade,
+                "total": sum(peso for _, _, peso in linhas),
+                "itens": [[chave, peso, 0.0] for chave, _, peso in linhas],
+            },
+            "exibicao": {chave: pergunta for chave, pergunta, _ in linhas},
+        }
+
+    def salvar(self, data: Dict[str, Any], novas: Iterable[tuple] = ()) -> bool:
+        """Soma `novas` ((chave, pergunta, instante) em epoch) numa única transação; `data` não é usado."""
+        novas = list(novas)
+        if not novas:
+            return True
+        try:
+            with self.db.transacao() as conn:
+                linha = conn.execute("SELECT valor FROM meta WHERE chave = 'frequentes_t0'").fetchone()
+                t0 = float(linha[0]) if linha else min(instante for _, _, instante in novas)
+                ultimo = max(instante for _, _, instante in novas)
+                expoente = (ultimo - t0) / self.meia_vida_seg
+                if expoente > FrequentesComDecaimento.MAX_EXPOENTE:
+                    # Mesmo reescalonamento do FrequentesComDecaimento: a ordem não muda
+                    conn.execute("UPDATE perguntas_frequentes SET peso = peso * ?", (2.0 ** -expoente,))
+                    t0 = ultimo
+                if linha is None or t0 != float(linha[0]):
+                    conn.execute(_SQL_META_GRAVAR, ("frequentes_t0", repr(t0)))
+                conn.executemany(_SQL_FREQUENTE_SOMAR, [
+                    (chave, pergunta, 2.0 ** ((instante - t0) / self.meia_vida_seg))
+                    for chave, pergunta, instante in novas
+                ])
+                conn.execute(_SQL_FREQUENTES_PODAR, (10 * self.capacidade,))
+            return True
+        except sqlite3.Error as e:
+            return self._erro("gravar perguntas frequentes", e)
+
+
+def migrar_json(db: SqliteDatabase, historico_path: Optional[str] = None, learned_path: Optional[str] = None,
+                stats_path: Optional[str] = None, logger: Optional[object] = None,
+                frequentes_path: Optional[str] = None) -> bool:
+    """
+    Importa uma única vez os arquivos JSON atuais (histórico .json ou .jsonl,
+    new_data.json, stats.json e perguntas_frequentes.json) para o banco.
+    Retorna False se já foi feito.
+    Vários workers podem chamar ao mesmo tempo no primeiro boot: a marca em
+    `meta` é gravada no início da transação e quem não conseguir gravá-la
+    (outro worker migrou antes) não importa nada.
+    """
+    if db.get_meta("migracao_json") is not None:
+        return False
+
+    historico: List[Dict[str, Any]] = []
+    if historico_path:
+        if historico_path.endswith(".jsonl"):
+            repo = JsonlHistoryRepo(historico_path, logger=logger, durabilidade="none")
+            historico = repo.load_last(n=2 ** 62)
+        else:
+            dados = BaseRepo(historico_path, logger=logger)._read_json()
+            historico = dados if isinstance(dados, list) else []
+    aprendidos = LearnedRepo(learned_path, logger=logger).load() if learned_path else []
+    stats = StatsRepo(stats_path, logger=logger).load() if stats_path else None
+    frequentes = PerguntasFrequentesRepo(frequentes_path, logger=logger).load() if frequentes_path else None
+
+    with db.transacao() as conn:
+        marca = conn.execute(
+            "INSERT OR IGNORE INTO meta (chave, valor) VALUES ('migracao_json', ?)",
+            (json.dumps({"em": datetime.now().isoformat(), "historico": len(historico), "aprendidos": len(aprendidos)}),),
+        )
+        if marca.rowcount == 0:
+            return False  # outro worker migrou entre a checagem e o BEGIN IMMEDIATE
+        conn.executemany(_SQL_HISTORICO_INSERT, [
+            (e.get("timestamp_in"), e.get("timestamp_out"), e.get("pergunta"), e.get("resposta"),
+             e.get("personalidade"), e.get("tag_intencao"), int(bool(e.get("is_fallback"))))
+            for e in historico
+        ])
+        conn.executemany(_SQL_APRENDIDO_INSERT, [
+            (d.get("pergunta", ""), d.get("resposta_ensinada", "")) for d in aprendidos
+        ])
+        if stats:
+            contadores = [("total", "", stats["total_interactions"]), ("fallback", "", stats["fallback_count"])]
+            contadores += [("personalidade", k, v) for k, v in stats["por_personalidade"].items()]
+            contadores += [("tag", k, v) for k, v in stats["por_tag"].items()]
+            conn.executemany(_SQL_CONTADOR_SOMAR, contadores)
+            fechadas = stats["sessoes_fechadas"]
+            conn.executemany(_SQL_CONTADOR_SOMAR, [("sessoes_fechadas", k, v) for k, v in fechadas.items()])
+            conn.executemany(_SQL_DIA_SOMAR, [
+                (dia, d["sessoes"], d["duracao_seg"], d["interacoes"]) for dia, d in stats["sessoes_por_dia"].items()
+            ])
+            aberta = stats["sessao_aberta"]
+            if aberta:
+                conn.execute(_SQL_SESSAO_INSERT, (
+                    aberta["id"], aberta["inicio"], aberta["fim"], aberta["duracao_seg"], aberta["num_interacoes"],
+                ))
+        if frequentes:
+            exibicao = frequentes.get("exibicao", {})
+            conn.execute(_SQL_META_GRAVAR, ("frequentes_t0", repr(float(frequentes["t0"]))))
+            conn.executemany(_SQL_FREQUENTE_SOMAR, [
+                (chave, exibicao.get(chave, chave), contagem) for chave, contagem, _ in frequentes["resumo"]["itens"]
+            ])
+
+    if logger:
+        logger.info(f"Migração JSON -> SQLite concluída: {len(historico)} históricos, {len(aprendidos)} aprendizados")
+    return True
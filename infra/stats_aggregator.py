@@ -0,0 +1,173 @@
+import atexit
+import threading
+from typing import Any, Dict, List, Optional
+
+from .read_cache import copiar_json
+from .repositories import aplicar_interacao, num_sessoes
+
+
+def resumir_stats(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumo exibido em "Ver Stats": taxas, percentuais e duração média das sessões."""
+    total = data.get("total_interactions", 0)
+    fallback_count = data.get("fallback_count", 0)
+    fallback_rate = fallback_count / total if total > 0 else 0.0
+
+    por_personalidade = data.get("por_personalidade", {})
+    por_personalidade_perc = {pers: (count / total * 100) if total > 0 else 0.0 for pers, count in por_personalidade.items()}
+
+    por_tag = data.get("por_tag", {})
+    por_tag_perc = {t: (count / total * 100) if total > 0 else 0.0 for t, count in por_tag.items()}
+
+    # Calcula a duração média da sessão
+    total_duracao_seg = data.get("total_duracao_sessoes_seg", 0)
+    sessoes = num_sessoes(data)
+
+    media_duracao_seg = total_duracao_seg / sessoes if sessoes > 0 else 0.0
+    media_duracao_min = media_duracao_seg / 60.0
+
+    return {
+        "total_interactions": total,
+        "fallback_rate": fallback_rate,
+        "fallback_count": fallback_count,
+        "por_personalidade": por_personalidade,
+        "por_personalidade_perc": por_personalidade_perc,
+        "por_tag": por_tag,
+        "por_tag_perc": por_tag_perc,
+        "media_duracao_sessao_min": media_duracao_min,
+        "num_sessoes": sessoes,
+    }
+
+
+class AgregadorStats:
+    """
+    Estatísticas mantidas em memória, com gravação periódica em disco.
+
+    O stats.json é lido uma vez (`StatsRepo.load`); depois cada interação
+    é aplicada em memória (`aplicar_interacao`, O(1)), sem reler o arquivo.
+    Uma thread de fundo grava um snapshot a cada `intervalo_seg` se houve
+    mudança, e `close` (registrado no atexit) grava o último. `load`/`resumo` respondem da memória, sem tocar no disco.
+
+    Tem os mesmos métodos de escrita do `StatsRepo` (`update_interaction`,
+    `update_interactions`), então pode substituí-lo onde ele é usado.
+    """
+
+    def __init__(self, stats_repo, intervalo_seg: float = 5.0, logger=None):
+        self.stats_repo = stats_repo
+        self.intervalo_seg = intervalo_seg
+        self.logger = logger
+
+        self._data = stats_repo.load()
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._gravacao = threading.Lock()
+        self._registros: List[tuple] = []  # blocos do relatório ainda não gravados
+        self._versao = 0
+        self._versao_gravada = 0
+        self._resumo: Optional[Dict[str, Any]] = None
+        self._versao_resumo = -1
+        self._fechado = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.snapshots = 0
+        self.falhas = 0
+
+    def _log(self, level: str, msg: str):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, name="stats-snapshot", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def update_interaction(
+        self,
+        is_fallback: bool,
+        personalidade: str,
+        tag: Optional[str],
+        timestamp_in: str,
+        timestamp_out: str,
+        session_timeout_min: int = 30,
+    ) -> bool:
+        return self.update_interactions(
+            [(is_fallback, personalidade, tag, timestamp_in, timestamp_out)],
+            session_timeout_min=session_timeout_min,
+        )
+
+    def update_interactions(self, interacoes: List[tuple], session_timeout_min: int = 30) -> bool:
+        with self._lock:
+            data = self._data
+            for is_fallback, personalidade, tag, timestamp_in, timestamp_out in interacoes:
+                aplicar_interacao(data, is_fallback, personalidade, tag, timestamp_in, timestamp_out,
+                                  session_timeout_min, self.logger)
+                self._registros.append((data["total_interactions"], data["fallback_count"], personalidade, tag,
+                                        timestamp_in))
+            self._versao += 1
+        return True
+
+    def load(self) -> Dict[str, Any]:
+        """Cópia do estado atual (mesmo formato de `StatsRepo.load`)."""
+        with self._lock:
+            return copiar_json(self._data)
+
+    def resumo(self) -> Dict[str, Any]:
+        """`resumir_stats` do estado atual; recalculado só quando houve atualização."""
+        with self._lock:
+            if self._versao_resumo != self._versao:
+                self._resumo = resumir_stats(self._data)
+                self._versao_resumo = self._versao
+            return copiar_json(self._resumo)
+
+    def flush(self) -> bool:
+        """Grava o snapshot agora, se algo mudou desde o último."""
+        with self._gravacao:
+            with self._lock:
+                if self._versao == self._versao_gravada:
+                    return True
+                versao = self._versao
+                data = copiar_json(self._data)
+                registros, self._registros = self._registros, []
+
+            ok = self.stats_repo.salvar(data, registros)
+            if ok:
+                self._versao_gravada = versao
+                self.snapshots += 1
+            else:
+                self.falhas += 1
+                with self._lock:
+                    self._registros[:0] = registros
+                self._log('error', "Falha ao gravar snapshot das estatísticas")
+            return ok
+
+    def _executar(self):
+        while True:
+            with self._cond:
+                if not self._fechado:
+                    self._cond.wait(self.intervalo_seg)
+                fechado = self._fechado
+            try:
+                self.flush()
+            except Exception as e:
+                self.falhas += 1
+                self._log('error', f"Erro no snapshot das estatísticas: {e}")
+            if fechado:
+                return
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Para a thread e grava o último snapshot. Pode ser chamado mais de uma vez."""
+        with self._cond:
+            if self._fechado:
+                return
+            self._fechado = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            pendente = self._versao != self._versao_gravada
+        return {"snapshots": self.snapshots, "falhas": self.falhas, "pendente": pendente}
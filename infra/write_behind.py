@@ -0,0 +1,190 @@
+import atexit
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class WriteBehind:
+    """
+    Persistência em segundo plano (write-behind) do histórico e das estatísticas.
+
+    `registrar` só enfileira a interação em memória; uma thread de fundo grava
+    os pendentes em lote, com uma escrita por arquivo por lote
+    (`HistoryRepo.append_many` e `StatsRepo.update_interactions`).
+    A perda máxima numa queda é limitada por `intervalo_seg` (tempo entre
+    gravações) e `max_pendentes` (o lote é gravado antes, se encher).
+    `close` (registrado no atexit) grava o que faltar. Com `stats_repo=None`
+    só o histórico passa pela fila (estatísticas ficam no AgregadorStats).
+
+    Histórico e estatísticas têm filas próprias: se uma das escritas falhar,
+    só a parte que falhou volta para o início da sua fila e é tentada de novo
+    no próximo lote (estatísticas já gravadas nunca são reaplicadas).
+    Com `limite_pendentes` interações na fila (ex.: disco lento),
+    `registrar` grava de forma síncrona no lugar de só enfileirar.
+    Depois de uma falha, novas tentativas (da thread ou síncronas) esperam um
+    intervalo que dobra a cada falha seguida, de `intervalo_seg` até
+    `espera_max_seg`. Com o disco indisponível por muito tempo, cada fila
+    guarda no máximo `max_retidos` itens: os mais antigos são descartados e
+    contados em `descartados`.
+    """
+
+    def __init__(self, history_repo, stats_repo, intervalo_seg: float = 1.0, max_pendentes: int = 100,
+                 limite_pendentes: Optional[int] = None, max_retidos: int = 10000, espera_max_seg: float = 60.0,
+                 logger=None):
+        self.history_repo = history_repo
+        self.stats_repo = stats_repo
+        self.intervalo_seg = intervalo_seg
+        self.max_pendentes = max_pendentes
+        self.limite_pendentes = limite_pendentes or 10 * max_pendentes
+        self.max_retidos = max(max_retidos, self.limite_pendentes)
+        self.espera_max_seg = espera_max_seg
+        self.logger = logger
+
+        self._historico: List[Dict[str, Any]] = []
+        self._stats: List[tuple] = []
+        self._cond = threading.Condition()
+        self._gravacao = threading.Lock()  # mantém a ordem entre a thread e flush() explícitos
+        self._fechado = False
+        self._thread: Optional[threading.Thread] = None
+        self._espera = 0.0
+        self._proxima_tentativa = 0.0  # time.monotonic(); antes disso, só close/flush explícito gravam
+
+        self.lotes = 0
+        self.gravados = 0
+        self.falhas = 0
+        self.maior_lote = 0
+        self.sincronas = 0
+        self.descartados = 0
+
+    def _log(self, level: str, msg: str):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def registrar(self, entrada_historico: Dict[str, Any], interacao_stats: tuple):
+        """Enfileira uma interação: entrada do histórico + argumentos de `update_interaction`."""
+        with self._cond:
+            if self._fechado:
+                raise RuntimeError("WriteBehind já foi fechado")
+            self._historico.append(entrada_historico)
+            if self.stats_repo is not None:
+                self._stats.append(interacao_stats)
+            self._aparar()
+            pendentes = self._tamanho()
+            if pendentes >= self.max_pendentes:
+                self._cond.notify()
+            em_espera = time.monotonic() < self._proxima_tentativa
+        if pendentes >= self.limite_pendentes and not em_espera:
+            # Fila acima do limite: quem registra paga a gravação (contrapressão)
+            self.sincronas += 1
+            self.flush()
+
+    def _aparar(self):
+        """Descarta os itens mais antigos de cada fila acima de `max_retidos` (chamar com `_cond`)."""
+        for fila in (self._historico, self._stats):
+            excesso = len(fila) - self.max_retidos
+            if excesso > 0:
+                del fila[:excesso]
+                self.descartados += excesso
+
+    def _tamanho(self) -> int:
+        return max(len(self._historico), len(self._stats))
+
+    def pendentes(self) -> int:
+        with self._cond:
+            return self._tamanho()
+
+    def _gravar(self, gravar, itens: list, nome: str) -> bool:
+        try:
+            return bool(gravar(itens))
+        except Exception as e:
+            self._log('error', f"Erro ao gravar {nome} no write-behind: {e}")
+            return False
+
+    def flush(self) -> bool:
+        """Grava agora tudo o que está pendente. Retorna False se alguma escrita falhou (a parte que falhou fica na fila)."""
+        with self._gravacao:
+            with self._cond:
+                historico, self._historico = self._historico, []
+                stats, self._stats = self._stats, []
+            if not historico and not stats:
+                return True
+
+            ok_historico = not historico or self._gravar(self.history_repo.append_many, historico, "histórico")
+            ok_stats = True
+            if stats and self.stats_repo is not None:
+                ok_stats = self._gravar(self.stats_repo.update_interactions, stats, "estatísticas")
+
+            with self._cond:
+                # Só a parte que falhou volta para a frente da fila, na ordem original
+                if not ok_historico:
+                    self._historico[:0] = historico
+                if not ok_stats:
+                    self._stats[:0] = stats
+                self._aparar()
+                if ok_historico and ok_stats:
+                    self._espera = 0.0
+                    self._proxima_tentativa = 0.0
+                else:
+                    self._espera = min(max(2 * self._espera, self.intervalo_seg), self.espera_max_seg)
+                    self._proxima_tentativa = time.monotonic() + self._espera
+
+            tamanho = max(len(historico), len(stats))
+            self.lotes += 1
+            self.maior_lote = max(self.maior_lote, tamanho)
+            if ok_historico:
+                self.gravados += len(historico)
+            if not (ok_historico and ok_stats):
+                self.falhas += 1
+                self._log('error', f"Falha ao gravar lote de {tamanho} interações; mantido na fila")
+            return ok_historico and ok_stats
+
+    def _executar(self):
+        while True:
+            with self._cond:
+                prazo = time.monotonic() + self.intervalo_seg
+                while not self._fechado:
+                    agora = time.monotonic()
+                    if agora < self._proxima_tentativa:
+                        # Última gravação falhou: espera o fim do intervalo de nova tentativa
+                        self._cond.wait(self._proxima_tentativa - agora)
+                    elif self._tamanho() >= self.max_pendentes or agora >= prazo:
+                        break
+                    else:
+                        self._cond.wait(prazo - agora)
+                fechado = self._fechado
+            try:
+                self.flush()
+            except Exception as e:
+                self.falhas += 1
+                self._log('error', f"Erro no write-behind: {e}")
+            if fechado:
+                return
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Para a thread e grava os pendentes. Pode ser chamado mais de uma vez."""
+        with self._cond:
+            if self._fechado:
+                return
+            self._fechado = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            "pendentes": self.pendentes(),
+            "lotes": self.lotes,
+            "gravados": self.gravados,
+            "maior_lote": self.maior_lote,
+            "falhas": self.falhas,
+            "sincronas": self.sincronas,
+            "descartados": self.descartados,
+        }
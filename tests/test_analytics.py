@@ -0,0 +1,117 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from infra.analytics import CAMINHOS_PADRAO, Acumulador, _itens_array_json, analisar, formatar
+from infra.history_archive import ArquivoHistorico
+from infra.repositories import JsonlHistoryRepo, entrada_historico
+
+INICIO = datetime(2025, 9, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def _entradas():
+    entradas = []
+    for i in range(30):
+        ts_in = INICIO + timedelta(minutes=10 * i)
+        ts_out = ts_in + timedelta(milliseconds=3 if i % 2 else 40)
+        pergunta = "O que é MDC?" if i % 3 == 0 else f"pergunta {i}"
+        fallback = i % 5 == 0
+        entradas.append(entrada_historico(pergunta, "r", "formal" if i % 2 else "engracada",
+                                          "fallback" if fallback else "definicao_mdc", fallback,
+                                          ts_in.isoformat(), ts_out.isoformat()))
+    return entradas
+
+
+class TestAnalytics(unittest.TestCase):
+    """Relatórios em uma passada sobre .json, .jsonl e segmentos arquivados."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.entradas = _entradas()
+
+        with open(os.path.join(self.temp_dir, 'historico.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.entradas[:10], f, ensure_ascii=False, indent=2)
+        with open(os.path.join(self.temp_dir, 'historico.jsonl'), 'w', encoding='utf-8') as f:
+            for e in self.entradas[10:20]:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            f.write('{"truncada": \n')
+        ArquivoHistorico(os.path.join(self.temp_dir, 'arquivo')).arquivar(self.entradas[20:])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _caminhos(self):
+        return [os.path.join(self.temp_dir, nome) for nome in ('historico.json', 'historico.jsonl', 'arquivo')]
+
+    def test_relatorio_completo(self):
+        relatorio = analisar(self._caminhos()).relatorio(top=3)
+        self.assertEqual(relatorio["total"], 30)
+        self.assertEqual(relatorio["fallbacks"], 6)
+        self.assertEqual(relatorio["top_perguntas"][0], {"pergunta": "o que e mdc", "contagem": 10, "erro_max": 0})
+
+        horas = relatorio["fallback_por_hora"]
+        self.assertEqual(sum(h["interacoes"] for h in horas.values()), 30)
+        self.assertEqual(horas["10"]["interacoes"], 6)
+
+        latencia = relatorio["latencia_por_personalidade"]
+        self.assertEqual(latencia["formal"]["n"], 15)
+        self.assertEqual(latencia["formal"]["p95_ms"], 4.0)
+        self.assertEqual(latencia["engracada"]["p50_ms"], 64.0)
+        self.assertEqual(relatorio["tags"]["fallback"]["contagem"], 6)
+        self.assertIn("o que e mdc", formatar(relatorio))
+
+    def test_workers_igual_a_sequencial(self):
+        sequencial = analisar(self._caminhos()).relatorio()
+        paralelo = analisar(self._caminhos(), workers=2).relatorio()
+        self.assertEqual(paralelo, sequencial)
+
+    def test_lista_json_incremental(self):
+        texto = json.dumps(self.entradas, ensure_ascii=False)
+        # Blocos pequenos forçam objetos divididos entre leituras
+        with patch("infra.analytics.BLOCO_LEITURA", 7):
+            itens = list(_itens_array_json(io.StringIO(texto)))
+        self.assertEqual(itens, self.entradas)
+        self.assertEqual(list(_itens_array_json(io.StringIO(" [ ] "))), [])
+
+    def test_memoria_limitada_pela_capacidade(self):
+        caminho = os.path.join(self.temp_dir, 'grande.jsonl.gz')
+        with gzip.open(caminho, 'wt', encoding='utf-8') as f:
+            for i in range(3000):
+                ts = INICIO.isoformat()
+                f.write(json.dumps(entrada_historico(f"pergunta unica {i}", "r", "formal", "t", False, ts, ts)) + "\n")
+        acumulador = analisar([caminho], capacidade_top=100)
+        self.assertEqual(acumulador.total, 3000)
+        self.assertEqual(len(acumulador.perguntas), 100)
+
+    def test_layout_real_de_data(self):
+        """Sobre uma cópia de data/: só o histórico conta, e o legado importado não é contado duas vezes."""
+        data_dir = os.path.join(self.temp_dir, 'data')
+        os.makedirs(data_dir)
+        for nome in ('core_data.json', 'new_data.json', 'stats.json', 'historico.json'):
+            shutil.copy(os.path.join('data', nome), data_dir)
+        with open(os.path.join('data', 'historico.json'), encoding='utf-8') as f:
+            n_legado = len(json.load(f))
+        # Como o app: o JSONL importa o legado e o arquivo diário fica ao lado
+        repo = JsonlHistoryRepo(os.path.join(data_dir, 'historico.jsonl'), legado=os.path.join(data_dir, 'historico.json'))
+        repo.load_last(1)
+        ArquivoHistorico(os.path.join(data_dir, 'historico_arquivo')).arquivar(self.entradas[:4])
+
+        padrao = [os.path.join(self.temp_dir, caminho) for caminho in CAMINHOS_PADRAO]
+        self.assertEqual(analisar(padrao).total, n_legado + 4)
+        self.assertEqual(analisar([data_dir]).total, n_legado)
+
+    def test_timestamps_com_e_sem_fuso(self):
+        acumulador = Acumulador()
+        acumulador.adicionar(entrada_historico("p", "r", "formal", "t", False,
+                                               "2025-09-01T10:00:00", "2025-09-01T10:00:01+00:00"))
+        self.assertEqual((acumulador.total, acumulador.invalidas), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from core.faq_suggestions import FAQSuggestions
+from core.intent_matcher import IntentMatcher
+from infra.repositories import PerguntasFrequentesRepo
+
+
+class TestFAQSuggestions(unittest.TestCase):
+    """Sugestões do histórico servidas do resumo em memória, sem ler o histórico a cada pedido."""
+
+    def setUp(self):
+        self.path = "data/test_perguntas_frequentes.json"
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.history_repo = MagicMock()
+        self.history_repo.load_last.return_value = []
+        self.matcher = IntentMatcher([], [])
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_mais_perguntadas_sem_ler_historico(self):
+        faq = FAQSuggestions(self.history_repo, self.matcher)
+        self.history_repo.load_last.reset_mock()
+        for pergunta in ["Qual o horário?", "qual o horario", "Onde fica?", "Não sei isso"]:
+            faq.registrar_pergunta(pergunta, is_fallback=pergunta.startswith("Não"))
+        self.assertEqual(faq.get_combined_suggestions(n_total=3), ["qual o horario", "Onde fica?"])
+        self.history_repo.load_last.assert_not_called()
+
+    def test_semente_do_historico(self):
+        agora = datetime.now()
+        self.history_repo.load_last.return_value = [
+            {"pergunta": "Onde fica?", "is_fallback": False, "timestamp_in": (agora - timedelta(days=1)).isoformat()},
+            {"pergunta": "onde fica", "is_fallback": False, "timestamp_in": agora.isoformat()},
+            {"pergunta": "blablabla", "is_fallback": True, "timestamp_in": agora.isoformat()},
+        ]
+        faq = FAQSuggestions(self.history_repo, self.matcher)
+        self.assertEqual(faq._get_from_history(n=3), ["onde fica"])
+
+    def test_persistencia(self):
+        repo = PerguntasFrequentesRepo(self.path)
+        faq = FAQSuggestions(self.history_repo, self.matcher, frequentes_repo=repo, intervalo_gravacao_seg=60)
+        faq.registrar_pergunta("Qual o horário?")
+        faq.registrar_pergunta("Qual o horário?")
+        faq.registrar_pergunta("Onde fica?")
+        self.assertTrue(faq.salvar_frequentes())
+
+        self.history_repo.load_last.reset_mock()
+        recarregado = FAQSuggestions(self.history_repo, self.matcher, frequentes_repo=repo)
+        self.assertEqual(recarregado._get_from_history(n=2), ["Qual o horário?", "Onde fica?"])
+        self.history_repo.load_last.assert_not_called()
+
+
+class TestSugestoesDoCore(unittest.TestCase):
+    """Conjunto elegível montado com o índice do matcher e atualizado com ele."""
+
+    def setUp(self):
+        self.history_repo = MagicMock()
+        self.history_repo.load_last.return_value = []
+        self.matcher = IntentMatcher([
+            {"tag": "saudacao", "perguntas": ["Oi"], "respostas": {}},
+            {"tag": "fallback", "perguntas": [], "respostas": {}},
+            {"tag": "horario", "perguntas": ["Qual o horário?", "qual o horario"], "respostas": {}},
+        ], [])
+        self.faq = FAQSuggestions(self.history_repo, self.matcher)
+
+    def test_pool_pre_computado(self):
+        self.assertEqual(self.matcher.perguntas_sugeridas(), (("Qual o horário?",), ()))
+        self.assertEqual(self.faq._get_from_core(n=3), ["Qual o horário?"])
+
+    def test_atualiza_com_intencoes(self):
+        self.matcher.refresh_intents([{"tag": "local", "perguntas": ["Onde fica?"], "respostas": {}}])
+        self.assertEqual(self.faq._get_from_core(n=5), ["Onde fica?"])
+        self.assertEqual(len(self.faq.get_combined_suggestions(n_total=1)), 1)
+
+    def test_aprendidos_so_com_opt_in(self):
+        self.matcher.add_learned("Tem estacionamento?", "Sim")
+        self.assertEqual(self.faq._get_from_core(n=5), ["Qual o horário?"])
+        com_aprendidos = FAQSuggestions(self.history_repo, self.matcher, incluir_aprendidos=True)
+        self.assertEqual(sorted(com_aprendidos._get_from_core(n=5)), ["Qual o horário?", "Tem estacionamento?"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from infra.file_atomic import AtomicWriter, Durabilidade
+from infra.repositories import JsonlHistoryRepo, LearnedRepo, StatsRepo
+
+
+class TestAtomicWriterRapido(unittest.TestCase):
+    """Modo rápido: tmp + fsync + rename, sem backup nem re-parse."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'dados.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _ler(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_grava_e_substitui(self):
+        for checksum in (False, True):
+            writer = AtomicWriter(modo="rapido", checksum=checksum)
+            self.assertTrue(writer.write_json_atomic(self.path, [{"pergunta": "coração", "n": 1}]))
+            self.assertTrue(writer.write_json_atomic(self.path, [{"pergunta": "educação", "n": 2}]))
+            self.assertEqual(self._ler(), [{"pergunta": "educação", "n": 2}])
+            self.assertEqual(os.listdir(self.temp_dir), ['dados.json'])
+
+    def test_falha_preserva_arquivo_anterior(self):
+        writer = AtomicWriter(modo="rapido")
+        writer.write_json_atomic(self.path, {"ok": True})
+        self.assertFalse(writer.write_json_atomic(self.path, {"invalido": object()}))
+        self.assertEqual(self._ler(), {"ok": True})
+        self.assertEqual(os.listdir(self.temp_dir), ['dados.json'])
+
+    def test_escritores_concorrentes_nao_dividem_tmp(self):
+        # Cada escritor usa o próprio tmp: o arquivo final é sempre uma das versões inteiras
+        versoes = [bytes([i]) * 200_000 for i in range(8)]
+        writer = AtomicWriter()
+        threads = [threading.Thread(target=writer.write_bytes_atomic, args=(self.path, v)) for v in versoes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with open(self.path, 'rb') as f:
+            self.assertIn(f.read(), versoes)
+        self.assertEqual(os.listdir(self.temp_dir), ['dados.json'])
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            AtomicWriter(modo="turbo")
+
+
+class TestDurabilidade(unittest.TestCase):
+    """Políticas de fsync: none, batch (em grupo) e always."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'dados.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _escrever(self, politica, n=5, intervalo_ms=60_000):
+        durabilidade = Durabilidade(politica, intervalo_ms=intervalo_ms)
+        writer = AtomicWriter(modo="rapido", durabilidade=durabilidade)
+        for i in range(n):
+            self.assertTrue(writer.write_json_atomic(self.path, {"i": i}))
+        return durabilidade
+
+    def test_none_sem_fsync(self):
+        self.assertEqual(self._escrever("none").fsyncs, 0)
+
+    def test_always_fsync_por_escrita(self):
+        self.assertEqual(self._escrever("always").fsyncs, 10)  # arquivo + diretório
+
+    def test_batch_agrupa_fsyncs(self):
+        durabilidade = self._escrever("batch")
+        # Todo tmp passa por fsync antes do rename; o diretório sincroniza na
+        # primeira escrita e as seguintes esperam o intervalo
+        self.assertEqual(durabilidade.fsyncs, 6)
+        durabilidade.sincronizar()
+        self.assertEqual(durabilidade.fsyncs, 7)
+
+    def test_batch_timer_limita_atraso(self):
+        durabilidade = self._escrever("batch", n=2, intervalo_ms=20)
+        limite = time.monotonic() + 5
+        while durabilidade.fsyncs < 4 and time.monotonic() < limite:
+            time.sleep(0.01)
+        self.assertEqual(durabilidade.fsyncs, 4)
+
+    def test_batch_append_sincroniza_conteudo_em_grupo(self):
+        durabilidade = Durabilidade("batch", intervalo_ms=60_000)
+        for _ in range(3):
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("linha\n")
+            durabilidade.apos_escrita(self.path, rename=False)
+        self.assertEqual(durabilidade.fsyncs, 2)  # primeira escrita: arquivo + diretório
+        durabilidade.sincronizar()
+        self.assertEqual(durabilidade.fsyncs, 4)
+
+    def test_politica_invalida(self):
+        with self.assertRaises(ValueError):
+            Durabilidade("as vezes")
+
+    def test_politica_por_repositorio(self):
+        self.assertEqual(LearnedRepo(self.path).durabilidade.politica, "always")
+        self.assertEqual(StatsRepo(self.path).durabilidade.politica, "batch")
+        self.assertEqual(JsonlHistoryRepo(self.path).durabilidade.politica, "batch")
+        self.assertEqual(StatsRepo(self.path, durabilidade="none").durabilidade.politica, "none")
+
+
+if __name__ == '__main__':
+    unittest.main()
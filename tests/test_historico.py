@@ -5,7 +5,7 @@ import tempfile
 import shutil
 from datetime import datetime
 from unittest.mock import patch
-from infra.repositories import CoreRepo, LearnedRepo, HistoryRepo, StatsRepo
+from infra.repositories import CoreRepo, LearnedRepo, HistoryRepo, JsonlHistoryRepo, StatsRepo
 from infra.logging_conf import get_logger
 from core.intent_matcher import IntentMatcher
 from core.chatbot import Chatbot
@@ -227,5 +227,71 @@ class TestHistorico(unittest.TestCase):
         """Testa duração média de sessão."""
         # Este teste é mais complexo e depende do StatsRepo, que será testado em seu próprio arquivo.
         pass
+
+
+class TestHistoricoJsonl(unittest.TestCase):
+    """Histórico em JSON Lines: append O(1), rotação por tamanho e leitura pelo fim."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'historico.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_append_uma_linha_por_interacao(self):
+        repo = JsonlHistoryRepo(self.path)
+        for i in range(3):
+            self.assertTrue(repo.append(f"p{i}", f"r{i}", "formal", tag_intencao="t", is_fallback=False))
+        with open(self.path, 'r', encoding='utf-8') as f:
+            linhas = f.read().splitlines()
+        self.assertEqual(len(linhas), 3)
+        self.assertEqual(json.loads(linhas[-1])["pergunta"], "p2")
+
+    def test_load_last_mantem_ordem_e_historico_completo(self):
+        repo = JsonlHistoryRepo(self.path)
+        repo.BLOCO = 64  # força a leitura em vários blocos
+        for i in range(50):
+            repo.append(f"pergunta {i}", "resposta", "formal")
+        self.assertEqual([h["pergunta"] for h in repo.load_last(3)], ["pergunta 47", "pergunta 48", "pergunta 49"])
+        self.assertEqual(len(repo.load_last(100)), 50)
+        self.assertEqual(repo.load_last(0), [])
+
+    def test_rotacao_por_tamanho(self):
+        repo = JsonlHistoryRepo(self.path, max_bytes=4096, backups=2)
+        for i in range(60):
+            repo.append(f"pergunta {i}", "resposta", "formal")
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        self.assertLess(os.path.getsize(self.path + ".1"), 4096 + 512)
+        ultimas = repo.load_last(20)
+        self.assertEqual([h["pergunta"] for h in ultimas], [f"pergunta {i}" for i in range(40, 60)])
+
+    def test_falha_na_rotacao_nao_falha_append(self):
+        repo = JsonlHistoryRepo(self.path, max_bytes=1, backups=2)
+        with patch("infra.repositories.os.replace", side_effect=OSError("disco cheio")):
+            self.assertTrue(repo.append("pergunta 0", "resposta", "formal"))
+        self.assertTrue(repo.append("pergunta 1", "resposta", "formal"))
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        # Nenhuma linha duplicada: a rotação pendente acontece no append seguinte
+        perguntas = [h["pergunta"] for h in repo.load_last(10)]
+        self.assertEqual(perguntas, ["pergunta 0", "pergunta 1"])
+
+    def test_linha_truncada_ignorada(self):
+        repo = JsonlHistoryRepo(self.path)
+        repo.append("ok", "r", "formal")
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"pergunta": "cort')
+        self.assertEqual([h["pergunta"] for h in repo.load_last(5)], ["ok"])
+
+    def test_importa_historico_legado(self):
+        legado = os.path.join(self.temp_dir, 'historico.json')
+        with open(legado, 'w', encoding='utf-8') as f:
+            json.dump([{"pergunta": "antiga", "resposta": "r", "personalidade": "formal"}], f)
+        repo = JsonlHistoryRepo(self.path, legado=legado)
+        repo.append("nova", "r", "formal")
+        self.assertEqual([h["pergunta"] for h in repo.load_last(5)], ["antiga", "nova"])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
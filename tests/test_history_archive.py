@@ -0,0 +1,131 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from infra.history_archive import ArquivoHistorico
+from infra.repositories import HistoryRepo, JsonlHistoryRepo, entrada_historico
+
+INICIO = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _entrada(horas, fallback=False, tag="saudacao"):
+    ts = (INICIO + timedelta(hours=horas)).isoformat()
+    return entrada_historico(f"pergunta {horas}", "resposta", "formal", tag, fallback, ts, ts)
+
+
+class TestArquivoHistorico(unittest.TestCase):
+    """Segmentos diários compactados, com índice de offsets e intervalos por bloco."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.arquivo = ArquivoHistorico(os.path.join(self.temp_dir, 'arquivo'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_particiona_por_dia(self):
+        # 12h, 24h e 36h depois de 01/09 12:00 -> dias 02 e 03
+        self.assertEqual(self.arquivo.arquivar([_entrada(0), _entrada(12), _entrada(24), _entrada(36)]), 4)
+        self.assertEqual(self.arquivo.dias(), ["2025-09-01", "2025-09-02", "2025-09-03"])
+
+        with open(os.path.join(self.temp_dir, 'arquivo', '2025-09-02.idx.jsonl'), 'r', encoding='utf-8') as f:
+            blocos = [json.loads(linha) for linha in f]
+        self.assertEqual(len(blocos), 1)
+        self.assertEqual(blocos[0]["linhas"], 2)
+        self.assertEqual(blocos[0]["offset"], 0)
+
+        # O segmento é um gzip comum (membros concatenados)
+        self.arquivo.arquivar([_entrada(13)])
+        with gzip.open(os.path.join(self.temp_dir, 'arquivo', '2025-09-02.jsonl.gz'), 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+    def test_consulta_por_periodo_le_so_blocos_relevantes(self):
+        for dia in range(10):
+            self.arquivo.arquivar([_entrada(dia * 24 + h, fallback=(h == 1)) for h in range(3)])
+
+        desde = INICIO + timedelta(days=7)
+        fallbacks = list(self.arquivo.consultar(inicio=desde, fallback=True))
+        self.assertEqual([e["pergunta"] for e in fallbacks], ["pergunta 169", "pergunta 193", "pergunta 217"])
+        self.assertEqual(self.arquivo.metricas()["blocos_lidos"], 3)
+
+    def test_indice_so_recebe_appends(self):
+        caminho = os.path.join(self.temp_dir, 'arquivo', '2025-09-01.idx.jsonl')
+        self.arquivo.arquivar([_entrada(0)])
+        with open(caminho, 'rb') as f:
+            primeira = f.read()
+        with open(caminho, 'ab') as f:
+            f.write(b'{"offset": 9')  # linha truncada por uma queda
+        self.arquivo.arquivar([_entrada(1)])
+        with open(caminho, 'rb') as f:
+            linhas = f.read().split(b"\n")
+        # O começo do índice não é reescrito; a linha nova não emenda na truncada
+        self.assertEqual(linhas[0] + b"\n", primeira)
+        self.assertEqual(len([l for l in linhas if l]), 3)
+        self.assertEqual([e["pergunta"] for e in self.arquivo.consultar()], ["pergunta 0", "pergunta 1"])
+
+    def test_indice_antigo_continua_legivel(self):
+        self.arquivo.arquivar([_entrada(0)])
+        dir_arquivo = os.path.join(self.temp_dir, 'arquivo')
+        with open(os.path.join(dir_arquivo, '2025-09-01.idx.jsonl'), 'r', encoding='utf-8') as f:
+            blocos = [json.loads(linha) for linha in f]
+        os.remove(os.path.join(dir_arquivo, '2025-09-01.idx.jsonl'))
+        with open(os.path.join(dir_arquivo, '2025-09-01.idx.json'), 'w', encoding='utf-8') as f:
+            json.dump({"dia": "2025-09-01", "blocos": blocos}, f)
+        self.arquivo.arquivar([_entrada(1)])
+        self.assertEqual([e["pergunta"] for e in self.arquivo.consultar()], ["pergunta 0", "pergunta 1"])
+
+    def test_filtros_e_limites(self):
+        self.arquivo.arquivar([_entrada(0, tag="soma"), _entrada(1), _entrada(2, fallback=True, tag="fallback")])
+        self.arquivo.arquivar([_entrada(3)])
+        self.assertEqual(len(list(self.arquivo.consultar())), 4)
+        self.assertEqual([e["pergunta"] for e in self.arquivo.consultar(tag="soma")], ["pergunta 0"])
+        entre = list(self.arquivo.consultar(inicio=INICIO + timedelta(hours=1), fim=(INICIO + timedelta(hours=2)).isoformat()))
+        self.assertEqual([e["pergunta"] for e in entre], ["pergunta 1", "pergunta 2"])
+
+        # O segundo bloco não tem fallback e é pulado sem descompactar
+        antes = self.arquivo.metricas()["blocos_ignorados"]
+        self.assertEqual(len(list(self.arquivo.consultar(fallback=True))), 1)
+        self.assertEqual(self.arquivo.metricas()["blocos_ignorados"], antes + 1)
+
+
+class TestArquivamentoNosRepositorios(unittest.TestCase):
+    """O que sai do histórico ativo vai para o arquivo em vez de ser perdido."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.arquivo = ArquivoHistorico(os.path.join(self.temp_dir, 'arquivo'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_history_repo_arquiva_excedentes_em_lote(self):
+        repo = HistoryRepo(os.path.join(self.temp_dir, 'historico.json'), arquivo=self.arquivo, lote_arquivo=3)
+        for i in range(8):
+            e = _entrada(i)
+            repo.append(e["pergunta"], e["resposta"], e["personalidade"], max_len=5, timestamp_in=e["timestamp_in"])
+            if i == 6:
+                # Excedentes abaixo do lote continuam no historico.json
+                self.assertEqual(len(repo.load_last(10)), 7)
+                self.assertEqual(list(self.arquivo.consultar()), [])
+        self.assertEqual(len(repo.load_last(10)), 5)
+        self.assertEqual([e["pergunta"] for e in self.arquivo.consultar()], ["pergunta 0", "pergunta 1", "pergunta 2"])
+        self.assertEqual(self.arquivo.metricas()["blocos_lidos"], 1)  # um membro para o lote inteiro
+
+    def test_jsonl_arquiva_segmento_rotacionado(self):
+        repo = JsonlHistoryRepo(os.path.join(self.temp_dir, 'historico.jsonl'), max_bytes=2048, backups=1,
+                                arquivo=self.arquivo)
+        for i in range(40):
+            repo.append_many([_entrada(i)])
+        arquivadas = [e["pergunta"] for e in self.arquivo.consultar()]
+        ativas = [e["pergunta"] for e in repo.load_last(100)]
+        self.assertGreater(len(arquivadas), 0)
+        # Tudo o que foi gravado está no arquivo ou no arquivo ativo atual
+        self.assertEqual(set(arquivadas) | set(ativas), {f"pergunta {i}" for i in range(40)})
+
+
+if __name__ == '__main__':
+    unittest.main()
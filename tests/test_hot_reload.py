@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from infra.repositories import CoreRepo
+from core.hot_reload import CoreReloader
+from core.intent_matcher import IntentMatcher
+
+
+def _intencoes(*perguntas):
+    return {"intencoes": [
+        {"tag": "t", "perguntas": list(perguntas), "respostas": {"formal": ["r"]}},
+        {"tag": "fallback", "perguntas": [], "respostas": {"formal": ["Não entendi"]}},
+    ]}
+
+
+class TestCoreReloader(unittest.TestCase):
+    """Mudanças no core_data.json entram no matcher sem reiniciar o processo."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.core_file = os.path.join(self.temp_dir, 'core.json')
+        self._gravar(_intencoes("pergunta antiga"))
+        self.core_repo = CoreRepo(self.core_file)
+        self.matcher = IntentMatcher(self.core_repo.load_intents(), [])
+        self.reloader = CoreReloader(self.core_repo, self.matcher, intervalo_seg=0.01)
+
+    def tearDown(self):
+        self.reloader.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _gravar(self, conteudo):
+        with open(self.core_file, 'w', encoding='utf-8') as f:
+            f.write(conteudo if isinstance(conteudo, str) else json.dumps(conteudo))
+        # Garante mtime diferente mesmo em sistemas de arquivos com baixa resolução
+        st = os.stat(self.core_file)
+        os.utime(self.core_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_sem_mudanca_nao_recarrega(self):
+        self.assertFalse(self.reloader.verificar())
+        self.assertEqual(self.reloader.recargas, 0)
+
+    def test_recarrega_e_troca_indice(self):
+        self.assertIsNotNone(self.matcher.match("pergunta antiga"))
+        self._gravar(_intencoes("pergunta nova", "outra nova"))
+
+        self.assertTrue(self.reloader.verificar())
+        self.assertIsNone(self.matcher.match("pergunta antiga"))
+        self.assertEqual(self.matcher.match("pergunta nova")["intencao"]["tag"], "t")
+
+        metricas = self.reloader.metricas()
+        self.assertEqual(metricas["recargas"], 1)
+        self.assertIsNotNone(metricas["ultima_recarga_ms"])
+        self.assertEqual(metricas["indice"]["perguntas_base"], 2)
+
+    def test_json_invalido_mantem_indice(self):
+        self._gravar('{"intencoes": [')
+        self.assertFalse(self.reloader.verificar())
+        self.assertEqual(self.reloader.falhas, 1)
+        self.assertIsNotNone(self.matcher.match("pergunta antiga"))
+
+    def test_thread_de_fundo(self):
+        recarregou = threading.Event()
+        refresh = self.matcher.refresh_intents
+
+        def refresh_e_avisa(intencoes):
+            refresh(intencoes)
+            recarregou.set()
+
+        self.matcher.refresh_intents = refresh_e_avisa
+        self.reloader.start()
+        self._gravar(_intencoes("pergunta nova"))
+        self.assertTrue(recarregou.wait(5))
+        self.assertIsNotNone(self.matcher.match("pergunta nova"))
+
+
+if __name__ == '__main__':
+    unittest.main()
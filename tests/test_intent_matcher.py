@@ -0,0 +1,251 @@
+import threading
+import unittest
+
+from infra.repositories import CoreRepo
+from core.intent_matcher import Candidato, IntentMatcher
+from core.match_cache import AUSENTE, LRUCache
+
+
+class TestAprendidosIncrementais(unittest.TestCase):
+    """add_learned deve equivaler a refresh_learned com a lista completa."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.aprendidos = [
+            {"pergunta": "Qual a raiz de 9", "resposta_ensinada": "3"},
+            {"pergunta": "como somar frações com denominadores diferentes", "resposta_ensinada": "Use o MMC"},
+        ]
+
+    def _consultas(self):
+        return [
+            "Qual a raiz de 9", "qual a raiz de 9", "qual a raiz de 99",
+            "como somar fracoes com denominadores diferentes", "QUAL A RAIZ DE 16",
+            "pergunta desconhecida", "oi",
+        ]
+
+    def _comparar(self, incremental, completo):
+        for consulta in self._consultas():
+            self.assertEqual(incremental.match(consulta), completo.match(consulta), consulta)
+
+    def test_add_learned_equivale_refresh(self):
+        incremental = IntentMatcher(self.intencoes, list(self.aprendidos))
+        novos = [("QUAL A RAIZ DE 16", "4"), ("qual a raiz de 9", "três"), ("Qual a raiz de 9", "3!")]
+        for pergunta, resposta in novos:
+            incremental.add_learned(pergunta, resposta)
+
+        completo = IntentMatcher(self.intencoes, [])
+        completo.refresh_learned(list(self.aprendidos) + [
+            {"pergunta": p, "resposta_ensinada": r} for p, r in novos
+        ])
+        self._comparar(incremental, completo)
+
+    def test_add_learned_encontra_nova_pergunta(self):
+        matcher = IntentMatcher(self.intencoes, [])
+        self.assertIsNone(matcher.match("quanto é 7 vezes 8"))
+        matcher.add_learned("quanto é 7 vezes 8", "56")
+        self.assertEqual(matcher.match("Quanto é 7 vezes 8"), {"tipo": "aprendido", "resposta": "56"})
+        self.assertEqual(matcher.match("quanto é 7 vezes 8?"), {"tipo": "aprendido", "resposta": "56"})
+
+
+class TestCandidatosPreComputados(unittest.TestCase):
+    """Registros de candidatos guardam forma normalizada, tokens e dono."""
+
+    def test_registro_compacto(self):
+        cand = Candidato("Qual é o MDC", {"tag": "definicao_mdc"})
+        self.assertEqual(cand.norm, "qual e o mdc")
+        self.assertEqual(cand.tokens, frozenset({"qual", "e", "o", "mdc"}))
+        self.assertFalse(hasattr(cand, "__dict__"))
+
+    def test_fuzzy_usa_primeira_intencao_dona(self):
+        primeira = {"tag": "a", "perguntas": ["como calcular o mmc"], "respostas": {}}
+        segunda = {"tag": "b", "perguntas": ["como calcular o mmc"], "respostas": {}}
+        matcher = IntentMatcher([primeira, segunda], [])
+        self.assertIs(matcher.match("como calcular o mmcc")["intencao"], primeira)
+
+
+class TestMatchMany(unittest.TestCase):
+    """match_many deve devolver o mesmo que chamadas individuais a match, na ordem."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.matcher = IntentMatcher(self.intencoes, [{"pergunta": "quanto é 2+2", "resposta_ensinada": "4"}])
+        perguntas = [p for i in self.intencoes for p in i.get("perguntas", [])]
+        self.lote = perguntas + [p.upper() for p in perguntas] + ["quanto é 2+2", "desconhecida", "oi", "oi"]
+
+    def test_mesma_ordem_e_resultados(self):
+        esperado = [self.matcher.match(p) for p in self.lote]
+        self.assertEqual(self.matcher.match_many(self.lote), esperado)
+
+    def test_lote_vazio(self):
+        self.assertEqual(self.matcher.match_many([]), [])
+
+    def test_paralelo_preserva_referencias(self):
+        esperado = [self.matcher.match(p) for p in self.lote]
+        obtido = self.matcher.match_many(self.lote, processos=2, min_paralelo=0)
+        self.assertEqual(obtido, esperado)
+        for r in obtido:
+            if r and r["tipo"] == "intent":
+                self.assertTrue(any(r["intencao"] is i for i in self.intencoes))
+
+
+class TestCacheResultados(unittest.TestCase):
+    """Cache LRU na frente do match: memoiza, invalida e mantém contadores."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.matcher = IntentMatcher(self.intencoes, [], cache_max=2)
+
+    def test_hit_na_pergunta_normalizada(self):
+        primeiro = self.matcher.match("oi")
+        self.assertEqual(self.matcher.match("  OI "), primeiro)
+        stats = self.matcher.cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_evictions_respeitam_limite(self):
+        for p in ("oi", "olá", "bom dia"):
+            self.matcher.match(p)
+        stats = self.matcher.cache_stats()
+        self.assertEqual(stats["tamanho"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_add_learned_invalida_fallback_em_cache(self):
+        self.assertIsNone(self.matcher.match("quanto é 3 vezes 3"))
+        self.matcher.add_learned("quanto é 3 vezes 3", "9")
+        self.assertEqual(self.matcher.match("quanto é 3 vezes 3"), {"tipo": "aprendido", "resposta": "9"})
+
+    def test_refresh_intents_invalida(self):
+        self.assertEqual(self.matcher.match("oi")["tipo"], "intent")
+        self.matcher.refresh_intents([])
+        self.assertIsNone(self.matcher.match("oi"))
+        self.assertGreaterEqual(self.matcher.cache_stats()["invalidacoes"], 1)
+
+    def test_exata_cs_tem_precedencia_sobre_cache(self):
+        matcher = IntentMatcher(self.intencoes, [
+            {"pergunta": "Teste X", "resposta_ensinada": "maiúscula"},
+            {"pergunta": "teste x", "resposta_ensinada": "minúscula"},
+        ])
+        self.assertEqual(matcher.match("TESTE X")["resposta"], "minúscula")  # CI, vai para o cache
+        self.assertEqual(matcher.match("Teste X")["resposta"], "maiúscula")  # hit, mas CS vence
+        self.assertEqual(matcher.cache_stats()["hits"], 1)
+
+    def test_ttl(self):
+        agora = [0.0]
+        cache = LRUCache(max_itens=10, ttl_seg=5, relogio=lambda: agora[0])
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        agora[0] = 6.0
+        self.assertIs(cache.get("a"), AUSENTE)
+        self.assertEqual(cache.stats()["expirados"], 1)
+
+    def test_descartar_nao_bloqueia_leituras(self):
+        cache = LRUCache(max_itens=10)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        lidos = []
+
+        def predicado(chave, valor):
+            # Uma leitura concorrente durante o predicado termina sem esperar a invalidação
+            leitor = threading.Thread(target=lambda: lidos.append(cache.get("a")))
+            leitor.start()
+            leitor.join(timeout=1)
+            cache.put("b", 3)  # alterado no meio: não é removido
+            return True
+
+        self.assertEqual(cache.descartar(predicado), 1)
+        self.assertEqual(lidos, [1, 1])
+        self.assertIs(cache.get("a"), AUSENTE)
+        self.assertEqual(cache.get("b"), 3)
+
+
+class TestCacheNegativo(unittest.TestCase):
+    """Perguntas sem correspondência são lembradas até algo novo poder casar com elas."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.matcher = IntentMatcher(self.intencoes, [])
+
+    def test_fallback_repetido_usa_cache_negativo(self):
+        self.assertIsNone(self.matcher.match("como calcular raiz quadrada"))
+        self.assertIsNone(self.matcher.match("Como calcular raiz quadrada "))
+        stats = self.matcher.negative_cache_stats()
+        self.assertEqual(stats["tamanho"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_add_learned_remove_apenas_perguntas_afetadas(self):
+        self.matcher.match("como calcular raiz quadrada")
+        self.matcher.match("qual a capital da frança")
+        self.matcher.add_learned("como calcular raiz quadrada?", "Procure o número que multiplicado por ele mesmo...")
+
+        self.assertEqual(self.matcher.negative_cache_stats()["tamanho"], 1)
+        self.assertEqual(self.matcher.match("como calcular raiz quadrada")["tipo"], "aprendido")
+        self.assertIsNone(self.matcher.match("qual a capital da frança"))
+
+    def test_cs_continua_valendo_com_cache_negativo(self):
+        self.matcher.match("Pergunta Nova")
+        self.matcher.refresh_learned([{"pergunta": "Pergunta Nova", "resposta_ensinada": "ok"}])
+        self.assertEqual(self.matcher.match("Pergunta Nova"), {"tipo": "aprendido", "resposta": "ok"})
+
+    def test_refresh_learned_com_remocao_limpa_tudo(self):
+        self.matcher.refresh_learned([{"pergunta": "pergunta antiga", "resposta_ensinada": "x"}])
+        self.matcher.match("outra coisa qualquer")
+        self.matcher.refresh_learned([])
+        self.assertEqual(self.matcher.negative_cache_stats()["tamanho"], 0)
+
+    def test_intencoes_em_cache_sobrevivem_a_aprendizado(self):
+        self.matcher.match("oi")
+        self.matcher.add_learned("algo novo", "resposta")
+        self.matcher.match("oi")
+        self.assertEqual(self.matcher.cache_stats()["hits"], 1)
+
+
+class TestEstadoCopyOnWrite(unittest.TestCase):
+    """Ensinar publica uma nova versão do estado sem alterar a que está sendo lida."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+
+    def test_versao_anterior_nao_muda(self):
+        aprendidos = [{"pergunta": "quanto é 2+2", "resposta_ensinada": "4"}]
+        matcher = IntentMatcher(self.intencoes, aprendidos)
+        anterior = matcher._estado
+
+        matcher.add_learned("quanto é 3+3", "6")
+
+        self.assertIsNot(matcher._estado, anterior)
+        self.assertIs(matcher._estado.base, anterior.base)
+        self.assertEqual(len(anterior.aprendidos.itens), 1)
+        self.assertEqual(len(anterior.aprendidos.indice), 1)
+        self.assertNotIn("quanto e 3+3", anterior.aprendidos.mapa_ci)
+        self.assertEqual(len(aprendidos), 1)
+        self.assertEqual(matcher.match("quanto é 3+3"), {"tipo": "aprendido", "resposta": "6"})
+
+    def test_buscas_concorrentes_durante_aprendizado(self):
+        matcher = IntentMatcher(self.intencoes, [])
+        erros = []
+        parar = threading.Event()
+
+        def ler():
+            while not parar.is_set():
+                try:
+                    for pergunta in ("oi", "pergunta ensinada 7", "pergunta ensinada 70", "nada a ver"):
+                        matcher.match(pergunta)
+                except Exception as e:  # pragma: no cover - só em caso de regressão
+                    erros.append(e)
+
+        leitores = [threading.Thread(target=ler) for _ in range(4)]
+        for t in leitores:
+            t.start()
+        for i in range(100):
+            matcher.add_learned(f"pergunta ensinada {i}", str(i))
+        parar.set()
+        for t in leitores:
+            t.join()
+
+        self.assertEqual(erros, [])
+        for i in range(100):
+            self.assertEqual(matcher.match(f"pergunta ensinada {i}"), {"tipo": "aprendido", "resposta": str(i)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from core import kb_snapshot
+from core.intent_matcher import IntentMatcher
+
+
+class TestKbSnapshot(unittest.TestCase):
+    """O snapshot compilado deve reproduzir o matcher e ser descartado quando os JSON mudam."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.core = os.path.join(self.temp_dir, 'core.json')
+        self.learned = os.path.join(self.temp_dir, 'new.json')
+        self.snapshot = os.path.join(self.temp_dir, 'kb.bin')
+        shutil.copy('data/core_data.json', self.core)
+        with open(self.learned, 'w', encoding='utf-8') as f:
+            json.dump([{"pergunta": "quanto é 2+2", "resposta_ensinada": "4"}], f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _perguntas(self, matcher):
+        return [p for i in matcher.intencoes for p in i.get("perguntas", [])] + ["quanto e 2+2", "desconhecida"]
+
+    def test_snapshot_equivale_ao_rebuild(self):
+        compilado = kb_snapshot.compilar(self.core, self.learned, self.snapshot)
+        carregado = kb_snapshot._ler_snapshot(self.snapshot, "difflib", kb_snapshot.hash_fontes((self.core, self.learned)))
+        self.assertIsInstance(carregado, IntentMatcher)
+        for pergunta in self._perguntas(compilado):
+            self.assertEqual(carregado.match(pergunta), compilado.match(pergunta))
+        # Intenções devolvidas são os mesmos objetos da lista do matcher carregado
+        r = carregado.match(carregado.intencoes[0]["perguntas"][0])
+        self.assertTrue(any(r["intencao"] is i for i in carregado.intencoes))
+
+    def test_recompila_quando_fonte_muda(self):
+        kb_snapshot.carregar(self.core, self.learned, self.snapshot)
+        with open(self.learned, 'w', encoding='utf-8') as f:
+            json.dump([{"pergunta": "quanto é 3+3", "resposta_ensinada": "6"}], f)
+
+        digest = kb_snapshot.hash_fontes((self.core, self.learned))
+        self.assertIsNone(kb_snapshot._ler_snapshot(self.snapshot, "difflib", digest))
+
+        matcher = kb_snapshot.carregar(self.core, self.learned, self.snapshot)
+        self.assertEqual(matcher.match("quanto é 3+3"), {"tipo": "aprendido", "resposta": "6"})
+        self.assertIsNotNone(kb_snapshot._ler_snapshot(self.snapshot, "difflib", digest))
+
+    def test_snapshot_corrompido_recompila(self):
+        with open(self.snapshot, 'wb') as f:
+            f.write(b"lixo")
+        matcher = kb_snapshot.carregar(self.core, self.learned, self.snapshot)
+        self.assertEqual(matcher.match("quanto é 2+2"), {"tipo": "aprendido", "resposta": "4"})
+
+    def test_caches_nao_vao_para_o_snapshot(self):
+        kb_snapshot.compilar(self.core, self.learned, self.snapshot).match("oi")
+        carregado = kb_snapshot.carregar(self.core, self.learned, self.snapshot)
+        self.assertEqual(carregado.cache_stats()["tamanho"], 0)
+        carregado.add_learned("nova pergunta", "nova resposta")
+        self.assertEqual(carregado.match("nova pergunta"), {"tipo": "aprendido", "resposta": "nova resposta"})
+
+
+if __name__ == '__main__':
+    unittest.main()
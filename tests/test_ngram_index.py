@@ -0,0 +1,97 @@
+import unittest
+import random
+from difflib import SequenceMatcher, get_close_matches
+
+from infra.repositories import CoreRepo
+from core.ngram_index import NgramIndex
+from core.intent_matcher import IntentMatcher
+
+
+class TestNgramIndex(unittest.TestCase):
+    """Garante que o índice de n-gramas não altera o resultado do difflib."""
+
+    def setUp(self):
+        intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.perguntas = [p for i in intencoes for p in i.get("perguntas", [])]
+        self.indice = NgramIndex(self.perguntas)
+
+    def test_equivalente_get_close_matches_core(self):
+        """Mesmo resultado do get_close_matches para variações das perguntas do core."""
+        for p in self.perguntas:
+            for consulta in (p, p[:-1], p + "s", "x" + p, p.upper().lower()):
+                for cutoff in (0.6, 0.8, 0.9):
+                    esperado = get_close_matches(consulta, self.perguntas, n=1, cutoff=cutoff)
+                    self.assertEqual(self.indice.close_matches(consulta, n=1, cutoff=cutoff), esperado)
+
+    def test_equivalente_get_close_matches_aleatorio(self):
+        """Corpus aleatório com alfabeto pequeno (muitos n-gramas repetidos)."""
+        rnd = random.Random(7)
+        alfabeto = "abcde fg"
+
+        def texto():
+            return "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 20)))
+
+        for _ in range(50):
+            corpus = [texto() for _ in range(40)]
+            indice = NgramIndex(corpus)
+            for _ in range(20):
+                consulta = texto()
+                for n in (1, 3):
+                    esperado = get_close_matches(consulta, corpus, n=n, cutoff=0.8)
+                    self.assertEqual(indice.close_matches(consulta, n=n, cutoff=0.8), esperado)
+
+    def test_decisao_usa_ratio_na_ordem_da_consulta(self):
+        """O índice só escolhe o candidato; o ratio da decisão é ratio(consulta, candidato)."""
+        matcher = IntentMatcher(intencoes=CoreRepo('data/core_data.json').load_intents(), aprendidos=[])
+        casos = [
+            # (consulta, candidato, tag esperada): ratio assimétrico em torno de 0.92
+            ("estu ou dificuldades nos estudos", "estou com dificuldades nos estudos", "dificuldade_estudos"),
+            ("me sinto sobrecarroeao", "me sinto sobrecarregado", None),
+        ]
+        for consulta, candidato, tag in casos:
+            direto = SequenceMatcher(None, consulta, candidato).ratio()
+            invertido = SequenceMatcher(None, candidato, consulta).ratio()
+            self.assertNotEqual(direto >= 0.92, invertido >= 0.92)
+            resultado = matcher.match(consulta)
+            self.assertEqual(resultado and resultado["intencao"]["tag"], tag)
+
+    def test_copia_independente(self):
+        original = NgramIndex(["qual é o mdc", "como somar frações"])
+        copia = original.copia()
+        copia.add("qual é o mmc")
+        self.assertEqual(len(original), 2)
+        self.assertEqual(original.close_matches("qual é o mmc", n=3, cutoff=0.95), [])
+        self.assertEqual(copia.close_matches("qual é o mmc", n=3, cutoff=0.95), ["qual é o mmc"])
+
+    def test_shortlist_menor_que_corpus(self):
+        """O índice deve descartar a maior parte dos candidatos antes do SequenceMatcher."""
+        total = sum(len(self.indice.candidatos(p, 0.8)) for p in self.perguntas)
+        self.assertLess(total / len(self.perguntas), len(self.perguntas) / 2)
+
+    def test_contadores_por_estagio(self):
+        """Cada candidato avaliado é podado por exatamente um estágio ou aprovado."""
+        for p in self.perguntas:
+            self.indice.close_matches(p[1:], n=1, cutoff=0.8)
+        c = self.indice.contadores.snapshot()
+        self.assertEqual(c["avaliados"], len(self.perguntas) ** 2)
+        self.assertEqual(c["avaliados"], sum(c["podados"].values()) + c["aprovados"])
+        self.assertGreater(c["podados"].get("tamanho", 0) + c["podados"].get("ngramas", 0), c["aprovados"])
+
+    def test_prefilter_stats_do_matcher(self):
+        matcher = IntentMatcher(intencoes=CoreRepo('data/core_data.json').load_intents(), aprendidos=[])
+        matcher.match("qual é o mdc de 12 e 18")
+        stats = matcher.prefilter_stats()
+        self.assertEqual(set(stats), {"base", "aprendidos", "decisao"})
+        self.assertEqual(stats["base"]["avaliados"], len(self.perguntas))
+
+    def test_matcher_usa_indice(self):
+        """IntentMatcher continua encontrando perguntas com pequenas variações."""
+        intencoes = [{"tag": "definicao_mdc", "perguntas": ["o que é mdc"], "respostas": {}}]
+        matcher = IntentMatcher(intencoes=intencoes, aprendidos=[])
+        resultado = matcher.match("o que é o mdc")
+        self.assertIsNotNone(resultado)
+        self.assertEqual(resultado["intencao"]["tag"], "definicao_mdc")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from infra.repositories import CoreRepo
+from core.intent_matcher import IntentMatcher
+from core.normalization import Consulta, normalizar
+from core.validation import preprocessar, validate_input
+
+
+class TestNormalizar(unittest.TestCase):
+    """Forma canônica: sem acentos, caixa, pontuação nem espaços extras."""
+
+    def test_acentos_caixa_e_pontuacao(self):
+        self.assertEqual(normalizar("  Olá,   tudo bem?? "), "ola tudo bem")
+        self.assertEqual(normalizar("MATEMÁTICA"), normalizar("matematica"))
+        self.assertEqual(normalizar("«Coração»!"), "coracao")
+
+    def test_simbolos_matematicos_preservados(self):
+        self.assertEqual(normalizar("quanto é 2+2?"), "quanto e 2+2")
+        self.assertNotEqual(normalizar("2+2"), normalizar("2-2"))
+
+    def test_consulta_pre_computada(self):
+        consulta = Consulta("Quanto é 2+2?")
+        self.assertEqual(consulta.original, "Quanto é 2+2?")
+        self.assertEqual(consulta.norm, "quanto e 2+2")
+        self.assertEqual(consulta.tokens, frozenset({"quanto", "e", "2+2"}))
+        self.assertEqual(consulta.numeros, ("2", "2"))
+
+
+class TestPreprocessar(unittest.TestCase):
+    """Validação e normalização numa única etapa."""
+
+    def test_rejeita_como_validate_input(self):
+        for texto in ["", "   ", "a" * 1001, "oi\x00", "oi\\x00", "oi\\u0007"]:
+            self.assertIsNone(preprocessar(texto))
+            self.assertFalse(validate_input(texto))
+
+    def test_aceita_acentos(self):
+        consulta = preprocessar("Equação com acentuação: çãõ")
+        self.assertIsNotNone(consulta)
+        self.assertEqual(consulta.norm, "equacao com acentuacao cao")
+
+
+class TestMatchSemAcentos(unittest.TestCase):
+    """O matcher compara perguntas pela forma normalizada."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.matcher = IntentMatcher(self.intencoes, [{"pergunta": "Quanto é 2+2?", "resposta_ensinada": "4"}])
+
+    def test_base_com_e_sem_acentos(self):
+        pergunta = next(p for i in self.intencoes for p in i.get("perguntas", []) if normalizar(p) != p.lower())
+        esperado = self.matcher.match(pergunta)
+        self.assertIsNotNone(esperado)
+        self.assertEqual(self.matcher.match(normalizar(pergunta)), esperado)
+        self.assertEqual(self.matcher.match(Consulta(pergunta.upper())), esperado)
+
+    def test_aprendido_sem_acento_e_pontuacao(self):
+        self.assertEqual(self.matcher.match("quanto e 2+2"), {"tipo": "aprendido", "resposta": "4"})
+
+    def test_aprendido_nao_casa_com_outros_numeros(self):
+        self.assertIsNone(self.matcher.match("quanto é 2+3"))
+        matcher = IntentMatcher([], [{"pergunta": "Qual a raiz de 9", "resposta_ensinada": "3"},
+                                     {"pergunta": "pergunta1_UAT015", "resposta_ensinada": "resposta1"}])
+        self.assertIsNone(matcher.match("Qual a raiz de 8"))
+        self.assertIsNone(matcher.match("pergunta2_UAT015"))
+        self.assertEqual(matcher.match("qual a raiz de 9?"), {"tipo": "aprendido", "resposta": "3"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from infra.read_cache import CacheLeitura
+from infra.repositories import BaseRepo, LearnedRepo, StatsRepo
+
+
+class TestCacheLeitura(unittest.TestCase):
+    """O JSON só é parseado de novo quando mtime, tamanho ou inode mudam."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'dados.json')
+        self.cache = CacheLeitura()
+        self.parses = 0
+        self._gravar({"n": 1, "itens": [1, 2]})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _gravar(self, conteudo):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f)
+
+    def _carregar(self):
+        self.parses += 1
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_hit_sem_parse(self):
+        for _ in range(3):
+            self.assertEqual(self.cache.obter(self.path, self._carregar), {"n": 1, "itens": [1, 2]})
+        self.assertEqual(self.parses, 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_mudanca_invalida(self):
+        self.cache.obter(self.path, self._carregar)
+        self._gravar({"n": 22, "itens": []})
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.cache.obter(self.path, self._carregar)["n"], 22)
+        self.assertEqual(self.parses, 2)
+        self.assertEqual(self.cache.stats()["invalidacoes"], 1)
+
+    def test_copia_defensiva(self):
+        primeira = self.cache.obter(self.path, self._carregar)
+        primeira["n"] = 99
+        primeira["itens"].append(3)
+        self.assertEqual(self.cache.obter(self.path, self._carregar), {"n": 1, "itens": [1, 2]})
+
+    def test_erro_nao_e_guardado(self):
+        self.assertIsNone(self.cache.obter(self.path, lambda: None))
+        self.assertIsNotNone(self.cache.obter(self.path, self._carregar))
+        self.assertEqual(self.parses, 1)
+
+
+class TestCacheNosRepositorios(unittest.TestCase):
+    """Leituras repetidas dos repositórios reaproveitam o parse; escritas aparecem na hora."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_stats_load_repetido(self):
+        repo = StatsRepo(os.path.join(self.temp_dir, 'stats.json'))
+        repo._write_to_report = lambda registros: None
+        repo.update_interaction(False, "formal", "t", "2025-01-01T10:00:00", "2025-01-01T10:00:01")
+
+        antes = BaseRepo.read_cache_stats()["hits"]
+        repo.load()["total_interactions"] = 1000
+        self.assertEqual(repo.load()["total_interactions"], 1)
+        self.assertGreater(BaseRepo.read_cache_stats()["hits"], antes)
+
+    def test_escrita_visivel_na_proxima_leitura(self):
+        repo = LearnedRepo(os.path.join(self.temp_dir, 'new_data.json'))
+        for i in range(3):
+            repo.append(f"pergunta {i}", "resposta")
+            self.assertEqual(len(repo.load()), i + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from infra.report_writer import CABECALHO, RelatorioInteracoes, gerar_resumo
+from infra.repositories import StatsRepo
+
+
+class TestRelatorioInteracoes(unittest.TestCase):
+    """Blocos do relatório ficam em memória e são gravados em lote, com rotação compactada."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'relatório.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _ler(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_grava_em_lote(self):
+        relatorio = RelatorioInteracoes(self.path, intervalo_seg=60)
+        relatorio.registrar([(1, 0, "formal", "saudacao"), (2, 1, "formal", None)])
+        relatorio.registrar([(3, 1, "engracada", "soma")])
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(relatorio.pendentes(), 3)
+
+        self.assertTrue(relatorio.flush())
+        texto = self._ler()
+        self.assertTrue(texto.startswith(CABECALHO))
+        self.assertEqual(texto.count("Interação registrada"), 3)
+        self.assertIn("  - Tag: soma\n", texto)
+        self.assertEqual(relatorio.metricas()["lotes"], 1)
+        relatorio.close()
+
+    def test_close_grava_pendentes(self):
+        relatorio = RelatorioInteracoes(self.path, intervalo_seg=60)
+        relatorio.registrar([(1, 0, "formal", "saudacao")])
+        relatorio.close()
+        self.assertIn("Total: 1", self._ler())
+
+    def test_rotaciona_por_tamanho_e_compacta(self):
+        relatorio = RelatorioInteracoes(self.path, max_bytes=200, backups=2, intervalo_seg=60)
+        for i in range(5):
+            relatorio.registrar([(i, 0, "formal", "saudacao")])
+            relatorio.flush()
+            # mtimes distintos para a ordem dos segmentos
+            if os.path.exists(self.path):
+                st = os.stat(self.path)
+                os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns - (10 - i) * 1_000_000_000))
+        relatorio.close()
+
+        segmentos = relatorio.segmentos()
+        self.assertEqual(len(segmentos), 2)
+        with gzip.open(segmentos[-1], 'rt', encoding='utf-8') as f:
+            self.assertIn("Total: 3", f.read())
+        self.assertIn("Total: 4", self._ler())
+
+    def test_rotaciona_quando_muda_o_dia(self):
+        relatorio = RelatorioInteracoes(self.path, intervalo_seg=60)
+        relatorio.registrar([(1, 0, "formal", "saudacao")])
+        relatorio.flush()
+        ontem = time.time() - 86400
+        os.utime(self.path, (ontem, ontem))
+
+        relatorio.registrar([(2, 0, "formal", "saudacao")])
+        relatorio.flush()
+        relatorio.close()
+        self.assertEqual(len(relatorio.segmentos()), 1)
+        self.assertNotIn("Total: 1", self._ler())
+
+    def test_stats_repo_usa_relatorio(self):
+        relatorio = RelatorioInteracoes(self.path, intervalo_seg=60)
+        repo = StatsRepo(os.path.join(self.temp_dir, 'stats.json'), relatorio=relatorio)
+        repo.update_interaction(False, "formal", "saudacao", "2025-01-01T10:00:00", "2025-01-01T10:00:01")
+        self.assertEqual(relatorio.pendentes(), 1)
+        relatorio.close()
+        texto = self._ler()
+        self.assertIn("Personalidade usada: formal", texto)
+        # Horário da interação, não o do enfileiramento
+        esperado = datetime(2025, 1, 1, 10, 0).astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        self.assertIn(f"[{esperado}", texto)
+
+    def test_falha_devolve_lote_para_a_fila(self):
+        relatorio = RelatorioInteracoes(self.path, intervalo_seg=60, max_retidos=3)
+        relatorio.registrar([(1, 0, "formal", "saudacao"), (2, 0, "formal", "saudacao")])
+        with patch("builtins.open", side_effect=OSError("disco cheio")):
+            self.assertFalse(relatorio.flush())
+        self.assertEqual(relatorio.pendentes(), 2)
+
+        relatorio.registrar([(3, 0, "formal", "saudacao"), (4, 0, "formal", "saudacao")])
+        with patch("builtins.open", side_effect=OSError("disco cheio")):
+            self.assertFalse(relatorio.flush())
+        self.assertEqual(relatorio.pendentes(), 3)
+        self.assertEqual(relatorio.metricas()["descartados"], 1)
+
+        self.assertTrue(relatorio.flush())
+        relatorio.close()
+        texto = self._ler()
+        self.assertNotIn("Total: 1\n", texto)
+        self.assertLess(texto.index("Total: 2"), texto.index("Total: 3"))
+        self.assertLess(texto.index("Total: 3"), texto.index("Total: 4"))
+
+
+class TestGerarResumo(unittest.TestCase):
+    """Resumo legível montado a partir das estatísticas agregadas."""
+
+    def test_resumo(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            relatorio = RelatorioInteracoes(os.path.join(temp_dir, 'relatório.txt'), intervalo_seg=60)
+            repo = StatsRepo(os.path.join(temp_dir, 'stats.json'), relatorio=relatorio)
+            repo.update_interactions([
+                (False, "formal", "saudacao", "2025-01-01T10:00:00", "2025-01-01T10:00:02"),
+                (True, "engracada", "fallback", "2025-01-01T12:00:00", "2025-01-01T12:00:01"),
+            ])
+            destino = os.path.join(temp_dir, 'resumo.txt')
+            texto = gerar_resumo(repo.load(), destino=destino)
+            relatorio.close()
+
+            self.assertIn("Total de interações: 2", texto)
+            self.assertIn("Fallbacks: 1 (50.0%)", texto)
+            self.assertIn("  - engracada: 1 (50.0%)", texto)
+            self.assertIn("  - 2025-01-01: 1 sessões", texto)
+            with open(destino, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), texto)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import random
+import unittest
+from collections import Counter
+
+from infra.sketches import FrequentesComDecaimento, SpaceSaving
+
+
+class TestSpaceSaving(unittest.TestCase):
+    """Itens frequentes com memória fixa e limites de erro garantidos."""
+
+    def _fluxo(self, n=20000, semente=7):
+        rng = random.Random(semente)
+        # Poucos itens dominantes e uma cauda longa de itens raros
+        frequentes = [f"faq {i}" for i in range(5)]
+        return [rng.choice(frequentes) if rng.random() < 0.5 else f"raro {rng.randrange(5000)}" for _ in range(n)]
+
+    def test_exato_abaixo_da_capacidade(self):
+        resumo = SpaceSaving(capacidade=10)
+        for item in ["a", "b", "a", "c", "a", "b"]:
+            resumo.add(item)
+        self.assertEqual(resumo.top(2), [("a", 3, 0), ("b", 2, 0)])
+        self.assertEqual(resumo.total, 6)
+
+    def test_memoria_fixa_e_limites(self):
+        fluxo = self._fluxo()
+        reais = Counter(fluxo)
+        resumo = SpaceSaving(capacidade=50)
+        for item in fluxo:
+            resumo.add(item)
+
+        self.assertEqual(len(resumo), 50)
+        top5 = [item for item, _, _ in resumo.top(5)]
+        self.assertEqual(sorted(top5), sorted(item for item, _ in reais.most_common(5)))
+        for item, contagem, erro in resumo.top(50):
+            self.assertLessEqual(contagem - erro, reais[item])
+            self.assertGreaterEqual(contagem, reais[item])
+
+    def test_combinar_parciais(self):
+        fluxo = self._fluxo()
+        inteiro = SpaceSaving(capacidade=50)
+        partes = [SpaceSaving(capacidade=50), SpaceSaving(capacidade=50)]
+        for i, item in enumerate(fluxo):
+            inteiro.add(item)
+            partes[i % 2].add(item)
+        combinado = partes[0].combinar(partes[1])
+        self.assertEqual(len(combinado), 50)
+        self.assertEqual(combinado.total, len(fluxo))
+        self.assertEqual({i for i, _, _ in combinado.top(5)}, {i for i, _, _ in inteiro.top(5)})
+
+    def test_serializacao(self):
+        resumo = SpaceSaving(capacidade=3)
+        for item in "abcabad":
+            resumo.add(item)
+        copia = SpaceSaving.from_dict(resumo.to_dict())
+        self.assertEqual(copia.top(3), resumo.top(3))
+        copia.add("e")
+        self.assertEqual(len(copia), 3)
+
+    def test_capacidade_invalida(self):
+        with self.assertRaises(ValueError):
+            SpaceSaving(capacidade=0)
+
+
+class TestFrequentesComDecaimento(unittest.TestCase):
+    """Mais frequentes com meia-vida: o que foi muito perguntado há tempo perde para o atual."""
+
+    def setUp(self):
+        self.agora = 1_000_000.0
+
+    def _relogio(self):
+        return self.agora
+
+    def test_decaimento_meia_vida(self):
+        frequentes = FrequentesComDecaimento(capacidade=10, meia_vida_seg=100, relogio=self._relogio)
+        for _ in range(8):
+            frequentes.add("antiga", "Antiga?")
+        self.agora += 300  # três meias-vidas: 8 -> 1
+        for _ in range(2):
+            frequentes.add("nova", "Nova?")
+        top = frequentes.top(2)
+        self.assertEqual([texto for texto, _ in top], ["Nova?", "Antiga?"])
+        self.assertAlmostEqual(top[0][1], 2.0)
+        self.assertAlmostEqual(top[1][1], 1.0)
+
+    def test_reescala_sem_mudar_ordem(self):
+        frequentes = FrequentesComDecaimento(capacidade=10, meia_vida_seg=1, relogio=self._relogio)
+        frequentes.add("a")
+        frequentes.add("a")
+        frequentes.add("b")
+        self.agora += FrequentesComDecaimento.MAX_EXPOENTE + 5
+        frequentes.add("c")
+        self.assertEqual(frequentes.t0, self.agora)
+        self.assertEqual([item for item, _ in frequentes.top(3)], ["c", "a", "b"])
+        self.assertAlmostEqual(frequentes.top(1)[0][1], 1.0)
+
+    def test_serializacao_guarda_exibicao(self):
+        frequentes = FrequentesComDecaimento(capacidade=2, meia_vida_seg=100, relogio=self._relogio)
+        for chave, texto in [("oi", "Oi!"), ("oi", "oi"), ("horario", "Qual o horário?"), ("x", "X")]:
+            frequentes.add(chave, texto)
+        copia = FrequentesComDecaimento.from_dict(frequentes.to_dict(), relogio=self._relogio)
+        self.assertEqual(copia.top(2), frequentes.top(2))
+        self.assertEqual(len(copia.to_dict()["exibicao"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from core.faq_suggestions import FAQSuggestions
+from core.intent_matcher import IntentMatcher
+from infra.report_writer import RelatorioInteracoes
+from infra.repositories import LearnedRepo, PerguntasFrequentesRepo, StatsRepo, entrada_historico
+from infra.sqlite_repositories import (
+    SqliteDatabase, SqliteHistoryRepo, SqliteLearnedRepo, SqlitePerguntasFrequentesRepo, SqliteStatsRepo, migrar_json,
+)
+
+
+class TestSqliteRepositories(unittest.TestCase):
+    """Mesmo contrato dos repositórios JSON, gravando num banco SQLite em WAL."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = SqliteDatabase(os.path.join(self.temp_dir, 'educalin.db'))
+        self.relatorio = RelatorioInteracoes(os.path.join(self.temp_dir, 'relatório.txt'), intervalo_seg=60)
+
+    def tearDown(self):
+        self.relatorio.close()
+        self.db.fechar()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_wal_e_indices(self):
+        conn = self.db.conexao()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indices = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for nome in ("idx_historico_timestamp", "idx_historico_tag", "idx_historico_personalidade"):
+            self.assertIn(nome, indices)
+
+    def test_historico_load_last(self):
+        repo = SqliteHistoryRepo(self.db)
+        for i in range(7):
+            self.assertTrue(repo.append(f"pergunta {i}", "resposta", "formal", tag_intencao="t", is_fallback=i == 6))
+        ultimas = repo.load_last(3)
+        self.assertEqual([e["pergunta"] for e in ultimas], ["pergunta 4", "pergunta 5", "pergunta 6"])
+        self.assertIs(ultimas[-1]["is_fallback"], True)
+        self.assertEqual(repo.load_last(0), [])
+
+    def test_aprendidos_em_ordem(self):
+        repo = SqliteLearnedRepo(self.db)
+        repo.append("qual é o mdc", "maior divisor comum")
+        repo.append("qual é o mmc", "menor múltiplo comum")
+        self.assertEqual(repo.load(), [
+            {"pergunta": "qual é o mdc", "resposta_ensinada": "maior divisor comum"},
+            {"pergunta": "qual é o mmc", "resposta_ensinada": "menor múltiplo comum"},
+        ])
+
+    def test_stats_mesmo_formato_do_json(self):
+        relatados = []
+        json_repo = StatsRepo(os.path.join(self.temp_dir, 'stats.json'))
+        json_repo._write_to_report = relatados.extend
+        sqlite_repo = SqliteStatsRepo(self.db, relatorio=self.relatorio)
+        relatados_sqlite = []
+        self.relatorio.registrar = relatados_sqlite.extend
+        interacoes = [
+            (False, "formal", "saudacao", "2025-01-01T10:00:00", "2025-01-01T10:00:02"),
+            (True, "formal", "fallback", "2025-01-01T10:10:00", "2025-01-01T10:10:01"),
+            (False, "engracada", "definicao_mdc", "2025-01-01T12:00:00", "2025-01-01T12:00:03"),
+        ]
+        for interacao in interacoes:
+            self.assertTrue(json_repo.update_interaction(*interacao))
+            self.assertTrue(sqlite_repo.update_interaction(*interacao))
+        self.assertEqual(sqlite_repo.load(), json_repo.load())
+        # O relatório recebe os mesmos blocos do modo JSON
+        self.assertEqual(relatados_sqlite, relatados)
+
+    def test_perguntas_frequentes_somadas_entre_workers(self):
+        history_repo = MagicMock()
+        history_repo.load_last.return_value = []
+        workers = [
+            FAQSuggestions(history_repo, IntentMatcher([], []), frequentes_repo=SqlitePerguntasFrequentesRepo(self.db),
+                           intervalo_gravacao_seg=60)
+            for _ in range(2)
+        ]
+        workers[0].registrar_pergunta("Qual o horário?")
+        workers[0].registrar_pergunta("Onde fica?")
+        workers[1].registrar_pergunta("Qual o horário?")
+        workers[1].registrar_pergunta("Qual o horário?")
+        workers[1].registrar_pergunta("Onde fica?")
+        self.assertTrue(all(w.salvar_frequentes() for w in workers))
+        self.assertTrue(workers[0].salvar_frequentes())  # nada novo: não soma de novo
+
+        recarregado = FAQSuggestions(history_repo, IntentMatcher([], []),
+                                     frequentes_repo=SqlitePerguntasFrequentesRepo(self.db))
+        top = recarregado.frequentes.top(2)
+        self.assertEqual([pergunta for pergunta, _ in top], ["Qual o horário?", "Onde fica?"])
+        self.assertAlmostEqual(top[0][1], 3.0, places=3)
+        self.assertAlmostEqual(top[1][1], 2.0, places=3)
+
+    def test_escritores_concorrentes(self):
+        repo = SqliteHistoryRepo(self.db)
+
+        def escrever(t):
+            for i in range(20):
+                repo.append(f"thread {t} pergunta {i}", "r", "formal")
+
+        threads = [threading.Thread(target=escrever, args=(t,)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(repo.load_last(1000)), 80)
+
+
+class TestMigracaoJson(unittest.TestCase):
+    """Os JSON atuais são importados uma única vez."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = SqliteDatabase(os.path.join(self.temp_dir, 'educalin.db'))
+        self.historico_file = os.path.join(self.temp_dir, 'historico.json')
+        self.learned_file = os.path.join(self.temp_dir, 'new_data.json')
+        self.stats_file = os.path.join(self.temp_dir, 'stats.json')
+        self.frequentes_file = os.path.join(self.temp_dir, 'perguntas_frequentes.json')
+
+        with open(self.historico_file, 'w', encoding='utf-8') as f:
+            json.dump([entrada_historico("oi", "olá", "formal", "saudacao")], f)
+        LearnedRepo(self.learned_file).append("qual é o mdc", "maior divisor comum")
+        stats = StatsRepo(self.stats_file)
+        stats._write_to_report = lambda registros: None
+        stats.update_interaction(False, "formal", "saudacao", "2025-01-01T10:00:00", "2025-01-01T10:00:02")
+        self.stats_esperado = stats.load()
+
+    def tearDown(self):
+        self.db.fechar()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_migra_uma_vez(self):
+        self.assertTrue(migrar_json(self.db, self.historico_file, self.learned_file, self.stats_file))
+        self.assertFalse(migrar_json(self.db, self.historico_file, self.learned_file, self.stats_file))
+
+        self.assertEqual([e["pergunta"] for e in SqliteHistoryRepo(self.db).load_last(10)], ["oi"])
+        self.assertEqual(SqliteLearnedRepo(self.db).load()[0]["pergunta"], "qual é o mdc")
+        self.assertEqual(SqliteStatsRepo(self.db).load(), self.stats_esperado)
+
+    def test_migra_perguntas_frequentes(self):
+        history_repo = MagicMock()
+        history_repo.load_last.return_value = []
+        faq = FAQSuggestions(history_repo, IntentMatcher([], []),
+                             frequentes_repo=PerguntasFrequentesRepo(self.frequentes_file), intervalo_gravacao_seg=60)
+        faq.registrar_pergunta("Onde fica?")
+        faq.registrar_pergunta("Qual o horário?")
+        faq.registrar_pergunta("Qual o horário?")
+        self.assertTrue(faq.salvar_frequentes())
+
+        self.assertTrue(migrar_json(self.db, frequentes_path=self.frequentes_file))
+        migrado = FAQSuggestions(history_repo, IntentMatcher([], []),
+                                 frequentes_repo=SqlitePerguntasFrequentesRepo(self.db))
+        self.assertEqual(migrado._get_from_history(n=2), ["Qual o horário?", "Onde fica?"])
+
+    def test_migracao_concorrente_importa_uma_vez(self):
+        # Segundo worker passou pela checagem antes do primeiro gravar a marca
+        self.assertTrue(migrar_json(self.db, self.historico_file, self.learned_file, self.stats_file))
+        outro_worker = SqliteDatabase(self.db.path)
+        outro_worker.get_meta = lambda chave: None
+        self.assertFalse(migrar_json(outro_worker, self.historico_file, self.learned_file, self.stats_file))
+        outro_worker.fechar()
+        self.assertEqual(len(SqliteHistoryRepo(self.db).load_last(10)), 1)
+        self.assertEqual(len(SqliteLearnedRepo(self.db).load()), 1)
+
+    def test_sessao_continua_apos_migracao(self):
+        migrar_json(self.db, stats_path=self.stats_file)
+        repo = SqliteStatsRepo(self.db, relatorio=MagicMock())
+        repo.update_interaction(False, "formal", "saudacao", "2025-01-01T10:05:00", "2025-01-01T10:05:01")
+        stats = repo.load()
+        self.assertEqual(stats["total_interactions"], 2)
+        self.assertEqual(stats["sessao_aberta"]["id"], 1)
+        self.assertEqual(stats["sessao_aberta"]["num_interacoes"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
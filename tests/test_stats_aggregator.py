@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from infra.repositories import CoreRepo, JsonlHistoryRepo, StatsRepo
+from infra.stats_aggregator import AgregadorStats, resumir_stats
+from core.intent_matcher import IntentMatcher
+from core.chatbot import Chatbot
+
+INTERACOES = [
+    (False, "formal", "saudacao", "2025-01-01T10:00:00", "2025-01-01T10:00:02"),
+    (True, "formal", "fallback", "2025-01-01T10:10:00", "2025-01-01T10:10:01"),
+    (False, "engracada", "definicao_mdc", "2025-01-01T12:00:00", "2025-01-01T12:00:03"),
+]
+
+
+class TestAgregadorStats(unittest.TestCase):
+    """Estatísticas em memória iguais às do StatsRepo, gravadas só no snapshot."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.stats_file = os.path.join(self.temp_dir, 'stats.json')
+        self.repo = StatsRepo(self.stats_file)
+        self.repo._write_to_report = lambda registros: None
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_mesmo_resultado_do_repo(self):
+        referencia = StatsRepo(os.path.join(self.temp_dir, 'referencia.json'))
+        referencia._write_to_report = lambda registros: None
+        agregador = AgregadorStats(self.repo, intervalo_seg=60)
+        for interacao in INTERACOES:
+            referencia.update_interaction(*interacao)
+            agregador.update_interaction(*interacao)
+        self.assertEqual(agregador.load(), referencia.load())
+        self.assertEqual(agregador.resumo(), resumir_stats(referencia.load()))
+
+    def test_leitura_sem_disco(self):
+        agregador = AgregadorStats(self.repo, intervalo_seg=60)
+        agregador.update_interactions(INTERACOES)
+        with patch("builtins.open", side_effect=AssertionError("acesso a disco")):
+            resumo = agregador.resumo()
+        self.assertEqual(resumo["total_interactions"], 3)
+        self.assertEqual(resumo["num_sessoes"], 2)
+        self.assertFalse(os.path.exists(self.stats_file))
+
+    def test_snapshot_no_flush_e_no_close(self):
+        agregador = AgregadorStats(self.repo, intervalo_seg=60)
+        agregador.start()
+        agregador.update_interaction(*INTERACOES[0])
+        self.assertTrue(agregador.flush())
+        self.assertEqual(self.repo.load()["total_interactions"], 1)
+        self.assertTrue(agregador.flush())
+        self.assertEqual(agregador.metricas()["snapshots"], 1)  # sem mudança, sem nova escrita
+
+        agregador.update_interaction(*INTERACOES[1])
+        agregador.close()
+        self.assertEqual(self.repo.load()["total_interactions"], 2)
+        self.assertFalse(agregador.metricas()["pendente"])
+
+    def test_falha_no_snapshot_nao_duplica_relatorio(self):
+        relatados = []
+        self.repo._write_to_report = relatados.extend
+        agregador = AgregadorStats(self.repo, intervalo_seg=60)
+        agregador.update_interactions(INTERACOES[:2])
+        with patch.object(self.repo.atomic, "write_json_atomic", return_value=False):
+            self.assertFalse(agregador.flush())
+        self.assertEqual(relatados, [])
+        agregador.update_interaction(*INTERACOES[2])
+        self.assertTrue(agregador.flush())
+        self.assertEqual([registro[0] for registro in relatados], [1, 2, 3])
+
+    def test_continua_de_stats_existente(self):
+        self.repo.update_interactions(INTERACOES[:2])
+        agregador = AgregadorStats(self.repo, intervalo_seg=60)
+        agregador.update_interaction(*INTERACOES[2])
+        self.assertEqual(agregador.load()["total_interactions"], 3)
+        self.assertEqual(agregador.load()["sessao_aberta"]["id"], 2)
+        self.assertEqual(agregador.load()["sessoes_fechadas"]["quantidade"], 1)
+
+    def test_copia_defensiva(self):
+        agregador = AgregadorStats(self.repo, intervalo_seg=60)
+        agregador.update_interaction(*INTERACOES[0])
+        agregador.resumo()["por_tag"]["saudacao"] = 99
+        agregador.load()["total_interactions"] = 99
+        self.assertEqual(agregador.resumo()["por_tag"]["saudacao"], 1)
+        self.assertEqual(agregador.load()["total_interactions"], 1)
+
+    def test_chatbot_com_agregador_e_write_behind(self):
+        intencoes = CoreRepo('data/core_data.json').load_intents()
+        history_repo = JsonlHistoryRepo(os.path.join(self.temp_dir, 'historico.jsonl'))
+        bot = Chatbot(matcher=IntentMatcher(intencoes, []), learned_repo=None, history_repo=history_repo,
+                      logger=None, stats_repo=self.repo)
+        bot.ativar_agregador_stats(intervalo_seg=60)
+        wb = bot.ativar_write_behind(intervalo_seg=60)
+        try:
+            bot.processar_mensagem("oi", "formal")
+            bot.processar_mensagem("pergunta sem resposta nenhuma", "formal")
+            stats = bot.get_stats()
+            self.assertEqual(stats["total_interactions"], 2)
+            self.assertEqual(stats["fallback_count"], 1)
+            self.assertIsNone(wb.stats_repo)
+        finally:
+            bot.encerrar()
+        self.assertEqual(self.repo.load()["total_interactions"], 2)
+        self.assertEqual(len(history_repo.load_last(10)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
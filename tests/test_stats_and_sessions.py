@@ -48,10 +48,10 @@ class TestStatsAndSessions(unittest.TestCase):
         )
         
         data = stats_repo.load()
-        self.assertEqual(len(data["sessoes"]), 1)
-        self.assertIn("1", data["sessoes"])
-        self.assertAlmostEqual(data["sessoes"]["1"]["duracao_seg"], 10, delta=0.1)
-        self.assertEqual(data["sessoes"]["1"]["num_interacoes"], 1)
+        self.assertEqual(data["sessao_aberta"]["id"], 1)
+        self.assertEqual(data["sessoes_fechadas"]["quantidade"], 0)
+        self.assertAlmostEqual(data["sessao_aberta"]["duracao_seg"], 10, delta=0.1)
+        self.assertEqual(data["sessao_aberta"]["num_interacoes"], 1)
         self.assertEqual(data["total_interactions"], 1)
 
     def test_02_interacao_curta_continua_sessao(self):
@@ -69,9 +69,10 @@ class TestStatsAndSessions(unittest.TestCase):
         stats_repo.update_interaction(False, "formal", "despedida", ts2_in.isoformat(), ts2_out.isoformat())
         
         data = stats_repo.load()
-        self.assertEqual(len(data["sessoes"]), 1)
-        self.assertEqual(data["sessoes"]["1"]["num_interacoes"], 2)
-        self.assertAlmostEqual(data["sessoes"]["1"]["duracao_seg"], 35, delta=0.1) # 15 + 20
+        self.assertEqual(data["sessao_aberta"]["id"], 1)
+        self.assertEqual(data["sessoes_fechadas"]["quantidade"], 0)
+        self.assertEqual(data["sessao_aberta"]["num_interacoes"], 2)
+        self.assertAlmostEqual(data["sessao_aberta"]["duracao_seg"], 35, delta=0.1) # 15 + 20
         self.assertEqual(data["total_interactions"], 2)
 
     def test_03_interacao_longa_cria_nova_sessao(self):
@@ -89,12 +90,15 @@ class TestStatsAndSessions(unittest.TestCase):
         stats_repo.update_interaction(True, "engracada", "fallback", ts2_in.isoformat(), ts2_out.isoformat())
         
         data = stats_repo.load()
-        self.assertEqual(len(data["sessoes"]), 2)
-        self.assertIn("1", data["sessoes"])
-        self.assertIn("2", data["sessoes"])
-        self.assertEqual(data["sessoes"]["1"]["num_interacoes"], 1)
-        self.assertEqual(data["sessoes"]["2"]["num_interacoes"], 1)
-        self.assertAlmostEqual(data["sessoes"]["2"]["duracao_seg"], 5, delta=0.1)
+        # A sessão 1 foi encerrada e resumida; só a 2 fica aberta
+        self.assertEqual(data["sessao_aberta"]["id"], 2)
+        self.assertEqual(data["sessoes_fechadas"]["quantidade"], 1)
+        self.assertEqual(data["sessoes_fechadas"]["interacoes"], 1)
+        self.assertAlmostEqual(data["sessoes_fechadas"]["duracao_seg"], 10, delta=0.1)
+        self.assertEqual(data["sessoes_por_dia"][ts1_in.date().isoformat()]["sessoes"], 1)
+        self.assertEqual(data["sessao_aberta"]["num_interacoes"], 1)
+        self.assertAlmostEqual(data["sessao_aberta"]["duracao_seg"], 5, delta=0.1)
+        self.assertAlmostEqual(data["total_duracao_sessoes_seg"], 15, delta=0.1)
         self.assertEqual(data["total_interactions"], 2)
         self.assertEqual(data["fallback_count"], 1)
 
@@ -123,7 +127,7 @@ class TestStatsAndSessions(unittest.TestCase):
 
         chatbot.processar_mensagem("pergunta 1", "formal")
         stats_data = chatbot.stats_repo.load()
-        last_ts_out_str = stats_data["sessoes"]["1"]["fim"]
+        last_ts_out_str = stats_data["sessao_aberta"]["fim"]
         last_ts_out = datetime.fromisoformat(last_ts_out_str)
         new_ts_in = last_ts_out + timedelta(minutes=40)
         new_ts_out = new_ts_in + timedelta(seconds=5)
@@ -140,5 +144,45 @@ class TestStatsAndSessions(unittest.TestCase):
         media_esperada_min = (duracao_total / 2) / 60
         self.assertAlmostEqual(stats["media_duracao_sessao_min"], media_esperada_min, places=5)
 
+    def test_05_ids_acima_de_9_e_formato_antigo(self):
+        """Converte o formato antigo (uma entrada por sessão) sem ordenar ids como texto."""
+        sessoes = {}
+        inicio = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+        for i in range(1, 12):
+            ts = inicio + timedelta(hours=i)
+            sessoes[str(i)] = {"inicio": ts.isoformat(), "fim": (ts + timedelta(seconds=i)).isoformat(),
+                               "duracao_seg": i, "num_interacoes": 1}
+        with open(self.stats_file, 'w', encoding='utf-8') as f:
+            json.dump({"total_interactions": 11, "sessoes": sessoes, "total_duracao_sessoes_seg": 66}, f)
+
+        stats_repo = StatsRepo(self.stats_file, logger=self.logger)
+        data = stats_repo.load()
+        self.assertNotIn("sessoes", data)
+        self.assertEqual(data["sessao_aberta"]["id"], 11)
+        self.assertEqual(data["sessoes_fechadas"]["quantidade"], 10)
+        self.assertEqual(data["total_duracao_sessoes_seg"], 66)
+
+        ts_in = inicio + timedelta(hours=11, minutes=5)
+        stats_repo.update_interaction(False, "formal", "saudacao", ts_in.isoformat(), (ts_in + timedelta(seconds=1)).isoformat())
+        data = stats_repo.load()
+        self.assertEqual(data["sessao_aberta"]["id"], 11)
+        self.assertEqual(data["sessao_aberta"]["num_interacoes"], 2)
+
+    def test_06_tamanho_constante(self):
+        """Muitas sessões não fazem o stats.json crescer."""
+        stats_repo = StatsRepo(self.stats_file, logger=self.logger)
+        ts = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        tamanhos = []
+        for lote in range(2):
+            interacoes = []
+            for _ in range(200):
+                ts += timedelta(minutes=45)
+                interacoes.append((False, "formal", "saudacao", ts.isoformat(), (ts + timedelta(seconds=1)).isoformat()))
+            stats_repo.update_interactions(interacoes)
+            tamanhos.append(os.path.getsize(self.stats_file))
+        # 200 sessões ~ 6 dias de resumo por lote: o arquivo só ganha poucas linhas
+        self.assertLess(tamanhos[1] - tamanhos[0], 1024)
+        self.assertEqual(stats_repo.load()["sessoes_fechadas"]["quantidade"], 399)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+import unittest
+
+from infra.repositories import CoreRepo
+from core.intent_matcher import IntentMatcher
+from core import tfidf_index
+from core.tfidf_index import relatorio_concordancia
+
+
+@unittest.skipUnless(tfidf_index.np is not None, "numpy não instalado")
+class TestTfidfBackend(unittest.TestCase):
+    """Backend TF-IDF deve manter o contrato e concordar com o difflib."""
+
+    def setUp(self):
+        self.intencoes = CoreRepo('data/core_data.json').load_intents()
+        self.aprendidos = [
+            {"pergunta": "qual a raiz quadrada de 144", "resposta_ensinada": "12"},
+            {"pergunta": "o que é um número primo", "resposta_ensinada": "Divisível só por 1 e por ele mesmo"},
+        ]
+        self.difflib = IntentMatcher(self.intencoes, list(self.aprendidos), backend="difflib")
+        self.tfidf = IntentMatcher(self.intencoes, list(self.aprendidos), backend="tfidf")
+
+    def _variacoes(self):
+        perguntas = [p for i in self.intencoes for p in i.get("perguntas", [])]
+        perguntas += [d["pergunta"] for d in self.aprendidos]
+        for p in perguntas:
+            yield p
+            yield p.upper()
+            yield p[:-1]
+            yield p + "?"
+        yield "pergunta totalmente desconhecida"
+
+    def test_concordancia_total_no_core(self):
+        relatorio = relatorio_concordancia(self.difflib, self.tfidf, self._variacoes())
+        self.assertEqual(relatorio["divergencias"], [])
+        self.assertEqual(relatorio["taxa_concordancia"], 1.0)
+
+    def test_contrato_de_retorno(self):
+        resultado = self.tfidf.match("o que é um numero primo")
+        self.assertEqual(resultado, {"tipo": "aprendido", "resposta": "Divisível só por 1 e por ele mesmo"})
+        self.assertEqual(self.tfidf.match("oi")["tipo"], "intent")
+        self.assertIsNone(self.tfidf.match("xyzw"))
+
+    def test_add_learned_recompila_matriz(self):
+        self.tfidf.add_learned("quanto vale pi", "3,14159...")
+        self.assertEqual(self.tfidf.match("quanto vale pi?"), {"tipo": "aprendido", "resposta": "3,14159..."})
+
+    def test_consulta_nao_altera_indice_publicado(self):
+        indice = tfidf_index.TfidfIndex(["qual a raiz de 144"])
+        copia = indice.copia()
+        copia.add("quanto vale pi")
+        matriz = indice._matriz
+        self.assertEqual(indice.close_matches("qual a raiz de 144?", n=1), ["qual a raiz de 144"])
+        self.assertEqual(copia.close_matches("quanto vale pi?", n=1), ["quanto vale pi"])
+        self.assertIs(indice._matriz, matriz)
+
+    def test_backend_invalido(self):
+        with self.assertRaises(ValueError):
+            IntentMatcher(self.intencoes, [], backend="inexistente")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+
+from infra.repositories import CoreRepo, JsonlHistoryRepo, StatsRepo, entrada_historico
+from infra.write_behind import WriteBehind
+from core.intent_matcher import IntentMatcher
+from core.chatbot import Chatbot
+
+
+def _interacao(i):
+    agora = datetime.now(timezone.utc).isoformat()
+    return (
+        entrada_historico(f"pergunta {i}", "resposta", "formal", "t", False, agora, agora),
+        (False, "formal", "t", agora, agora),
+    )
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Interações ficam na fila e são gravadas em lote, sem perda no desligamento."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.history_repo = JsonlHistoryRepo(os.path.join(self.temp_dir, 'historico.jsonl'))
+        self.stats_repo = StatsRepo(os.path.join(self.temp_dir, 'stats.json'))
+        self.lotes_stats = []
+        update = self.stats_repo.update_interactions
+
+        def update_e_conta(interacoes, **kwargs):
+            self.lotes_stats.append(len(interacoes))
+            return update(interacoes, **kwargs)
+
+        self.stats_repo.update_interactions = update_e_conta
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_flush_grava_um_lote(self):
+        wb = WriteBehind(self.history_repo, self.stats_repo, intervalo_seg=60)
+        for i in range(5):
+            wb.registrar(*_interacao(i))
+        self.assertEqual(self.history_repo.load_last(10), [])
+        self.assertEqual(wb.pendentes(), 5)
+
+        self.assertTrue(wb.flush())
+        self.assertEqual(len(self.history_repo.load_last(10)), 5)
+        self.assertEqual(self.stats_repo.load()["total_interactions"], 5)
+        self.assertEqual(self.lotes_stats, [5])
+        self.assertEqual(wb.metricas()["lotes"], 1)
+
+    def test_max_pendentes_antecipa_gravacao(self):
+        gravou = threading.Event()
+        append_many = self.history_repo.append_many
+
+        def append_e_avisa(entradas, **kwargs):
+            ok = append_many(entradas, **kwargs)
+            gravou.set()
+            return ok
+
+        self.history_repo.append_many = append_e_avisa
+        wb = WriteBehind(self.history_repo, self.stats_repo, intervalo_seg=60, max_pendentes=3)
+        wb.start()
+        try:
+            for i in range(3):
+                wb.registrar(*_interacao(i))
+            self.assertTrue(gravou.wait(5))
+        finally:
+            wb.close()
+        self.assertEqual(len(self.history_repo.load_last(10)), 3)
+
+    def test_close_grava_pendentes(self):
+        wb = WriteBehind(self.history_repo, self.stats_repo, intervalo_seg=60)
+        wb.start()
+        for i in range(4):
+            wb.registrar(*_interacao(i))
+        wb.close()
+        wb.close()
+        self.assertEqual(len(self.history_repo.load_last(10)), 4)
+        with self.assertRaises(RuntimeError):
+            wb.registrar(*_interacao(9))
+
+    def test_falha_mantem_so_a_parte_que_falhou(self):
+        append_many = self.history_repo.append_many
+        falhar = [True]
+        self.history_repo.append_many = lambda entradas, **kwargs: False if falhar[0] else append_many(entradas, **kwargs)
+        wb = WriteBehind(self.history_repo, self.stats_repo, intervalo_seg=60)
+        for i in range(3):
+            wb.registrar(*_interacao(i))
+        self.assertFalse(wb.flush())
+        self.assertEqual(wb.pendentes(), 3)
+        self.assertEqual(wb.metricas()["gravados"], 0)
+        self.assertEqual(self.stats_repo.load()["total_interactions"], 3)
+
+        falhar[0] = False
+        wb.registrar(*_interacao(3))
+        self.assertTrue(wb.flush())
+        self.assertEqual([e["pergunta"] for e in self.history_repo.load_last(10)], [f"pergunta {i}" for i in range(4)])
+        # Estatísticas já gravadas não são reaplicadas
+        self.assertEqual(self.stats_repo.load()["total_interactions"], 4)
+        self.assertEqual(self.lotes_stats, [3, 1])
+
+    def test_limite_pendentes_grava_sincrono(self):
+        wb = WriteBehind(self.history_repo, self.stats_repo, intervalo_seg=60, max_pendentes=2, limite_pendentes=4)
+        for i in range(4):
+            wb.registrar(*_interacao(i))
+        self.assertEqual(wb.pendentes(), 0)
+        self.assertEqual(len(self.history_repo.load_last(10)), 4)
+        self.assertEqual(wb.metricas()["sincronas"], 1)
+
+    def test_repo_sempre_falhando_limita_fila_e_tentativas(self):
+        tentativas = []
+
+        def falhar(itens, **kwargs):
+            tentativas.append(len(itens))
+            return False
+
+        self.history_repo.append_many = falhar
+        self.stats_repo.update_interactions = falhar
+        wb = WriteBehind(self.history_repo, self.stats_repo, intervalo_seg=60, max_pendentes=10, max_retidos=200)
+        for i in range(5000):
+            wb.registrar(*_interacao(i))
+
+        metricas = wb.metricas()
+        self.assertEqual(metricas["pendentes"], 200)
+        self.assertEqual(metricas["descartados"], 2 * 4800)  # histórico + estatísticas
+        # Uma gravação síncrona no limite; as seguintes esperam o intervalo de nova tentativa
+        self.assertEqual(metricas["sincronas"], 1)
+        self.assertEqual(tentativas, [100, 100])
+
+        # Ficam as interações mais recentes, na ordem
+        gravadas = []
+        self.history_repo.append_many = lambda entradas, **kwargs: gravadas.extend(entradas) or True
+        self.assertFalse(wb.flush())  # estatísticas continuam falhando
+        self.assertEqual([e["pergunta"] for e in gravadas], [f"pergunta {i}" for i in range(4800, 5000)])
+
+    def test_chatbot_com_write_behind(self):
+        intencoes = CoreRepo('data/core_data.json').load_intents()
+        bot = Chatbot(matcher=IntentMatcher(intencoes, []), learned_repo=None, history_repo=self.history_repo, logger=None)
+        bot.stats_repo = self.stats_repo
+        bot.ativar_write_behind(intervalo_seg=60)
+        try:
+            for _ in range(3):
+                bot.processar_mensagem("oi", "formal")
+            bot.processar_mensagem("pergunta sem resposta nenhuma", "formal")
+
+            stats = bot.get_stats()
+            self.assertEqual(stats["total_interactions"], 4)
+            self.assertEqual(stats["fallback_count"], 1)
+            self.assertEqual(len(bot.carregar_historico_inicial(10)), 4)
+            self.assertEqual(self.lotes_stats, [4])
+        finally:
+            bot.encerrar()
+
+
+if __name__ == '__main__':
+    unittest.main()